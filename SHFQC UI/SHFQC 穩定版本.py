@@ -6,26 +6,27 @@ from PyQt6.QtWidgets import (
     QGroupBox, QLineEdit, QPushButton,
     QLabel, QComboBox, QDoubleSpinBox, QSpinBox, QCheckBox,
     QDialog, QVBoxLayout, QMessageBox, QErrorMessage, QSlider,
-    QTextEdit, QProgressBar
+    QTextEdit, QProgressBar, QInputDialog, QFileDialog
 )
-from PyQt6.QtCore import QThreadPool
+from PyQt6.QtCore import QThreadPool, QTimer
 from PyQt6.QtGui import QIcon
 
 import matplotlib.pyplot as plt
 
 from zhinst.toolkit import Session
-from pyvisa import ResourceManager
 
 #* 導入自訂模組
 from library.init_UI.MainUI_builder import UIBuilder
 from library.init_UI.init_components import init_components
-from library.device_control import SHFQC, YOKOGAWA
-from library.waveform_generation import generate_waveform
+from library.device_control import SHFQC, YOKOGAWA, YOKOGAWARegistry
+from library.waveform_generation import generate_waveform, release_library_waveform, SAMPLING_RATE
+from library.waveform_library import WaveformLibrary
 from library.File_Storage import DataSaver, FileLoader
 from library.measurement_controller import MeasurementController
-from library.gui_components import SaveDataDialog, ParameterDialog, YOKOGAWAControlDialog
+from library.gui_components import SaveDataDialog, ParameterDialog, YOKOGAWAControlDialog, WaveformPreviewWorker
 from library.Formula_Parser import FormulaParser
 from library.plot_manager import PlotManager
+from library.plot_backend import PlotBackend
 from library.config_handler import ConfigHandler
 
 
@@ -40,17 +41,24 @@ class OptimizedSHFQCGUI(QMainWindow):
         plt.rcParams['font.sans-serif'] = ['Microsoft JhengHei']
         plt.rcParams['axes.unicode_minus'] = False
         
+        #* 初始化配置管理器
+        self.config_path = os.path.join(os.path.dirname(__file__), 'shfqc_config.ini')
+        self.config_handler = ConfigHandler(self.config_path)
+        #* 繪圖後端 (建立畫布前決定)
+        requested_backend = self.config_handler.read_value('主要參數', '繪圖後端', PlotBackend.DEFAULT)
+        self.plot_backend = PlotBackend.resolve(requested_backend)
+
         #* 初始化定義控制組建
         init_components.init_components(self)
         
         #* 創建主視窗介面
         UIBuilder.create_main_ui(self)
+        if requested_backend == PlotBackend.PYQTGRAPH and self.plot_backend != PlotBackend.PYQTGRAPH:
+            self.statusBar().showMessage("未安裝 pyqtgraph, 改用 matplotlib 繪圖", 10000)
         
-        #* 初始化配置管理器
-        self.config_path = os.path.join(os.path.dirname(__file__), 'shfqc_config.ini')
-        self.config_handler = ConfigHandler(self.config_path)
-        #* 初始化繪圖管理器
+        #* 初始化繪圖管理器 (切換繪圖分頁時才繪製延後的更新)
         self.plot_manager = PlotManager(self)
+        self.viz_tabs.currentChanged.connect(self.plot_manager.render_pending)
         #* 初始化公式解析工具
         self.formula_parser = FormulaParser()
         #* 初始化量測線程控制器
@@ -71,6 +79,18 @@ class OptimizedSHFQCGUI(QMainWindow):
         self.current_freq_data = None
         self.freq_values = None
         self.current_values = None
+        #即時存檔 (掃描數據對應的 HDF5 文件, 存檔時直接移動)
+        self.stream_file = None
+
+        #* 波型預覽 (防抖計時器及背景生成狀態)
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(150)
+        self.preview_timer.timeout.connect(self._start_waveform_preview)
+        self._preview_worker = None
+        self._preview_pending = False
+        self._preview_request = 0
+        self._preview_lines = None
 
         #* 事件連接
         self._connect_signals()
@@ -78,12 +98,12 @@ class OptimizedSHFQCGUI(QMainWindow):
         #* 加載配置數據
         self.load_settings()
 
-        #* 初始化波型預覽顯示
-        self.update_waveform_preview()
-
         self.thread_pool = QThreadPool()
         self.thread_pool.setMaxThreadCount(4)
 
+        #* 初始化波型預覽顯示
+        self.update_waveform_preview()
+
     # region: 事件链连接
     def _connect_signals(self):
         self.save_config_btn.clicked.connect(self.save_settings)
@@ -98,10 +118,11 @@ class OptimizedSHFQCGUI(QMainWindow):
         self.load_data_btn.clicked.connect(self.load_data)
         self.yoko_devices_contect.clicked.connect(self.check_yoko)
         self.btn_control_yoko.clicked.connect(self.open_yoko_control)
+        self.stream_dir_btn.clicked.connect(self.browse_stream_dir)
         
         
         # 波形相关信号
-        self.wave_type_combo.currentIndexChanged.connect(self.wave_param_stack.setCurrentIndex)
+        self.wave_type_combo.currentIndexChanged.connect(self.update_wave_param_page)
         self.wave_type_combo.currentIndexChanged.connect(self.update_waveform_preview)
         self.digital_lo_spin.valueChanged.connect(self.update_waveform_preview)
         self.gain_spin.valueChanged.connect(self.update_waveform_preview)
@@ -118,6 +139,9 @@ class OptimizedSHFQCGUI(QMainWindow):
         self.custom_duration_spin.valueChanged.connect(self.update_waveform_preview)
         self.custom_params_btn.clicked.connect(self.set_custom_parameters)
         self.parse_formula_btn.clicked.connect(self.handle_parse_formula)
+        self.save_wave_library_btn.clicked.connect(self.save_to_waveform_library)
+        self.import_wave_library_btn.clicked.connect(self.import_to_waveform_library)
+        self.delete_wave_library_btn.clicked.connect(self.delete_from_waveform_library)
         
         # 绘图更新信号
         self.power_slider.valueChanged.connect(self.update_power_slice)
@@ -127,6 +151,7 @@ class OptimizedSHFQCGUI(QMainWindow):
         
         # 方案选择变化
         self.scheme_combo.currentIndexChanged.connect(self.update_scheme_ui)
+        self.settle_mode_combo.currentIndexChanged.connect(self.update_settle_ui)
     # endregion
 
     # region: 波形生成功能
@@ -196,10 +221,9 @@ class OptimizedSHFQCGUI(QMainWindow):
             # 更新波形预览
             self.update_waveform_preview()
             
-    def generate_waveform(self):
-        """根据当前参数生成波形"""
-        # 收集所有需要的参数
-        wave_params = {
+    def get_wave_params(self):
+        """收集生成波形所需的参数"""
+        return {
             'wave_type': self.wave_type_combo.currentText(),
             'pulse_length': self.pulse_length_spin.value(),
             'rise_samples': self.rise_samples_spin.value(),
@@ -216,70 +240,172 @@ class OptimizedSHFQCGUI(QMainWindow):
             'custom_params': getattr(self, 'custom_params', {}),
             'custom_duration': self.custom_duration_spin.value(),
             'custom_points': self.custom_points_spin.value(),
+            'complex_dtype': self.precision_combo.currentData(),
         }
-        
-        # 使用新的波形生成函数
+
+    def generate_waveform(self):
+        """根据当前参数生成波形"""
         return generate_waveform(
-            wave_params, 
+            self.get_wave_params(), 
             error_callback=self.show_error_message
         )
 
-    def update_waveform_preview(self):
-        """更新波形预览图"""
-        waveform = self.generate_waveform()
-        if waveform is None:
+    # 波形库
+    def update_wave_param_page(self, index):
+        """切换波形参数页面, 波形库项目共用最后一页"""
+        library_page = self.wave_param_stack.count() - 1
+        self.wave_param_stack.setCurrentIndex(min(index, library_page))
+
+        wave_type = self.wave_type_combo.currentText()
+        if WaveformLibrary.is_library_type(wave_type):
+            try:
+                info = WaveformLibrary.info(WaveformLibrary.name_of(wave_type))
+                self.library_info_label.setText(
+                    f"形狀: {tuple(info['shape'])}\n精度: {info['dtype']}\n建立時間: {info['created']}"
+                )
+            except Exception as e:
+                self.library_info_label.setText(f"讀取失敗: {str(e)}")
+
+    def refresh_waveform_library(self, select=None):
+        """重新载入波形库项目至波形类型选单"""
+        current = select or self.wave_type_combo.currentText()
+        n_builtin = self.wave_param_stack.count() - 1
+
+        self.wave_type_combo.blockSignals(True)
+        while self.wave_type_combo.count() > n_builtin:
+            self.wave_type_combo.removeItem(self.wave_type_combo.count() - 1)
+        self.wave_type_combo.addItems([WaveformLibrary.wave_type_of(name) for name in WaveformLibrary.list_names()])
+        self.wave_type_combo.setCurrentIndex(max(self.wave_type_combo.findText(current), 0))
+        self.wave_type_combo.blockSignals(False)
+
+        self.update_wave_param_page(self.wave_type_combo.currentIndex())
+        self.update_waveform_preview()
+
+    def save_to_waveform_library(self):
+        """将当前波形包络 (不含增益与混频) 存入波形库"""
+        name, ok = QInputDialog.getText(self, "存入波形庫", "波形名稱:")
+        name = name.strip()
+        if not ok or not name:
             return
-            
-        self.wave_preview.figure.clear()
-        ax = self.wave_preview.figure.add_subplot(111)
-        
-        # 绘制波形
-        n_pts = len(waveform)
-        sampling_rate = 2e9  # 2 GHz采样率
-        t0 = 0
-        t = np.arange(n_pts) * 1/sampling_rate + t0
-        ax.plot(t, np.abs(waveform), 'r-', label='包絡')
-        ax.plot(t, np.real(waveform), 'b-', label='實部')
-        ax.plot(t, np.imag(waveform), 'g-', label='虛部')
-        
-        # 设置标签和标题
+        if name in WaveformLibrary.list_names():
+            reply = QMessageBox.question(self, "覆寫確認", f"波形 {name} 已存在, 是否覆寫?")
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+
+        params = {**self.get_wave_params(), 'gain': 1.0, 'digital_lo': 0}
+        envelope = generate_waveform(params, error_callback=self.show_error_message)
+        if envelope is None:
+            return
+        try:
+            envelope = np.array(envelope)   # 覆写自身时先脱离记忆体映射
+            release_library_waveform(name)
+            WaveformLibrary.save(name, envelope, metadata=params)
+        except Exception as e:
+            QMessageBox.critical(self, "錯誤", f"存入波形庫失敗: {str(e)}")
+            return
+        self.refresh_waveform_library(select=WaveformLibrary.wave_type_of(name))
+
+    def import_to_waveform_library(self):
+        """汇入外部 .npy 波形档 (一维波形或二维波形库) 至波形库"""
+        file_path, _ = QFileDialog.getOpenFileName(self, "匯入波形檔", "", "NumPy 波形 (*.npy)")
+        if not file_path:
+            return
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        try:
+            waveform = np.load(file_path, mmap_mode='r')
+            release_library_waveform(name)
+            WaveformLibrary.save(name, waveform, metadata={'source': file_path})
+        except Exception as e:
+            QMessageBox.critical(self, "錯誤", f"匯入波形失敗: {str(e)}")
+            return
+        self.refresh_waveform_library(select=WaveformLibrary.wave_type_of(name))
+
+    def delete_from_waveform_library(self):
+        """删除当前选取的波形库项目"""
         wave_type = self.wave_type_combo.currentText()
-        ax.set_title(f"{wave_type} 預覽")
-        ax.set_xlabel("時間 (ns)")
-        ax.set_ylabel("振幅")
-        ax.grid(True)
-        ax.legend()
-        
-        self.wave_preview.draw()
+        if not WaveformLibrary.is_library_type(wave_type):
+            return
+        name = WaveformLibrary.name_of(wave_type)
+        reply = QMessageBox.question(self, "刪除確認", f"確定刪除波形 {name}?")
+        if reply != QMessageBox.StandardButton.Yes:
+            return
         try:
-            waveform = self.generate_waveform()
-            if waveform is None:
-                return
-                
+            release_library_waveform(name)
+            WaveformLibrary.delete(name)
+        except Exception as e:
+            QMessageBox.critical(self, "錯誤", f"刪除波形失敗: {str(e)}")
+            return
+        self.refresh_waveform_library(select=self.wave_type_combo.itemText(0))
+
+    def update_waveform_preview(self):
+        """排程更新波形预览 (防抖, 连续调整参数只生成最后一次)"""
+        self.preview_timer.start()
+
+    def _start_waveform_preview(self):
+        """于线程池生成预览波形, 已有生成中的工作时合并为一次待处理请求"""
+        if self._preview_worker is not None:
+            self._preview_pending = True
+            return
+
+        self._preview_request += 1
+        params = self.get_wave_params()
+        params['custom_params'] = dict(params['custom_params'])
+        worker = WaveformPreviewWorker(self._preview_request, params)
+        worker.finished.connect(self._on_waveform_preview)
+        worker.error.connect(self._on_waveform_preview_error)
+        self._preview_worker = worker
+        self.thread_pool.start(worker.run)
+
+    def _finish_waveform_preview(self):
+        """预览工作结束, 执行合并的待处理请求"""
+        self._preview_worker = None
+        if self._preview_pending:
+            self._preview_pending = False
+            self._start_waveform_preview()
+
+    def _on_waveform_preview(self, request_id, waveform):
+        """预览波形生成完成"""
+        self._finish_waveform_preview()
+        try:
+            self._draw_waveform_preview(waveform)
+        except Exception as e:
+            # 避免预览错误导致界面卡死
+            print(f"預覽錯誤: {str(e)}")
+
+    def _on_waveform_preview_error(self, request_id, message):
+        """预览波形生成失败"""
+        self._finish_waveform_preview()
+        self.show_error_message(message)
+
+    def _draw_waveform_preview(self, waveform):
+        """绘制波形预览, 首次建立曲线, 之后以 set_data 原地更新"""
+        waveform = np.array(waveform)   # 复制, 曲线不持有波形库的记忆体映射
+        n_pts = len(waveform)
+        t = np.arange(n_pts) / SAMPLING_RATE * 1e9
+        curves = (np.abs(waveform), np.real(waveform), np.imag(waveform))
+
+        if self._preview_lines is None:
             self.wave_preview.figure.clear()
             ax = self.wave_preview.figure.add_subplot(111)
-            
-            # 绘制波形
-            n_pts = len(waveform)
-            sampling_rate = 2e9  # 2 GHz采样率
-            t0 = 0
-            t = np.arange(n_pts) * 1/sampling_rate + t0
-            ax.plot(t, np.abs(waveform), 'r-', label='包絡')
-            ax.plot(t, np.real(waveform), 'b-', label='實部')
-            ax.plot(t, np.imag(waveform), 'g-', label='虛部')
-            
-            # 设置标签和标题
-            wave_type = self.wave_type_combo.currentText()
-            ax.set_title(f"{wave_type} 預覽")
+            self._preview_lines = [
+                ax.plot(t, curve, style, label=label)[0]
+                for curve, style, label in zip(curves, ('r-', 'b-', 'g-'), ('包絡', '實部', '虛部'))
+            ]
             ax.set_xlabel("時間 (ns)")
             ax.set_ylabel("振幅")
             ax.grid(True)
             ax.legend()
-            
-            self.wave_preview.draw()
-        except Exception as e:
-            # 避免预览错误导致界面卡死
-            print(f"預覽錯誤: {str(e)}")
+        else:
+            ax = self._preview_lines[0].axes
+            for line, curve in zip(self._preview_lines, curves):
+                line.set_data(t, curve)
+            ax.relim()
+            ax.autoscale_view()
+
+        # 设置标题
+        wave_type = self.wave_type_combo.currentText()
+        ax.set_title(f"{wave_type} 預覽")
+        self.wave_preview.draw_idle()
     # endregion
 
     # region: 配置文件处理
@@ -294,6 +420,10 @@ class OptimizedSHFQCGUI(QMainWindow):
     def closeEvent(self, event):
         """关闭窗口后保存配置"""
         self.save_settings()
+        # 關閉連線池前先停止控制對話框的背景作業
+        for dialog in self.findChildren(YOKOGAWAControlDialog):
+            dialog.stop_job()
+        YOKOGAWARegistry.close_all()
         event.accept()
     # endregion
 
@@ -328,6 +458,7 @@ class OptimizedSHFQCGUI(QMainWindow):
             'center_freq': self.center_freq_spin.value(),
             'digital_lo': self.digital_lo_spin.value(),
             'gain': self.gain_spin.value(),
+            'complex_dtype': self.precision_combo.currentData(),
 
             # 波形参数
             'wave_type': self.wave_type_combo.currentText(),
@@ -374,6 +505,15 @@ class OptimizedSHFQCGUI(QMainWindow):
             'curr_freq_dep_freq_start': self.freq_start_current_freq.value(),
             'curr_freq_dep_freq_stop': self.freq_stop_current_freq.value(),
             'curr_freq_dep_freq_point': self.freq_points_current_freq.value(),
+            'settle_mode': self.settle_mode_combo.currentText(),
+            'settle_tolerance': self.settle_tol_spin.value(),
+            'settle_probe_tolerance': self.settle_probe_tol_spin.value(),
+            'settle_min_wait': self.settle_min_wait_spin.value(),
+            'settle_timeout': self.settle_timeout_spin.value(),
+
+            # 即时存档
+            'stream_save': self.stream_save_check.isChecked(),
+            'stream_dir': self.stream_dir_edit.text(),
         }
 
     def run_time_domain(self):
@@ -440,12 +580,14 @@ class OptimizedSHFQCGUI(QMainWindow):
         """更新功率依赖数据"""
         self.power_data = data['data']
         self.power_amplitudes = data['amp']
+        self.stream_file = data.get('stream_file')
         self.plot_manager.update_power_plot(data)
     
     def update_freq_dep_data(self, data):
         """更新频率依赖数据"""
         self.freq_dep_data = data['data']
         self.freq_lo_values = data['lo_values']
+        self.stream_file = data.get('stream_file')
         self.plot_manager.update_freq_dep_plot(data)
     
     def update_current_freq_data(self, data):
@@ -453,6 +595,7 @@ class OptimizedSHFQCGUI(QMainWindow):
         self.current_freq_data = data['data']
         self.current_values = data['curr']
         self.freq_values = data['lo_values']
+        self.stream_file = data.get('stream_file')
         self.plot_manager.update_current_freq_plot(data)
 
     def abort_measurement(self):
@@ -519,6 +662,8 @@ class OptimizedSHFQCGUI(QMainWindow):
                 self.measurement_finished)
             self.measurement_controller.error_occurred.connect(
                 self.show_error_message)
+            self.measurement_controller.status_message.connect(
+                lambda message: self.statusBar().showMessage(message, 10000))
 
             # 基础设备检测报错
             if not hasattr(self.device, 'sgchannels'):
@@ -556,75 +701,38 @@ class OptimizedSHFQCGUI(QMainWindow):
 
     # yokogawa 连接
     def check_yoko(self):
-        """检查可用的YOKOGAWA设备"""
+        """检查可用的YOKOGAWA设备 (使用共用登录表的缓存结果)"""
         while self.link_yoko_layout.count():
             item = self.link_yoko_layout.takeAt(0)
             if item.widget():
                 item.widget().deleteLater()
+        self.yoko_checks = {}
         try:
-            self.rm = ResourceManager()
-            devices = self.rm.list_resources()
-            self.DC_id = {}
-            for device in devices:
-                if "USB" in device:  # 只显示USB设备
-                    if "90ZC38697" in device:
-                        self.dc1_check = QCheckBox("DC1")
-                        self.link_yoko_layout.addWidget(self.dc1_check)
-                        self.dc1_check.stateChanged.connect(self.contect_yoko)
-                        self.DC_id["DC1"] = device
-                    elif "90ZC38696" in device:
-                        self.dc2_check = QCheckBox("DC2")
-                        self.link_yoko_layout.addWidget(self.dc2_check)
-                        self.dc2_check.stateChanged.connect(self.contect_yoko)
-                        self.DC_id["DC2"] = device
-                    elif "9017D5818" in device:
-                        self.dc3_check = QCheckBox("DC3")
-                        self.link_yoko_layout.addWidget(self.dc3_check)
-                        self.dc3_check.stateChanged.connect(self.contect_yoko)
-                        self.DC_id["DC3"] = device
-                    elif "9017D5816" in device:
-                        self.dc4_check = QCheckBox("DC4")
-                        self.link_yoko_layout.addWidget(self.dc4_check)
-                        self.dc4_check.stateChanged.connect(self.contect_yoko)
-                        self.DC_id["DC4"] = device
+            for name in YOKOGAWARegistry.scan():
+                check = QCheckBox(name)
+                self.link_yoko_layout.addWidget(check)
+                check.stateChanged.connect(self.contect_yoko)
+                self.yoko_checks[name] = check
         except Exception as e:
             self.yoko_status.append(f"掃描錯誤: {str(e)}")
     
     def contect_yoko(self):
-        """连接选中的YOKOGAWA设备"""
+        """连接选中的YOKOGAWA设备 (由连接池取得, 不重复开启资源)"""
         self.yokos = []
+        for name, check in self.yoko_checks.items():
+            if not check.isChecked():
+                continue
+            try:
+                self.yokos.append(YOKOGAWARegistry.get(name, setup=self._setup_yoko))
+            except Exception as e:
+                self.yoko_status.append(f"連接錯誤: {str(e)}")
+
+    def _setup_yoko(self, yoko):
+        """首次开启YOKOGAWA时的初始设定"""
         try:
-            if hasattr(self, 'dc1_check') and self.dc1_check.isChecked():  # DC1
-                device_id = self.DC_id["DC1"]
-                visa_resource = self.rm.open_resource(device_id)
-                yoko = YOKOGAWA(device_id, visa_resource)
-                self.yokos.append(yoko)
-
-            if hasattr(self, 'dc2_check') and self.dc2_check.isChecked():  # DC2
-                device_id = self.DC_id["DC2"]
-                visa_resource = self.rm.open_resource(device_id)
-                yoko = YOKOGAWA(device_id, visa_resource)
-                self.yokos.append(yoko)
-
-            if hasattr(self, 'dc3_check') and self.dc3_check.isChecked():  # DC3
-                device_id = self.DC_id["DC3"]
-                visa_resource = self.rm.open_resource(device_id)
-                yoko = YOKOGAWA(device_id, visa_resource)
-                self.yokos.append(yoko)
-
-            if hasattr(self, 'dc4_check') and self.dc4_check.isChecked():  # DC4
-                device_id = self.DC_id["DC4"]
-                visa_resource = self.rm.open_resource(device_id)
-                yoko = YOKOGAWA(device_id, visa_resource)
-                self.yokos.append(yoko)
-                
-            for yoko in self.yokos:
-                try:
-                    yoko.operation_setting('CURR', 200e-3)
-                except Exception as e:
-                    self.yoko_status.append(f"{yoko.id} 設定錯誤: {str(e)}")
+            yoko.operation_setting('CURR', 200e-3)
         except Exception as e:
-            self.yoko_status.append(f"連接錯誤: {str(e)}")
+            self.yoko_status.append(f"{yoko.id} 設定錯誤: {str(e)}")
     # endregion
 
     # region: 数据保存功能
@@ -653,7 +761,9 @@ class OptimizedSHFQCGUI(QMainWindow):
             current_freq_data=current_freq_data,
             freq_values=freq_values,
             current_values=current_values,
-            plot_manager=self.plot_manager
+            plot_manager=self.plot_manager,
+            parameters=self.measurement_controller.last_params,
+            stream_file=self.stream_file
         )
         
         if save_dialog.exec() == QDialog.DialogCode.Accepted:
@@ -680,9 +790,19 @@ class OptimizedSHFQCGUI(QMainWindow):
             else:
                 QMessageBox.warning(self, "警告", "沒有可用的數據或尚未測量")
 
+    def browse_stream_dir(self):
+        """选择即时存档目录"""
+        folder = QFileDialog.getExistingDirectory(
+            self,
+            "選擇即時存檔目錄",
+            self.stream_dir_edit.text(),
+            QFileDialog.Option.ShowDirsOnly
+        )
+        if folder:
+            self.stream_dir_edit.setText(folder)
+
     def load_data(self):
         """加载数据功能"""
-        PlotManager
         dialog = FileLoader(self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             pass
@@ -702,6 +822,15 @@ class OptimizedSHFQCGUI(QMainWindow):
         self.measure_plan = index
         self._toggle_controls(True)  # 重新启用对应按钮
 
+    def update_settle_ui(self, index):
+        """根据稳定判定来源启用对应的容差设置"""
+        mode = self.settle_mode_combo.currentText()
+        self.settle_tol_spin.setEnabled(mode == "讀回電流")
+        self.settle_probe_tol_spin.setEnabled(mode == "SHFQC探測")
+        enable = mode != "不等待"
+        self.settle_min_wait_spin.setEnabled(enable)
+        self.settle_timeout_spin.setEnabled(enable)
+
     def show_error_message(self, message):
         """显示错误消息"""
         error_dialog = QErrorMessage(self)
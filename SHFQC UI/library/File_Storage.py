@@ -1,6 +1,12 @@
 import os
+import re
 import csv
+import shutil
+import json
+import time
 import numpy as np
+import matplotlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QGroupBox, QGridLayout, QLabel, 
     QLineEdit, QPushButton, QFileDialog, QDialogButtonBox,
@@ -11,11 +17,51 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from library.plot_manager import PlotManager
+from library.slice_renderer import (
+    render_slices, render_animation, render_contact_sheet, init_worker, DEFAULT_DPI, SHEET_TILES
+)
+
+#* h5py 為選用套件, 未安裝時只提供 CSV 格式
+try:
+    import h5py
+except ImportError:
+    h5py = None
 
 
 class DataSaver:
     """數據保存工具類，提供各種測量數據的保存功能"""
     
+    #* 數據保存格式 (CSV 為選用的文字輸出)
+    STORAGE_FORMATS = {
+        'hdf5': "HDF5",
+        'hdf5+csv': "HDF5 + CSV",
+        'csv': "CSV",
+    }
+    #* 數據類型對應的 HDF5 'data_type' 屬性 (與 FileLoader 的數據類型名稱一致)
+    DATA_TYPE_KEYS = {
+        "時域 {單張} 量測": 'time_domain',
+        "頻域 {單張} 量測": 'freq_domain',
+        "時域 {振幅} 掃描": 'power_dependent',
+        "時域 {頻率} 掃描": 'frequency_dependent',
+        "時域 {電流頻率} 掃描": 'current_frequency',
+    }
+    #* 各數據類型 'data' 數據集的維度名稱, 'time' 以外的維度其軸數值存為同名屬性
+    HDF5_AXES = {
+        'time_domain': ('time',),
+        'freq_domain': ('freq',),
+        'power_dependent': ('amp', 'time'),
+        'frequency_dependent': ('lo_values', 'time'),
+        'current_frequency': ('curr', 'lo_values', 'time'),
+    }
+    HDF5_VERSION = 1
+
+    @staticmethod
+    def available_formats():
+        """可用的保存格式 (未安裝 h5py 時只有 CSV)"""
+        if h5py is None:
+            return ['csv']
+        return list(DataSaver.STORAGE_FORMATS)
+
     @staticmethod
     def create_save_directories(base_path, file_name):
         """創建新的保存目錄結構"""
@@ -40,6 +86,164 @@ class DataSaver:
     def _generate_time_axis(data_length):
         """生成時間軸 (單位: ns)"""
         return np.arange(data_length) * 0.5e-9 * 1e9
+
+    #* 掃描數據每批寫入的數值個數 (控制格式化字串的記憶體用量)
+    CSV_CHUNK_VALUES = 1_000_000
+
+    @staticmethod
+    def _write_sweep_rows(csvfile, t, sweep_data):
+        """以整塊陣列格式化寫入掃描數據列
+
+        每列為 時間, 接著各掃描點的 Real/Imag/Abs, 格式與逐點 f-string
+        ("{:.4f}" / "{:.6e}") 及 csv.writer 的 CRLF 換行完全相同.
+
+        Args:
+            csvfile: 以 newline='' 開啟的檔案
+            t: 時間軸 (時間點數,)
+            sweep_data: 複數數據 (掃描點數, 時間點數)
+        """
+        sweep_data = np.asarray(sweep_data)
+        m, n = sweep_data.shape
+        row_format = "%.4f" + ",%.6e" * (3 * m) + "\r\n"
+        rows = max(1, DataSaver.CSV_CHUNK_VALUES // (3 * m + 1))
+        for start in range(0, n, rows):
+            block = sweep_data[:, start:start + rows]
+            table = np.empty((block.shape[1], 3 * m + 1))
+            table[:, 0] = t[start:start + rows]
+            table[:, 1::3] = np.real(block).T
+            table[:, 2::3] = np.imag(block).T
+            table[:, 3::3] = np.abs(block).T
+            csvfile.write((row_format * len(table)) % tuple(table.ravel().tolist()))
+
+    @staticmethod
+    def _write_hdf5_header(h5, data_type, comments, parameters):
+        """寫入 HDF5 文件屬性及量測參數快照"""
+        h5.attrs['format_version'] = DataSaver.HDF5_VERSION
+        h5.attrs['data_type'] = DataSaver.DATA_TYPE_KEYS[data_type]
+        h5.attrs['mode'] = data_type
+        h5.attrs['comments'] = comments
+
+        #? 參數快照: 巢狀結構存為 JSON 字串, 波形陣列可由參數重新生成故不保存
+        group = h5.create_group('parameters')
+        for name, value in (parameters or {}).items():
+            if isinstance(value, (dict, list, tuple)):
+                value = json.dumps(value, ensure_ascii=False, default=str)
+            elif value is None or not np.isscalar(value):
+                continue
+            group.attrs[name] = value
+
+    @staticmethod
+    def _create_hdf5_dataset(h5, key, axes, compression=None, data=None, shape=None, dtype=None):
+        """建立 'data' 數據集 (每條波形一個分塊) 並寫入掃描軸屬性
+
+        Args:
+            key: 數據類型 (DATA_TYPE_KEYS 的值)
+            axes: 掃描軸 {名稱: 數值}
+            data: 完整數據; 為 None 時依 shape/dtype 預先配置, 未寫入的點為 NaN
+        """
+        names = DataSaver.HDF5_AXES[key]
+        if data is not None:
+            shape = data.shape
+        if len(shape) != len(names) or 0 in shape:
+            raise ValueError(f"數據維度不符: {shape}")
+
+        fill = {} if data is not None else {'fillvalue': np.full((), np.nan, dtype=dtype)}
+        dset = h5.create_dataset(
+            'data',
+            data=data,
+            shape=shape,
+            dtype=dtype if data is None else None,
+            chunks=(1,) * (len(shape) - 1) + (shape[-1],),
+            compression=compression,
+            shuffle=compression is not None,
+            **fill
+        )
+        dset.attrs['axes'] = list(names)
+        for name in names:
+            if name == 'time':
+                dset.attrs['time_step_ns'] = 0.5
+            else:
+                dset.attrs[name] = np.asarray(axes[name], dtype=float)
+        return dset
+
+    @staticmethod
+    def save_hdf5_data(data_type, data, save_info, parent=None):
+        """保存數據為 HDF5 並返回圖片保存路徑
+
+        數據集 'data' 為複數陣列, 維度依序為 [電流][頻率][時間] (其他模式為其中
+        部分維度), 每條波形為一個分塊, 可選 gzip 壓縮. 掃描軸存為 'data' 的屬性,
+        量測參數存為 'parameters' 群組的屬性.
+
+        Args:
+            data_type: 數據類型 (例如 "時域 {電流頻率} 掃描")
+            data: 與 PlotManager.update_*_plot 相同格式的數據 (時域 {單張} 為波形陣列)
+            save_info: 保存信息, 另可含 'compression' ('gzip' 或 None) 及 'parameters'
+        """
+        if h5py is None:
+            if parent:
+                QMessageBox.warning(parent, "警告", "未安裝 h5py, 無法保存 HDF5 文件")
+            return False, None
+        if data is None:
+            if parent:
+                QMessageBox.warning(parent, "警告", "沒有可用的數據")
+            return False, None
+
+        # 創建目錄結構
+        csv_dir, img_dir = DataSaver.create_save_directories(
+            save_info['base_path'], save_info['file_name']
+        )
+
+        file_path = os.path.join(csv_dir, f"{save_info['file_name']}.h5")
+
+        try:
+            key = DataSaver.DATA_TYPE_KEYS[data_type]
+            values = np.asarray(data if key == 'time_domain' else data['data'])
+
+            with h5py.File(file_path, 'w') as h5:
+                DataSaver._write_hdf5_header(h5, data_type, save_info['comments'], save_info.get('parameters'))
+                DataSaver._create_hdf5_dataset(
+                    h5, key, data if key != 'time_domain' else {},
+                    compression=save_info.get('compression'), data=values
+                )
+
+            if parent:
+                QMessageBox.information(parent, "成功", f"HDF5 數據已保存至: {file_path}")
+            return True, img_dir
+        except Exception as e:
+            if parent:
+                QMessageBox.critical(parent, "錯誤", f"保存 HDF5 數據失敗: {str(e)}")
+            return False, None
+
+    @staticmethod
+    def save_stream_hdf5(data_type, data, stream_file, save_info, parent=None):
+        """保存數據為 HDF5, 已有同類型的即時存檔時直接移入保存位置
+
+        即時存檔 (StreamWriter) 於量測結束時已是完整的 HDF5 文件, 只需移動文件並
+        寫入備註, 不必重新寫出整組數據 (壓縮設定沿用即時存檔建立時的設定).
+        即時存檔不存在或數據類型不符時改以 save_hdf5_data 寫出.
+        """
+        if h5py is None or not stream_file or not os.path.exists(stream_file):
+            return DataSaver.save_hdf5_data(data_type, data, save_info, parent)
+        with h5py.File(stream_file, 'r') as h5:
+            if h5.attrs.get('mode') != data_type:
+                return DataSaver.save_hdf5_data(data_type, data, save_info, parent)
+
+        csv_dir, img_dir = DataSaver.create_save_directories(
+            save_info['base_path'], save_info['file_name']
+        )
+        file_path = os.path.join(csv_dir, f"{save_info['file_name']}.h5")
+        try:
+            shutil.move(stream_file, file_path)
+            with h5py.File(file_path, 'r+') as h5:
+                h5.attrs['comments'] = save_info['comments']
+
+            if parent:
+                QMessageBox.information(parent, "成功", f"HDF5 數據已保存至: {file_path}")
+            return True, img_dir
+        except Exception as e:
+            if parent:
+                QMessageBox.critical(parent, "錯誤", f"保存 HDF5 數據失敗: {str(e)}")
+            return False, None
     
     @staticmethod
     def save_time_data(data, save_info, parent=None):
@@ -178,15 +382,7 @@ class DataSaver:
                                [col_type for amp in power_amplitudes for col_type in ("Real", "Imag", "Abs")])
                 
                 # 寫入數據
-                for i in range(len(t)):
-                    row = [f"{t[i]:.4f}"]
-                    for j in range(len(power_amplitudes)):
-                        row.extend([
-                            f"{np.real(power_data[j][i]):.6e}",
-                            f"{np.imag(power_data[j][i]):.6e}",
-                            f"{np.abs(power_data[j][i]):.6e}"
-                        ])
-                    writer.writerow(row)
+                DataSaver._write_sweep_rows(csvfile, t, power_data)
                     
                 # 添加空行分隔不同數據集
                 writer.writerow([])
@@ -235,15 +431,7 @@ class DataSaver:
                                [col_type for _ in freq_mhz_values for col_type in ("Real", "Imag", "Abs")])
                 
                 # 寫入數據
-                for i in range(len(t)):
-                    row = [f"{t[i]:.4f}"]
-                    for j in range(len(freq_lo_values)):
-                        row.extend([
-                            f"{np.real(freq_dep_data[j][i]):.6e}",
-                            f"{np.imag(freq_dep_data[j][i]):.6e}",
-                            f"{np.abs(freq_dep_data[j][i]):.6e}"
-                        ])
-                    writer.writerow(row)
+                DataSaver._write_sweep_rows(csvfile, t, freq_dep_data)
                     
                 # 添加空行分隔不同數據集
                 writer.writerow([])
@@ -284,6 +472,7 @@ class DataSaver:
                 raise ValueError("電流-頻率數據維度不一致")
             
             t = DataSaver._generate_time_axis(n)
+            wave_data = np.asarray(current_freq_wave_data)
             freq_mhz_values = [freq / 1e6 for freq in freq_lo_values]  # 轉為MHz
             
             with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
@@ -310,16 +499,7 @@ class DataSaver:
                     writer.writerow(sub_header)
                     
                     # 寫入時間點數據
-                    for time_idx, time_val in enumerate(t):
-                        row = [f"{time_val:.4f}"]
-                        for freq_idx in range(m):
-                            wave_data = current_freq_wave_data[current_idx][freq_idx][time_idx]
-                            row.extend([
-                                f"{np.real(wave_data):.6e}",
-                                f"{np.imag(wave_data):.6e}",
-                                f"{np.abs(wave_data):.6e}"
-                            ])
-                        writer.writerow(row)
+                    DataSaver._write_sweep_rows(csvfile, t, wave_data[current_idx])
                     
                     # 添加空行分隔不同電流值
                     writer.writerow([])
@@ -338,6 +518,85 @@ class DataSaver:
                 QMessageBox.critical(parent, "錯誤", f"保存電流-頻率數據失敗: {str(e)}")
             return False, None
 
+class StreamWriter:
+    """量測時逐點寫入的 HDF5 數據檔 (格式同 DataSaver.save_hdf5_data)
+
+    第一個波形到達時依波形長度及精度預先配置完整掃描的 'data' 數據集 (未量測
+    的點為 NaN), 之後每點直接寫入對應位置, 不需保留整組數據才能存檔. 每
+    FLUSH_POINTS 點或 FLUSH_INTERVAL 秒 flush 一次並更新 'points' 屬性 (已寫入
+    點數), 程式中斷時已 flush 的數據仍可由 FileLoader 讀取.
+
+    量測期間波形只存於本文件 (量測控制器只保留掃描軸, 即時監控只保留目前熱圖),
+    掃描結束時由 written 一次讀回; 存檔時以 DataSaver.save_stream_hdf5 移動文件即可.
+    """
+    FLUSH_POINTS = 20
+    FLUSH_INTERVAL = 5.0    #* 秒
+
+    def __init__(self, file_path, data_type, axes, parameters=None, compression=None):
+        """
+        Args:
+            file_path: HDF5 文件路徑
+            data_type: 數據類型 (例如 "時域 {電流頻率} 掃描")
+            axes: 掃描軸 {名稱: 數值}, 名稱同 DataSaver.HDF5_AXES
+        """
+        if h5py is None:
+            raise RuntimeError("即時存檔需要安裝 h5py")
+        self.file_path = file_path
+        self.key = DataSaver.DATA_TYPE_KEYS[data_type]
+        self.axes = axes
+        self.shape = tuple(len(axes[name]) for name in DataSaver.HDF5_AXES[self.key][:-1])
+        self.compression = compression
+        self.points = 0
+        self.dset = None
+        self._last_flush = time.time()
+
+        self.file = h5py.File(file_path, 'w')
+        DataSaver._write_hdf5_header(self.file, data_type, "", parameters)
+        self.file.flush()
+
+    @staticmethod
+    def create(directory, data_type, axes, parameters=None, compression=None):
+        """於指定目錄建立以時間命名的即時存檔"""
+        os.makedirs(directory, exist_ok=True)
+        file_name = f"{time.strftime('%Y%m%d_%H%M%S')}_{DataSaver.DATA_TYPE_KEYS[data_type]}.h5"
+        return StreamWriter(os.path.join(directory, file_name), data_type, axes, parameters, compression)
+
+    def append(self, waveform):
+        """依掃描順序寫入下一個掃描點的波形 (電流為外層迴圈)"""
+        waveform = np.asarray(waveform)
+        if self.dset is None:
+            self.dset = DataSaver._create_hdf5_dataset(
+                self.file, self.key, self.axes, self.compression,
+                shape=self.shape + waveform.shape, dtype=waveform.dtype
+            )
+            self.dset.attrs['points'] = 0
+        self.dset[np.unravel_index(self.points, self.shape)] = waveform
+        self.points += 1
+        if self.points % self.FLUSH_POINTS == 0 or time.time() - self._last_flush > self.FLUSH_INTERVAL:
+            self.flush()
+
+    def written(self):
+        """依掃描順序讀回已寫入的波形, shape 為 (已寫入點數, 時間點數)"""
+        if self.dset is None:
+            return np.empty((0, 0))
+        inner = int(np.prod(self.shape[1:]))
+        rows = -(-self.points // inner)
+        return self.dset[:rows].reshape(-1, self.dset.shape[-1])[:self.points]
+
+    def flush(self):
+        """將已寫入的點存入磁碟"""
+        if self.dset is not None:
+            self.dset.attrs['points'] = self.points
+        self.file.flush()
+        self._last_flush = time.time()
+
+    def close(self):
+        """flush 後關閉文件 (可重複呼叫)"""
+        if self.file.id.valid:
+            self.flush()
+            self.file.close()
+
+
 class FileLoader(QDialog):
     """文件加載對話框，支援多種數據格式的加載和可視化"""
     def __init__(self, parent=None):
@@ -350,7 +609,8 @@ class FileLoader(QDialog):
         self.settings = QSettings("MyCompany", "SHFQC_Control")
         self.load_settings()
 
-        self.plot_manager = PlotManager(self.parent)
+        #* 沿用主視窗的繪圖管理器 (共用數據快取及延後繪製狀態)
+        self.plot_manager = getattr(parent, 'plot_manager', None) or PlotManager(self.parent)
         
         self.init_ui()
         
@@ -379,7 +639,7 @@ class FileLoader(QDialog):
         file_layout.addWidget(self.browse_btn, 0, 2)
         
         # 文件列表
-        file_layout.addWidget(QLabel("CSV文件:"), 1, 0)
+        file_layout.addWidget(QLabel("數據文件:"), 1, 0)
         self.file_list = QListWidget()
         self.file_list.itemDoubleClicked.connect(self.load_selected_file)
         file_layout.addWidget(self.file_list, 1, 1, 1, 2)
@@ -427,7 +687,7 @@ class FileLoader(QDialog):
         self.file_list.clear()
         try:
             for file in os.listdir(self.file_path):
-                if file.endswith(".csv"):
+                if file.endswith((".csv", ".h5")):
                     self.file_list.addItem(file)
         except Exception as e:
             QMessageBox.warning(self, "錯誤", f"無法讀取文件夾: {str(e)}")
@@ -481,424 +741,201 @@ class FileLoader(QDialog):
             QMessageBox.critical(self, "錯誤", f"加載文件失敗: {str(e)}")
             
     def detect_and_load_file(self, file_path):
-        """檢測文件類型並加載數據 (適配新版保存格式)"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            
-            # 讀取前幾行確定文件類型
-            header = []
-            comments = []
-            for i in range(10):  # 多讀幾行確保捕獲表頭
-                try:
-                    row = next(reader)
-                    if not row:
-                        continue
-                    if row[0].startswith("#"):
-                        comments.append(row[0][2:])  # 保存註釋
-                        continue
-                    header = row
-                    break
-                except StopIteration:
-                    break
-            
-            # 根據表頭判斷文件類型
-            if header and header[0] == "Time (ns)":
-                if len(header) == 4:  # 時域數據
-                    return self.load_time_data(file_path)
-                elif len(header) > 4 and ("V" in header[1] or "MHz" in header[1]):  # 功率/頻率依賴
-                    if "V" in header[1]:
-                        return self.load_power_data(file_path)
-                    elif "MHz" in header[1]:
-                        return self.load_freq_dep_data(file_path)
-            elif header and header[0] == "Frequency (GHz)":
-                return self.load_freq_data(file_path)
-            elif header and header[0].startswith("Current = "):  # 電流-頻率數據
-                return self.load_current_freq_data(file_path)
-                
-        # 嘗試其他檢測方法
-        return self.try_detect_by_content(file_path)
-    
-    def try_detect_by_content(self, file_path):
-        """通過內容嘗試檢測文件類型"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            
-            # 讀取前100行分析列數
-            col_counts = set()
-            for i, row in enumerate(reader):
-                if i > 100:
-                    break
-                if not row or row[0].startswith("#"):
-                    continue
-                col_counts.add(len(row))
-                
-            if not col_counts:
-                raise ValueError("無法檢測文件類型 - 文件可能為空")
-                
-            col_count = max(col_counts)  # 取最常見的列數
-            
-            if col_count == 4:
-                # 可能是時域數據
-                return self.load_time_data(file_path)
-                
-            elif col_count == 6:
-                # 可能是頻域數據
-                return self.load_freq_data(file_path)
-                
-            elif col_count > 4 and col_count % 3 == 1:  # 時間列 + N組(實,虛,幅)
-                # 可能是功率或頻率依賴數據
-                with open(file_path, 'r', encoding='utf-8') as f2:
-                    reader2 = csv.reader(f2)
-                    first_row = None
-                    for row in reader2:
-                        if row and not row[0].startswith("#"):
-                            first_row = row
-                            break
-                    
-                    if first_row and ("V" in first_row[1] or "MHz" in first_row[1]):
-                        if "V" in first_row[1]:
-                            return self.load_power_data(file_path)
-                        elif "MHz" in first_row[1]:
-                            return self.load_freq_dep_data(file_path)
-                    else:
-                        # 如果沒有單位標識，嘗試作為功率數據加載
-                        return self.load_power_data(file_path)
-            
-            elif col_count > 4 and col_count % 3 == 1:
-                # 可能是電流-頻率數據
-                return self.load_current_freq_data(file_path)
-                
-        raise ValueError("無法檢測文件類型")
-    
-    def load_time_data(self, file_path):
-        """加載時域數據 (適配新版)"""
-        time = []
-        real = []
-        imag = []
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if not row or row[0].startswith("#") or row[0] == "Time (ns)":
-                    continue
-                    
-                try:
-                    time.append(float(row[0]))
-                    real.append(float(row[1]))
-                    imag.append(float(row[2]))
-                except (ValueError, IndexError):
-                    continue
-                    
-        data = np.array(real) + 1j * np.array(imag)
+        """檢測文件類型並加載數據
+
+        文件只讀取一次, 依第一個表頭 (行首) 判斷格式, 註解行不需逐行解析;
+        數值區塊以 NumPy 整批解析並直接寫入預先配置的複數陣列.
+        """
+        if file_path.endswith((".h5", ".hdf5")):
+            return self.load_hdf5_data(file_path)
+
+        with open(file_path, 'rb') as f:
+            text = f.read().replace(b"\r", b"").decode('utf-8')
+
+        match = self.CSV_HEADER.search(text)
+        if match is None:
+            return self.load_headerless_data(text)
+        if match.group(1) == "Current = ":
+            return self.load_current_freq_data(text, match.start())
+
+        header, pos = self._read_row(text, match.start())
+        if header[0] == "Frequency (GHz)":
+            return self.load_freq_data(text, pos)
+        if len(header) == 4 and header[1] == "Real":
+            return self.load_time_data(text, pos)
+        return self.load_sweep_data(header, text, pos)
+
+    # region: CSV 解析
+    #* 各格式表頭 (行首): 時域/振幅/頻率掃描, 頻域, 電流-頻率分段
+    CSV_HEADER = re.compile(r'^(Time \(ns\),|Frequency \(GHz\),|Current = )', re.M)
+
+    @staticmethod
+    def _read_row(text, pos):
+        """讀取 pos 起的一列 (csv 規則解析), 返回 (欄位, 下一列位置)"""
+        end = text.find("\n", pos)
+        if end < 0:
+            end = len(text)
+        return next(csv.reader([text[pos:end]]), []), end + 1
+
+    @staticmethod
+    def _block_end(text, pos, stop=None):
+        """數值區塊結尾 (下一個空白列或 stop)"""
+        stop = len(text) if stop is None else stop
+        end = text.find("\n\n", pos, stop)
+        return stop if end < 0 else end
+
+    @staticmethod
+    def _parse_block(text, start, end, columns):
+        """以 NumPy 整批解析逗號分隔的數值區塊, 返回 (列數, columns) 陣列"""
+        values = np.fromstring(text[start:end].strip().replace("\n", ","), sep=",")
+        if values.size % columns:
+            raise ValueError(f"數據欄數不一致 (應為 {columns} 欄)")
+        return values.reshape(-1, columns)
+
+    @staticmethod
+    def _complex_columns(table, first, out=None):
+        """由 Real/Imag 欄 (first 起每 3 欄一組) 組成複數數據 (掃描點數, 時間點數)"""
+        real = table[:, first::3].T
+        if out is None:
+            out = np.empty(real.shape, dtype=complex)
+        out.real = real
+        out.imag = table[:, first + 1::3].T
+        return out
+
+    def load_time_data(self, text, pos):
+        """加載時域數據 (表頭: Time (ns),Real,Imag,Abs)"""
+        table = self._parse_block(text, pos, len(text), 4)
+        data = np.empty(len(table), dtype=complex)
+        data.real = table[:, 1]
+        data.imag = table[:, 2]
         return "time_domain", data
-    
-    def load_freq_data(self, file_path):
-        """加載頻域數據 (適配新版)"""
-        freq = []
-        real = []
-        imag = []
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if not row or row[0].startswith("#") or row[0] == "Frequency (GHz)":
-                    continue
-                    
-                try:
-                    freq.append(float(row[0]))
-                    real.append(float(row[1]))
-                    imag.append(float(row[2]))
-                except (ValueError, IndexError):
-                    continue
-                    
-        data = np.array(real) + 1j * np.array(imag)
+
+    def load_freq_data(self, text, pos):
+        """加載頻域數據 (表頭: Frequency (GHz),Real,Imag,Abs,Magnitude (dB),Phase (rad))"""
+        table = self._parse_block(text, pos, len(text), 6)
+        data = np.empty(len(table), dtype=complex)
+        data.real = table[:, 1]
+        data.imag = table[:, 2]
         return "freq_domain", {
-            'freq': np.array(freq) * 1e9,  # 轉為Hz
+            'freq': table[:, 0] * 1e9,  # 轉為Hz
             'data': data
         }
-    
-    def load_power_data(self, file_path):
-        """加載功率依賴數據 (適配新版)"""
-        # 提取振幅值
-        amplitudes = []
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            header = None
-            for row in reader:
-                if not row or row[0].startswith("#"):
-                    continue
-                if row[0] == "Time (ns)":
-                    header = row
-                    break
-                    
-            if not header:
-                raise ValueError("未找到表頭")
-                
-            # 解析振幅值 (格式: "0.100 V" 或舊版只有數字)
-            for i in range(1, len(header), 3):
-                amp_str = header[i]
-                # 移除單位後嘗試轉換為浮點數
-                amp_str = amp_str.replace(" V", "").replace("V", "").strip()
-                try:
-                    amplitudes.append(float(amp_str))
-                except ValueError:
-                    continue
-        
-        # 加載數據
-        time = []
-        power_data = [[] for _ in range(len(amplitudes))]
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            
-            # 跳過表頭和子標題
-            header_skipped = False
-            subheader_skipped = False
-            
-            for row in reader:
-                if not row or row[0].startswith("#"):
-                    continue
-                    
-                if not header_skipped and row[0] == "Time (ns)":
-                    header_skipped = True
-                    continue
-                    
-                if header_skipped and not subheader_skipped:
-                    # 檢查是否是子標題行
-                    if "Real" in row[1] or "Imag" in row[1] or "Abs" in row[1]:
-                        subheader_skipped = True
-                        continue
-                    else:
-                        # 如果沒有子標題行，直接開始數據
-                        subheader_skipped = True
-                        
-                if header_skipped and subheader_skipped:
-                    try:
-                        time.append(float(row[0]))
-                        for i in range(len(amplitudes)):
-                            real_idx = 1 + i * 3
-                            imag_idx = real_idx + 1
-                            real_val = float(row[real_idx])
-                            imag_val = float(row[imag_idx])
-                            power_data[i].append(real_val + 1j * imag_val)
-                    except (ValueError, IndexError):
-                        continue
-                    
-        return "power_dependent", {
-            'amp': amplitudes,
-            'data': [np.array(wave) for wave in power_data]
-        }
-    
-    def load_freq_dep_data(self, file_path):
-        """加載頻率依賴數據 (適配新版)"""
-        # 提取頻率值
-        freq_values = []
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            header = None
-            for row in reader:
-                if not row or row[0].startswith("#"):
-                    continue
-                if row[0] == "Time (ns)":
-                    header = row
-                    break
-                    
-            if not header:
-                raise ValueError("未找到表頭")
-                
-            # 解析頻率值 (格式: "1000.000 MHz" 或舊版只有數字)
-            for i in range(1, len(header), 3):
-                freq_str = header[i]
-                # 移除單位後嘗試轉換為浮點數
-                freq_str = freq_str.replace(" MHz", "").replace("MHz", "").strip()
-                try:
-                    freq_values.append(float(freq_str) * 1e6)  # MHz -> Hz
-                except ValueError:
-                    continue
-        
-        # 加載數據
-        time = []
-        freq_dep_data = [[] for _ in range(len(freq_values))]
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            
-            # 跳過表頭和子標題
-            header_skipped = False
-            subheader_skipped = False
-            
-            for row in reader:
-                if not row or row[0].startswith("#"):
-                    continue
-                    
-                if not header_skipped and row[0] == "Time (ns)":
-                    header_skipped = True
-                    continue
-                    
-                if header_skipped and not subheader_skipped:
-                    # 檢查是否是子標題行
-                    if "Real" in row[1] or "Imag" in row[1] or "Abs" in row[1]:
-                        subheader_skipped = True
-                        continue
-                    else:
-                        # 如果沒有子標題行，直接開始數據
-                        subheader_skipped = True
-                        
-                if header_skipped and subheader_skipped:
-                    try:
-                        time.append(float(row[0]))
-                        for i in range(len(freq_values)):
-                            real_idx = 1 + i * 3
-                            imag_idx = real_idx + 1
-                            real_val = float(row[real_idx])
-                            imag_val = float(row[imag_idx])
-                            freq_dep_data[i].append(real_val + 1j * imag_val)
-                    except (ValueError, IndexError):
-                        continue
-                    
-        return "frequency_dependent", {
-            'lo_values': freq_values,
-            'data': [np.array(wave) for wave in freq_dep_data]
-        }
-    
-    def load_current_freq_data(self, file_path):
-        """加載電流-頻率數據 (適配新版分層結構)"""
-        currents = []
-        freq_lo_values = []
-        wave_data = {}  # {(current, freq): [complex]}
-        
-        current_val = None
-        current_freqs = []  # 當前電流下的頻率列表
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            
-            # 狀態變量
-            in_section = False
-            reading_header = False
-            reading_subheader = False
-            reading_data = False
-            
-            for row in reader:
-                if not row:
-                    continue
-                    
-                # 電流標題行 (e.g., "Current = 0.000000 A")
-                if row[0].startswith("Current = "):
-                    try:
-                        # 提取電流值
-                        current_str = row[0].split("=")[1].split("A")[0].strip()
-                        current_val = float(current_str)
-                        
-                        # 如果是新電流值，添加到列表
-                        if current_val not in currents:
-                            currents.append(current_val)
-                        
-                        in_section = True
-                        reading_header = True
-                        current_freqs = []  # 重置當前頻率列表
-                        continue
-                    except (IndexError, ValueError):
-                        continue
-                        
-                # 參數總結行 - 結束數據部分
-                if "Parameter Summary:" in row[0]:
-                    break
-                    
-                if not in_section:
-                    continue
-                    
-                # 頻率表頭行
-                if reading_header and row[0] == "Time (ns)":
-                    # 提取頻率值 (e.g., "1000.000 MHz")
-                    for cell in row[1:]:
-                        # 移除單位後嘗試轉換
-                        cell = cell.replace(" MHz", "").replace("MHz", "").strip()
-                        try:
-                            freq_val = float(cell) * 1e6  # MHz -> Hz
-                            
-                            # 添加到當前頻率列表和全局頻率列表
-                            current_freqs.append(freq_val)
-                            if freq_val not in freq_lo_values:
-                                freq_lo_values.append(freq_val)
-                        except ValueError:
-                            continue
-                    reading_header = False
-                    reading_subheader = True
-                    continue
-                    
-                # 子標題行 - 跳過
-                if reading_subheader:
-                    reading_subheader = False
-                    reading_data = True
-                    continue
-                    
-                # 數據行
-                if reading_data and row[0]:
-                    try:
-                        # 跳過時間列
-                        for i in range(len(current_freqs)):
-                            # 計算數據列索引
-                            real_idx = 1 + i * 3
-                            imag_idx = real_idx + 1
-                            
-                            # 提取實部和虛部
-                            real_val = float(row[real_idx])
-                            imag_val = float(row[imag_idx])
-                            cplx_val = real_val + 1j * imag_val
-                            
-                            # 獲取當前頻率
-                            freq_val = current_freqs[i]
-                            
-                            # 創建鍵 (電流, 頻率)
-                            key = (current_val, freq_val)
-                            
-                            # 初始化波形數據列表
-                            if key not in wave_data:
-                                wave_data[key] = []
-                            
-                            # 添加數據點
-                            wave_data[key].append(cplx_val)
-                    except (ValueError, IndexError):
-                        continue
-        
+    def load_sweep_data(self, header, text, pos):
+        """加載振幅/頻率掃描數據 (表頭: Time (ns),"0.100 V" 或 "1000.000 MHz" 每點 3 欄)"""
+        if "MHz" in header[1]:
+            data_type, unit, scale = "frequency_dependent", "MHz", 1e6
+        else:
+            data_type, unit, scale = "power_dependent", "V", 1
+        values = [float(label.replace(unit, "").strip()) * scale for label in header[1::3]]
+
+        # 跳過子標題 (Real/Imag/Abs)
+        row, data_pos = self._read_row(text, pos)
+        if len(row) > 1 and row[1] in ("Real", "Imag", "Abs"):
+            pos = data_pos
+
+        table = self._parse_block(text, pos, self._block_end(text, pos), 1 + 3 * len(values))
+        sweep_data = list(self._complex_columns(table, 1))
+        if data_type == "power_dependent":
+            return data_type, {'amp': values, 'data': sweep_data}
+        return data_type, {'lo_values': values, 'data': sweep_data}
+
+    def load_current_freq_data(self, text, start):
+        """加載電流-頻率數據 (每個電流一段: Current = x A / 頻率表頭 / 子標題 / 數據)"""
+        stop = text.find("Parameter Summary:", start)
+        stop = len(text) if stop < 0 else stop
+
+        #* 依序跳到各段開頭 (只在區塊之間搜尋, 不掃描整個數值區)
+        currents = np.empty(text.count("Current = ", start, stop))
+        freq_lo_values = None
+        current_freq_data = None
+        pos = start
+        for i in range(len(currents)):
+            # 電流標題行 (e.g., "Current = 0.001 A")
+            pos = text.find("Current = ", pos, stop)
+            line_end = text.find("\n", pos, stop)
+            current_str = text[pos:line_end].split("=")[1].replace("A", "").strip()
+            currents[i] = float(current_str)
+
+            # 頻率表頭 (e.g., "1000.000 MHz") 及子標題
+            pos = text.find("Time (ns),", line_end, stop)
+            if pos < 0:
+                raise ValueError(f"電流 {current_str} A 的數據缺少表頭")
+            header, pos = self._read_row(text, pos)
+            _, pos = self._read_row(text, pos)
+            if freq_lo_values is None:
+                freq_lo_values = np.array([float(cell.replace("MHz", "").strip()) * 1e6 for cell in header[1:]])
+
+            block_end = self._block_end(text, pos, stop)
+            table = self._parse_block(text, pos, block_end, 1 + 3 * len(freq_lo_values))
+            pos = block_end
+            if current_freq_data is None:
+                #* 以第一段的時間點數預先配置三維數據 [current][freq][time], 缺少的點為零
+                current_freq_data = np.zeros((len(currents), len(freq_lo_values), len(table)), dtype=complex)
+            rows = min(len(table), current_freq_data.shape[2])
+            self._complex_columns(table[:rows], 1, current_freq_data[i, :, :rows])
+
+        if current_freq_data is None:
+            raise ValueError("未找到電流-頻率數據")
+
         # 確保電流和頻率有序
-        unique_currents = sorted(set(currents))
-        unique_freqs = sorted(set(freq_lo_values))
-        
-        # 確定時間點數 (取第一個波形的長度)
-        first_key = next(iter(wave_data.keys()), None)
-        time_points = len(wave_data[first_key]) if first_key else 0
-        
-        # 創建三維數據結構 [current_index][freq_index][time_index]
-        current_freq_data = []
-        for current in unique_currents:
-            freq_data = []
-            for freq in unique_freqs:
-                key = (current, freq)
-                if key in wave_data:
-                    # 確保波形長度一致
-                    waveform = wave_data[key]
-                    if len(waveform) != time_points:
-                        # 如果長度不一致，截斷或填充為零
-                        if len(waveform) > time_points:
-                            waveform = waveform[:time_points]
-                        else:
-                            waveform.extend([0+0j] * (time_points - len(waveform)))
-                    freq_data.append(np.array(waveform))
-                else:
-                    # 如果缺少數據點，填充為零數組
-                    freq_data.append(np.zeros(time_points, dtype=complex))
-            current_freq_data.append(freq_data)
-        
-        # 轉換為NumPy數組
-        current_freq_data = np.array(current_freq_data)
+        current_order = np.argsort(currents, kind='stable')
+        freq_order = np.argsort(freq_lo_values, kind='stable')
         return "current_frequency", {
-            'curr': np.array(unique_currents),
-            'lo_values': np.array(unique_freqs),
-            'data': current_freq_data
+            'curr': currents[current_order],
+            'lo_values': freq_lo_values[freq_order],
+            'data': current_freq_data[current_order][:, freq_order]
         }
-    
+
+    def load_headerless_data(self, text):
+        """加載無表頭的舊版文件: 依欄數判斷時域 (4 欄) 或頻域 (6 欄)"""
+        body = "\n".join(line for line in text.splitlines() if line and not line.startswith("#"))
+        if not body:
+            raise ValueError("無法檢測文件類型 - 文件可能為空")
+
+        col_count = body.count(",", 0, body.find("\n") if "\n" in body else len(body)) + 1
+        if col_count == 4:
+            return self.load_time_data(body, 0)
+        elif col_count == 6:
+            return self.load_freq_data(body, 0)
+        raise ValueError("無法檢測文件類型")
+    # endregion
+
+    def load_hdf5_data(self, file_path):
+        """加載 HDF5 數據 (DataSaver.save_hdf5_data 格式), 返回與 CSV 加載相同的結構"""
+        if h5py is None:
+            raise ValueError("讀取 HDF5 文件需要安裝 h5py")
+
+        with h5py.File(file_path, 'r') as h5:
+            data_type = h5.attrs['data_type']
+            if 'data' not in h5:
+                #? 即時存檔於第一個掃描點寫入前中斷, 尚未配置數據集
+                raise ValueError("此 HDF5 文件沒有量測數據 (即時存檔於第一個掃描點前中斷)")
+            dset = h5['data']
+            data = dset[()]
+            axes = {name: np.asarray(dset.attrs[name]) for name in dset.attrs['axes'] if name != 'time'}
+
+            #? 即時存檔 (StreamWriter) 記錄已寫入點數: 中斷時只取已寫入的掃描點, 電流-頻率只取完整量測的電流
+            if 'points' in dset.attrs:
+                name = dset.attrs['axes'][0]
+                points = int(dset.attrs['points'])
+                if data_type == "current_frequency":
+                    points //= data.shape[1]
+                axes[name] = axes[name][:points]
+                data = data[:points]
+
+        if data_type == "time_domain":
+            return data_type, data
+        elif data_type == "freq_domain":
+            return data_type, {'freq': axes['freq'], 'data': data}
+        elif data_type == "power_dependent":
+            return data_type, {'amp': axes['amp'].tolist(), 'data': list(data)}
+        elif data_type == "frequency_dependent":
+            return data_type, {'lo_values': axes['lo_values'].tolist(), 'data': list(data)}
+        elif data_type == "current_frequency":
+            return data_type, {'curr': axes['curr'], 'lo_values': axes['lo_values'], 'data': data}
+        raise ValueError(f"未知的 HDF5 數據類型: {data_type}")
+
     def preview_data(self, data_type, data):
         """預覽數據"""
         ax = self.preview_canvas.figure.clear()
@@ -975,16 +1012,32 @@ class FileLoader(QDialog):
             self.preview_canvas.draw()
 
 class SaveSlicesWorker(QObject):
+    """切片圖片輸出工作
+
+    於線程池執行, 將切片任務交給行程池 (Agg 後端, 每個行程重複使用同一張
+    圖表模板) 繪製, 不佔用 GUI 的 GIL; 進度依完成的切片數回報, 取消時放棄
+    尚未開始的任務. 輸出模式:
+        files     : 每個掃描點一張圖片 (分批繪製)
+        animation : 每組掃描寫成單一動畫檔 (GIF/MP4/APNG)
+        sheet     : 每 SHEET_TILES 張切片排成一頁拼圖
+    """
     finished = pyqtSignal()
     progress = pyqtSignal(int)
     error = pyqtSignal(str)
-    
-    def __init__(self, plot_manager, base_dir, file_name, data_type):
+
+    CHUNK_SIZE = 64     #* files 模式每批切片數
+
+    def __init__(self, plot_manager, base_dir, file_name, data_type,
+                 dpi=DEFAULT_DPI, fmt='png', max_workers=None, mode='files'):
         super().__init__()
         self.plot_manager = plot_manager
         self.base_dir = base_dir
         self.file_name = file_name
         self.data_type = data_type
+        self.dpi = dpi
+        self.fmt = fmt
+        self.mode = mode
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
         self._cancelled = False
 
         self.power_amplitudes = plot_manager.power_amplitudes
@@ -994,105 +1047,118 @@ class SaveSlicesWorker(QObject):
     def cancel(self):
         self._cancelled = True
 
-    def create_slice_plot(self, slice_data, title):
-        """创建新的切片图表（不依赖 GUI 组件）"""
-        fig = Figure(figsize=(5, 5))
-        ax = fig.add_subplot(111)
-        
-        t = np.arange(len(slice_data)) * 0.5e-9 * 1e9
-        ax.plot(t, np.abs(slice_data), 'b-', label='振幅')
-        
-        ax.set_title(title)
-        ax.set_xlabel("時間 (ns)")
-        ax.set_ylabel("電壓 (V)")
-        ax.grid(True)
-        ax.legend()
-        
-        return fig
+    def _slice_groups(self, slices_dir):
+        """依掃描分組切片
+
+        Returns:
+            list[dict]: 每組含 dir (個別圖片目錄)、name (動畫/拼圖檔名)、title、
+                        magnitude (切片數, 時間點數)、stems (個別圖片檔名)、
+                        titles (個別圖片標題)、labels (拼圖小標題)
+        """
+        groups = []
+        if self.data_type == '時域 {振幅} 掃描':
+            amps = self.power_amplitudes
+            groups.append({
+                'dir': slices_dir,
+                'name': f"{self.file_name}_振幅掃描",
+                'title': "振幅掃描切片",
+                'magnitude': np.abs(np.asarray(self.plot_manager.power_data)),
+                'stems': [f"{self.file_name}_振幅_{amp:.3f}" for amp in amps],
+                'titles': [f"振幅掃描切片 (振幅比例: {amp:.3f})" for amp in amps],
+                'labels': [f"{amp:.3f}" for amp in amps],
+            })
+
+        elif self.data_type == '時域 {頻率} 掃描':
+            freqs_mhz = np.asarray(self.freq_lo_values) / 1e6
+            groups.append({
+                'dir': slices_dir,
+                'name': f"{self.file_name}_頻率掃描",
+                'title': "頻率掃描切片",
+                'magnitude': np.abs(np.asarray(self.plot_manager.freq_dep_data)),
+                'stems': [f"{self.file_name}_頻率_{freq:.3f}MHz" for freq in freqs_mhz],
+                'titles': [f"頻率掃描切片 (LO頻率: {freq:.3f} MHz)" for freq in freqs_mhz],
+                'labels': [f"{freq:.3f} MHz" for freq in freqs_mhz],
+            })
+
+        elif self.data_type == '時域 {電流頻率} 掃描':
+            freqs_mhz = np.asarray(self.freq_lo_values) / 1e6
+            magnitude = np.abs(np.asarray(self.plot_manager.current_freq_data))
+            #* 每個電流值一組 (個別圖片按電流值建立子目錄)
+            for current_idx, current_val in enumerate(self.current_values):
+                groups.append({
+                    'dir': os.path.join(slices_dir, f"電流_{current_val * 1e3:.3f}mA"),
+                    'name': f"{self.file_name}_電流_{current_val * 1e3:.3f}mA",
+                    'title': f"電流-頻率掃描切片 (電流: {current_val * 1e3:.3f} mA)",
+                    'magnitude': magnitude[current_idx],
+                    'stems': [f"{self.file_name}_freq_{freq:.3f}MHz" for freq in freqs_mhz],
+                    'titles': [f"電流-頻率掃描切片 (電流: {current_val:.3f} A, 頻率: {freq:.3f} MHz)"
+                               for freq in freqs_mhz],
+                    'labels': [f"{freq:.3f} MHz" for freq in freqs_mhz],
+                })
+        return groups
+
+    def _submit_tasks(self, executor, groups, slices_dir):
+        """依輸出模式提交行程池任務"""
+        futures = []
+        if self.mode == 'files':
+            jobs = []
+            for group in groups:
+                os.makedirs(group['dir'], exist_ok=True)
+                jobs.extend(
+                    (os.path.join(group['dir'], f"{stem}.{self.fmt}"), magnitude, title)
+                    for stem, magnitude, title in zip(group['stems'], group['magnitude'], group['titles'])
+                )
+            for i in range(0, len(jobs), self.CHUNK_SIZE):
+                futures.append(executor.submit(render_slices, jobs[i:i + self.CHUNK_SIZE], self.dpi, self.fmt))
+            return futures
+
+        for group in groups:
+            magnitude = group['magnitude']
+            peak = float(np.max(magnitude)) if magnitude.size else 1.0
+            ylim = (0, peak * 1.05 if peak > 0 else 1.0)
+            if self.mode == 'animation':
+                path = os.path.join(slices_dir, f"{group['name']}.{self.fmt}")
+                futures.append(executor.submit(
+                    render_animation, path, magnitude, group['titles'], ylim, self.dpi, self.fmt
+                ))
+            else:
+                n_pages = -(-len(magnitude) // SHEET_TILES)
+                for page, start in enumerate(range(0, len(magnitude), SHEET_TILES), start=1):
+                    stop = start + SHEET_TILES
+                    suffix = f"_{page}" if n_pages > 1 else ""
+                    path = os.path.join(slices_dir, f"{group['name']}_拼圖{suffix}.{self.fmt}")
+                    futures.append(executor.submit(
+                        render_contact_sheet, path, magnitude[start:stop], group['labels'][start:stop],
+                        f"{group['title']} ({page}/{n_pages})", ylim, self.dpi, self.fmt
+                    ))
+        return futures
     
     def run(self):
         try:
             slices_dir = os.path.join(self.base_dir, "切片圖片")
             os.makedirs(slices_dir, exist_ok=True)
             
-            total = 0
-            if self.data_type == '時域 {振幅} 掃描':
-                total = len(self.power_amplitudes)
-            elif self.data_type == '時域 {頻率} 掃描':
-                total = len(self.freq_lo_values)
-            elif self.data_type == '時域 {電流頻率} 掃描':
-                total = len(self.current_values) * len(self.freq_lo_values)
-            
+            groups = self._slice_groups(slices_dir)
+            total = sum(len(group['magnitude']) for group in groups)
             if total == 0:
                 self.finished.emit()
                 return
-            
+
+            #* 工作行程沿用主程式的字型設定 (中文標題)
+            rc_params = {key: matplotlib.rcParams[key]
+                         for key in ('font.family', 'font.sans-serif', 'axes.unicode_minus')}
             count = 0
-            
-            # 保存功率扫描的所有切片
-            if self.data_type == '時域 {振幅} 掃描':
-                for i in range(len(self.power_amplitudes)):
+            with ProcessPoolExecutor(max_workers=self.max_workers,
+                                     initializer=init_worker, initargs=(rc_params,)) as executor:
+                futures = self._submit_tasks(executor, groups, slices_dir)
+                for future in as_completed(futures):
                     if self._cancelled:
+                        for pending in futures:
+                            pending.cancel()
                         break
-                    
-                    slice_data = self.plot_manager.power_data[i]
-                    amp = self.power_amplitudes[i]
-                    slice_path = os.path.join(slices_dir, f"{self.file_name}_振幅_{amp:.3f}.png")
-                    
-                    fig = self.create_slice_plot(slice_data, f"振幅掃描切片 (振幅比例: {amp:.3f})")
-                    fig.savefig(slice_path, dpi=100, bbox_inches='tight')
-                    plt.close(fig)
-                    
-                    count += 1
+                    count += future.result()
                     self.progress.emit(int(count * 100 / total))
             
-            # 保存频率扫描的所有切片
-            elif self.data_type == '時域 {頻率} 掃描':
-                for i in range(len(self.freq_lo_values)):
-                    if self._cancelled:
-                        break
-                    
-                    slice_data = self.plot_manager.freq_dep_data[i]
-                    freq_mhz = self.freq_lo_values[i] / 1e6
-                    slice_path = os.path.join(slices_dir, f"{self.file_name}_頻率_{freq_mhz:.3f}MHz.png")
-                    
-                    fig = self.create_slice_plot(slice_data, f"頻率掃描切片 (LO頻率: {freq_mhz:.3f} MHz)")
-                    fig.savefig(slice_path, dpi=100, bbox_inches='tight')
-                    plt.close(fig)  # 关闭图表释放内存
-                    
-                    count += 1
-                    self.progress.emit(int(count * 100 / total))
-            
-            # 保存电流-频率扫描的所有切片
-            elif self.data_type == '時域 {電流頻率} 掃描':
-                # 按电流值创建子目录_single
-                for current_idx, current_val in enumerate(self.current_values):
-                    if self._cancelled:
-                        break
-                    
-                    current_dir = os.path.join(slices_dir, f"電流_{current_val:.3f}A")
-                    os.makedirs(current_dir, exist_ok=True)
-                    
-                    # 保存该电流下所有频率的切片
-                    for freq_idx in range(len(self.freq_lo_values)):
-                        if self._cancelled:
-                            break
-                        
-                        slice_data = self.plot_manager.current_freq_data[current_idx][freq_idx]
-                        freq_mhz = self.freq_lo_values[freq_idx] / 1e6
-                        slice_path = os.path.join(current_dir, f"{self.file_name}_freq_{freq_mhz:.3f}MHz.png")
-                        
-                        # 创建新图表并保存
-                        fig = self.create_slice_plot(
-                            slice_data, 
-                            f"電流-頻率掃描切片 (電流: {current_val:.3f} A, 頻率: {freq_mhz:.3f} MHz)"
-                        )
-                        fig.savefig(slice_path, dpi=1000, bbox_inches='tight')
-                        plt.close(fig)  # 关闭图表释放内存
-                        
-                        count += 1
-                        self.progress.emit(int(count * 100 / total))
-            
             if not self._cancelled:
                 self.finished.emit()
         
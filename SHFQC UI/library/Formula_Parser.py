@@ -1,4 +1,5 @@
 import cmath
+import threading
 import numpy as np
 import ast
 
@@ -14,15 +15,39 @@ class FormulaParser:
         'pi': cmath.pi, 'e': cmath.e, 'j': 1j, 'i': 1j,
         'sinc': lambda x: np.sinc(x/np.pi) if isinstance(x, np.ndarray) else (np.sinc(x/np.pi) if x != 0 else 1)
     }
+
+    # 向量化計算用的 NumPy 對應函式 (負數開根號/取對數與 cmath 相同回傳複數)
+    ARRAY_FUNCTIONS = {
+        'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+        'exp': np.exp, 'log': np.emath.log, 'sqrt': np.emath.sqrt,
+        'abs': np.abs, 'phase': np.angle, 'real': np.real,
+        'imag': np.imag, 'conj': np.conjugate,
+        'pi': cmath.pi, 'e': cmath.e, 'j': 1j, 'i': 1j,
+        'sinc': lambda x: np.sinc(np.asarray(x)/np.pi)
+    }
     
+    # 全程序共用的已編譯公式快取 {正規化公式: (AST, 變量集合, 編譯碼)}
+    CACHE_SIZE = 256
+    _compiled_cache = {}
+    _cache_lock = threading.Lock()
+
     def __init__(self):
         self.variables = set() # 參數名稱儲存
         self.parameters = {} #參數數值儲存
         self.tree = None
+        self.code = None # 編譯後的公式
         
     def parse(self, formula: str):
         """解析公式并返回AST"""
         self.variables.clear()
+        key = self.normalize(formula)
+        with self._cache_lock:
+            cached = self._compiled_cache.get(key)
+        if cached is not None:
+            self.tree, variables, self.code = cached
+            self.variables.update(variables)
+            return True
+
         try:
             # 確保公式以表達式形式處理
             if not formula.strip().startswith('('):
@@ -30,9 +55,20 @@ class FormulaParser:
                 
             self.tree = ast.parse(formula, mode='eval')
             self._collect_variables(self.tree.body)
-            return True
+            self.code = compile(self.tree, '<string>', 'eval')
         except SyntaxError as e:
             raise ValueError(f"公式語法錯誤: {e.msg} (位置 {e.lineno}:{e.offset})")
+
+        with self._cache_lock:
+            if len(self._compiled_cache) >= self.CACHE_SIZE:
+                self._compiled_cache.pop(next(iter(self._compiled_cache)))
+            self._compiled_cache[key] = (self.tree, frozenset(self.variables), self.code)
+        return True
+
+    @staticmethod
+    def normalize(formula: str) -> str:
+        """正規化公式文字 (去除多餘空白) 作為快取鍵"""
+        return " ".join(formula.split())
             
     def _collect_variables(self, node: ast.AST):
         """變量名蒐集"""
@@ -72,12 +108,47 @@ class FormulaParser:
         env = {**self.MATH_FUNCTIONS, **parameters}
         
         try:
-            code = compile(self.tree, '<string>', 'eval')
-            value = eval(code, {'__builtins__': None}, env)
+            value = eval(self.code, {'__builtins__': None}, env)
             
             # 確保返回的是數組
             if isinstance(value, (int, float, complex)):
                 return np.full_like(t_array, value)
             return value
         except Exception as e:
-            raise ValueError(f"計算錯誤: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"計算錯誤: {str(e)}")
+
+    def evaluate_array(self, parameters: dict, t_array: np.ndarray):
+        """以 NumPy 向量化計算整個時間數組
+
+        結果出現錯誤或非有限值時, 退回以 cmath 逐點計算, 與 evaluate 結果一致.
+        """
+        if self.tree is None:
+            raise ValueError("需先解析公式")
+
+        t_array = np.asarray(t_array, dtype=float)
+        missing = self.variables - parameters.keys() - {'t', 'time'}
+        if missing:
+            raise ValueError(f"缺少參數: {missing}")
+
+        env = {**self.ARRAY_FUNCTIONS, **parameters, 't': t_array, 'time': t_array}
+        try:
+            with np.errstate(all='ignore'):
+                value = eval(self.code, {'__builtins__': None}, env)
+            value = np.broadcast_to(np.asarray(value, dtype=complex), t_array.shape)
+            if np.all(np.isfinite(value)):
+                return np.array(value)
+        except Exception:
+            pass
+        return self._evaluate_pointwise(parameters, t_array)
+
+    def _evaluate_pointwise(self, parameters: dict, t_array: np.ndarray):
+        """逐點計算公式值 (向量化失敗時的後備)"""
+        env = {**self.MATH_FUNCTIONS, **parameters}
+        result = np.empty(t_array.shape, dtype=complex)
+        try:
+            for idx, t in enumerate(t_array.tolist()):
+                env['t'] = env['time'] = t
+                result[idx] = eval(self.code, {'__builtins__': None}, env)
+        except Exception as e:
+            raise ValueError(f"計算錯誤: {str(e)}")
+        return result
\ No newline at end of file
@@ -4,11 +4,13 @@ from PyQt6.QtWidgets import (
     QProgressBar, QPushButton, QTableWidget, QTableWidgetItem,
     QHeaderView, QSplitter, QWidget
 )
-from PyQt6.QtCore import Qt
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from PyQt6.QtCore import Qt, QTimer
+from .plot_manager import DecimatedLine
+from .plot_backend import PlotBackend
 
 class RealTimeMonitorDialog(QDialog):
+    MAP_REFRESH_MS = 200    #* pyqtgraph 熱圖整張影像的最短更新間隔
+
     def __init__(self, measurement_type, parent=None):
         super().__init__(parent)
         self.setWindowTitle(f"實時監控 - {measurement_type}")
@@ -16,6 +18,23 @@ class RealTimeMonitorDialog(QDialog):
         
         #* 切換顯示模式
         self.measurement_type = measurement_type
+        self.trace = None   #* 持續存在的軌跡 (matplotlib 為 DecimatedLine, pyqtgraph 為 PlotDataItem), 首次繪製時建立
+        self.time_axis = np.empty(0)    #* 軌跡時間軸快取 (點數改變時才重建)
+        self.param_keys = []            #* 參數表格目前的列 (參數名稱)
+        self.plot_backend = PlotBackend.resolve(getattr(parent, 'plot_backend', PlotBackend.DEFAULT))
+        #* 即時熱圖狀態 (set_sweep 設定掃描軸後啟用)
+        self.sweep_values = None    # 熱圖各列對應的掃描值
+        self.sweep_label = ""
+        self.map_data = None        # 預先配置的影像 (未量測的列為 NaN/遮罩)
+        self.map_image = None
+        self.map_row = 0            # 下一個要填入的列
+        self.map_key = None         # 電流頻率掃描目前的電流值 (改變時重置熱圖)
+        self.map_clim = None
+        #* pyqtgraph 的 ImageItem 每次 setImage 都重繪整張影像, 改以計時器節流
+        self.map_timer = QTimer(self)
+        self.map_timer.setSingleShot(True)
+        self.map_timer.setInterval(self.MAP_REFRESH_MS)
+        self.map_timer.timeout.connect(self._flush_map)
         self._init_ui()
         
     def _init_ui(self):
@@ -65,10 +84,18 @@ class RealTimeMonitorDialog(QDialog):
         self.plot_group = QGroupBox("實時數據")
         plot_layout = QVBoxLayout(self.plot_group)
         
-        self.figure = Figure(figsize=(10, 6))
-        self.canvas = FigureCanvas(self.figure)
-        self.ax = self.figure.add_subplot(111)
-        plot_layout.addWidget(self.canvas)
+        #* 上方為掃描至今的熱圖, 下方為最新軌跡
+        plot_splitter = QSplitter(Qt.Orientation.Vertical)
+        self.map_canvas = PlotBackend.create_canvas(self.plot_backend, 'image', (10, 4))
+        if not PlotBackend.is_fast(self.map_canvas):
+            self.map_ax = self.map_canvas.figure.add_subplot(111)
+        self.canvas = PlotBackend.create_canvas(self.plot_backend, 'trace', (10, 4))
+        if not PlotBackend.is_fast(self.canvas):
+            self.figure = self.canvas.figure
+            self.ax = self.figure.add_subplot(111)
+        plot_splitter.addWidget(self.map_canvas)
+        plot_splitter.addWidget(self.canvas)
+        plot_layout.addWidget(plot_splitter)
         
         right_layout.addWidget(self.plot_group)
         
@@ -104,17 +131,27 @@ class RealTimeMonitorDialog(QDialog):
         if not isinstance(param_dict, dict):
             return
         
-        # 設置表格行數
-        self.params_table.setRowCount(len(param_dict))
-        
-        # 填充表格
-        for i, (key, value) in enumerate(param_dict.items()):
-            self.params_table.setItem(i, 0, QTableWidgetItem(str(key)))
-            self.params_table.setItem(i, 1, QTableWidgetItem(str(value)))
-        
-        # 自動調整列寬
-        self.params_table.resizeColumnsToContents()
+        #* 參數名稱改變時才重建表格列, 否則只更新數值文字
+        keys = list(param_dict.keys())
+        if keys != self.param_keys:
+            self.param_keys = keys
+            self.params_table.setRowCount(len(keys))
+            for i, key in enumerate(keys):
+                self.params_table.setItem(i, 0, QTableWidgetItem(str(key)))
+                self.params_table.setItem(i, 1, QTableWidgetItem())
+            self.params_table.resizeColumnsToContents()
+
+        for i, value in enumerate(param_dict.values()):
+            self.params_table.item(i, 1).setText(str(value))
     
+    def set_sweep(self, values, label):
+        """設定掃描軸 (熱圖縱軸), 影像於收到第一條軌跡時依點數預先配置"""
+        self.sweep_values = np.asarray(values, dtype=float)
+        self.sweep_label = label
+        self.map_data = None
+        self.map_row = 0
+        self.map_key = None
+
     def update_plot(self, data):
         """根據測量類型更新繪圖"""
         if not isinstance(data, tuple) or len(data) < 2 or data[0] != 'data':
@@ -131,59 +168,148 @@ class RealTimeMonitorDialog(QDialog):
         elif self.measurement_type == "時域 {電流頻率} 掃描":
             self._update_current_freq_plot(plot_data)
         
-        self.canvas.draw()
+        if not PlotBackend.is_fast(self.canvas):
+            self.canvas.draw_idle()
+        if self.map_data is not None and not PlotBackend.is_fast(self.map_canvas):
+            self.map_canvas.draw_idle()
     
     def _update_power_plot(self, data):
         """更新時域 {振幅} 掃描"""
         if len(data) < 2:
             return
-        self.ax.cla()
 
         #* 數據格式: (amp, waveform)
         amp, waveform = data
-        time_axis = np.arange(len(waveform)) * 0.5e-9 * 1e9
-        
-        self.ax.plot(time_axis, np.abs(waveform), 'b-', label='振幅')
-        self.ax.set_xlabel("時間 (ns)")
-        self.ax.set_ylabel("電壓 (V)")
-        self.ax.set_title(f"振幅比例: {amp:.3f}")
-        self.ax.legend()
-        self.ax.grid(True)
+        self._plot_trace(waveform, f"振幅比例: {amp:.3f}")
+        self._update_map(waveform, amp, "時域 {振幅} 掃描熱圖")
     
     def _update_freq_dep_plot(self, data):
         """更新時域 {頻率} 掃描"""
         if len(data) < 2:
             return
-        self.ax.cla()
 
         #* 數據格式: (freq, waveform)
         freq, waveform = data
-        time_axis = np.arange(len(waveform)) * 0.5e-9 * 1e9 
-        
-        self.ax.plot(time_axis, np.abs(waveform), 'b-', label='振幅')
-        self.ax.set_xlabel("時間 (ns)")
-        self.ax.set_ylabel("電壓 (V)")
-        self.ax.set_title(f"頻率: {freq/1e6:.3f} MHz")
-        self.ax.legend()
-        self.ax.grid(True)
+        self._plot_trace(waveform, f"頻率: {freq/1e6:.3f} MHz")
+        self._update_map(waveform, freq/1e6, "時域 {頻率} 掃描熱圖")
     
     def _update_current_freq_plot(self, data):
         """更新時域 {電流頻率} 掃描"""
         if len(data) < 3:
             return
-        self.ax.cla()
 
         # 數據格式: (current, freq, waveform)
         current, freq, waveform = data
-        time_axis = np.arange(len(waveform)) * 0.5e-9 * 1e9
-        
-        self.ax.plot(time_axis, np.abs(waveform), 'b-', label='振幅')
-        self.ax.set_xlabel("時間 (ns)")
-        self.ax.set_ylabel("電壓 (V)")
-        self.ax.set_title(f"電流: {current*1000:.3f} mA, 頻率: {freq/1e6:.3f} MHz")
-        self.ax.legend()
-        self.ax.grid(True)
+        self._plot_trace(waveform, f"電流: {current*1000:.3f} mA, 頻率: {freq/1e6:.3f} MHz")
+        #* 每個電流值重新累積一張頻率-時間熱圖
+        if current != self.map_key:
+            self.map_key = current
+            self._reset_map()
+        self._update_map(waveform, freq/1e6, f"電流為 {current*1000:.3f} mA 的掃描熱圖")
+
+    def _plot_trace(self, waveform, title):
+        """繪製單條時域軌跡 (依後端選擇 pyqtgraph 或 matplotlib)
+
+        軌跡線、座標軸標籤、圖例與格線只在第一次建立, 之後只更新數據與標題.
+        """
+        if len(self.time_axis) != len(waveform):
+            self.time_axis = np.arange(len(waveform)) * 0.5e-9 * 1e9
+        magnitude = np.abs(waveform)
+        if PlotBackend.is_fast(self.canvas):
+            self.canvas.set_trace(self.time_axis, magnitude)
+            self.canvas.setTitle(title)
+            if self.trace is None:
+                self.canvas.set_labels("時間 (ns)", "電壓 (V)")
+                self.trace = self.canvas.curve
+            return
+
+        if self.trace is None:
+            self.trace = DecimatedLine.plot(self.ax, self.time_axis, magnitude, 'b-', label='振幅')
+            self.ax.set_xlabel("時間 (ns)")
+            self.ax.set_ylabel("電壓 (V)")
+            self.ax.legend()
+            self.ax.grid(True)
+        else:
+            self.trace.set_data(self.time_axis, magnitude)
+            self.ax.relim()
+            self.ax.autoscale_view()
+        self.ax.set_title(title)
     
+    def _reset_map(self):
+        """清空熱圖 (保留已配置的影像記憶體)"""
+        if self.map_data is not None:
+            self.map_data[:] = np.ma.masked if np.ma.isMaskedArray(self.map_data) else np.nan
+        self.map_row = 0
+        self.map_clim = None
+
+    def _update_map(self, waveform, marker, title):
+        """將最新軌跡填入熱圖的下一列
+
+        影像只在第一次 (或軌跡點數改變時) 配置, 之後每點只寫入一列並更新標記線,
+        色階僅在數值超出目前範圍時擴張 (預留 10%), 每點的成本與掃描大小無關.
+        pyqtgraph 只能整張替換影像, 由 map_timer 節流送出, 不在每點送出.
+        """
+        if self.sweep_values is None or not len(self.sweep_values):
+            return
+        magnitude = np.abs(waveform)
+        if self.map_data is None or self.map_data.shape[1] != len(magnitude):
+            self._create_map(len(magnitude))
+        row = self.map_row % len(self.sweep_values)
+        self.map_data[row] = magnitude
+        self.map_row += 1
+
+        #* 節流的色階自動縮放
+        lo, hi = float(np.nanmin(magnitude)), float(np.nanmax(magnitude))
+        rescale = self.map_clim is None or lo < self.map_clim[0] or hi > self.map_clim[1]
+        if rescale:
+            if self.map_clim is not None:
+                lo, hi = min(lo, self.map_clim[0]), max(hi, self.map_clim[1])
+            self.map_clim = (lo, hi + 0.1 * (hi - lo) if hi > lo else hi + 1e-12)
+
+        if PlotBackend.is_fast(self.map_canvas):
+            self.map_canvas.set_marker(marker)
+            self.map_canvas.setTitle(title)
+            if not self.map_timer.isActive():
+                self.map_timer.start()
+            return
+
+        self.map_image.changed()
+        if rescale:
+            self.map_image.set_clim(*self.map_clim)
+        self.map_marker.set_ydata([marker, marker])
+        self.map_ax.set_title(title)
+
+    def _flush_map(self):
+        """將目前的熱圖影像送至 pyqtgraph (每 MAP_REFRESH_MS 至多一次)"""
+        if self.map_data is not None and self.map_clim is not None:
+            self.map_canvas.set_image(self.map_data, self.map_extent, self.map_clim)
+
+    def _create_map(self, n_samples):
+        """依軌跡點數預先配置熱圖影像"""
+        values = self.sweep_values
+        y0, y1 = values[0], values[-1]
+        if y0 == y1:
+            y0, y1 = y0 - 0.5, y1 + 0.5
+        self.map_extent = [0, n_samples * 0.5, y0, y1]
+        self.map_row = 0
+        self.map_clim = None
+        if PlotBackend.is_fast(self.map_canvas):
+            self.map_data = np.full((len(values), n_samples), np.nan)
+            self.map_canvas.set_labels("時間 (ns)", self.sweep_label, "|single| (V)")
+            return
+
+        self.map_canvas.figure.clear()
+        self.map_ax = self.map_canvas.figure.add_subplot(111)
+        data = np.ma.masked_all((len(values), n_samples), dtype=float)
+        self.map_image = self.map_ax.imshow(data, cmap='coolwarm', aspect='auto',
+                                            extent=self.map_extent, origin='lower')
+        #* 直接寫入 AxesImage 持有的遮罩陣列, 之後只需 changed() 使快取失效
+        self.map_data = self.map_image.get_array()
+        self.map_marker = self.map_ax.axhline(y=values[0], color='yellow', linestyle='--', linewidth=2)
+        self.map_canvas.figure.colorbar(self.map_image, ax=self.map_ax).set_label("|single| (V)")
+        self.map_ax.set_xlabel("時間 (ns)")
+        self.map_ax.set_ylabel(self.sweep_label)
+
     def reject(self):
         """使用者點擊中止按鈕"""
         super().reject()
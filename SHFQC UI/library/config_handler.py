@@ -5,6 +5,16 @@ class ConfigHandler:
     def __init__(self, config_path):
         self.config_path = config_path 
         
+    def read_value(self, section, key, default=None):
+        """讀取單一設定值 (介面建立前需要的設定, 如繪圖後端)"""
+        config = configparser.ConfigParser()
+        try:
+            config.read(self.config_path, encoding='utf-8-sig')
+        except (configparser.Error, UnicodeDecodeError) as e:
+            print(f"讀取配置文件失敗: {e}")
+            return default
+        return config.get(section, key, fallback=default)
+
     def load(self, gui):
         """加載配置文件"""
         config = configparser.ConfigParser()
@@ -32,6 +42,14 @@ class ConfigHandler:
             gui.center_freq_spin.setValue(float(config['主要參數'].get('中心頻率', 5e9)))
             gui.digital_lo_spin.setValue(float(config['主要參數'].get('混頻頻率', 1e6)))
             gui.gain_spin.setValue(float(config['主要參數'].get('波型增益', 1.0)))
+            precision_idx = gui.precision_combo.findData(config['主要參數'].get('數據精度', 'complex128'))
+            gui.precision_combo.setCurrentIndex(max(precision_idx, 0))
+            backend_idx = gui.plot_backend_combo.findData(config['主要參數'].get('繪圖後端', gui.plot_backend))
+            gui.plot_backend_combo.setCurrentIndex(max(backend_idx, 0))
+            gui.stream_save_check.setChecked(
+                gui.stream_save_check.isEnabled() and config['主要參數'].get('即時存檔', 'False') == 'True'
+            )
+            gui.stream_dir_edit.setText(config['主要參數'].get('即時存檔目錄', gui.stream_dir_edit.text()))
 
             #* range數值查找及設置
             input_idx = self._find_combo_index(gui.input_range_combo, input_val)
@@ -106,6 +124,13 @@ class ConfigHandler:
             gui.freq_stop_current_freq.setValue(float(config['量測參數'].get('時域電流頻率_終止頻率', 0)))
             gui.freq_points_current_freq.setValue(int(config['量測參數'].get('時域電流頻率_頻率量測點數', 10)))
 
+            settle_idx = gui.settle_mode_combo.findText(config['量測參數'].get('時域電流頻率_穩定判定', '讀回電流'))
+            gui.settle_mode_combo.setCurrentIndex(max(settle_idx, 0))
+            gui.settle_tol_spin.setValue(float(config['量測參數'].get('時域電流頻率_穩定容差', 0.001)))
+            gui.settle_probe_tol_spin.setValue(float(config['量測參數'].get('時域電流頻率_探測容差', 0.001)))
+            gui.settle_min_wait_spin.setValue(float(config['量測參數'].get('時域電流頻率_最短等待', 0.02)))
+            gui.settle_timeout_spin.setValue(float(config['量測參數'].get('時域電流頻率_等待逾時', 2.0)))
+
             #? 頻域 {單張} 量測參數設置
             gui.lo_start_spin.setValue(float(config['量測參數'].get('頻域單張_起始頻率', -80e6)))
             gui.lo_stop_spin.setValue(float(config['量測參數'].get('頻域單張_中止頻率', -60e6)))
@@ -125,7 +150,11 @@ class ConfigHandler:
             '輸出功率': to_str(gui.output_range_combo.currentData()),
             '中心頻率': to_str(gui.center_freq_spin.value()),
             '混頻頻率': to_str(gui.digital_lo_spin.value()),
-            '波型增益': to_str(gui.gain_spin.value())
+            '波型增益': to_str(gui.gain_spin.value()),
+            '數據精度': to_str(gui.precision_combo.currentData()),
+            '繪圖後端': to_str(gui.plot_backend_combo.currentData()),
+            '即時存檔': to_str(gui.stream_save_check.isChecked()),
+            '即時存檔目錄': to_str(gui.stream_dir_edit.text())
         }
 
         custom_params = getattr(gui, 'custom_params', {})
@@ -178,6 +207,11 @@ class ConfigHandler:
             '時域電流頻率_起始頻率': to_str(gui.freq_start_current_freq.value()),
             '時域電流頻率_終止頻率': to_str(gui.freq_stop_current_freq.value()),
             '時域電流頻率_頻率量測點數': to_str(gui.freq_points_current_freq.value()),
+            '時域電流頻率_穩定判定': to_str(gui.settle_mode_combo.currentText()),
+            '時域電流頻率_穩定容差': to_str(gui.settle_tol_spin.value()),
+            '時域電流頻率_探測容差': to_str(gui.settle_probe_tol_spin.value()),
+            '時域電流頻率_最短等待': to_str(gui.settle_min_wait_spin.value()),
+            '時域電流頻率_等待逾時': to_str(gui.settle_timeout_spin.value()),
             
             '頻域單張_起始頻率': to_str(gui.lo_start_spin.value()),
             '頻域單張_中止頻率': to_str(gui.lo_stop_spin.value()),
@@ -1,9 +1,13 @@
+import os
 import threading
+import configparser
 import numpy as np
 import time
+from contextlib import contextmanager
 from typing import Tuple,List
 
 from zhinst.toolkit import SHFQAChannelMode, Waveforms
+from pyvisa import ResourceManager
 
 class SHFQC:
     """
@@ -129,8 +133,10 @@ class SHFQC:
         trigger_delay=trigger_delay,
     )
 
-    def qa_measure_signal(self, n_mea, readout_duration):
+    def qa_measure_signal(self, n_mea, readout_duration, dtype=None):
         """Perform measurement and return the result.
+
+        dtype casts the trace, e.g. np.complex64 to halve the buffer size.
         
         Example usage:
         >>> # measured time domain signal
@@ -172,7 +178,9 @@ class SHFQC:
 
         # get results to calculate weights and plot data
         scope_data, *_ = self.device.scopes[0].read()
-        return scope_data[0]
+        if dtype is None:
+            return scope_data[0]
+        return np.asarray(scope_data[0], dtype=dtype)
 
 
     def qa_measure_spectrum(
@@ -237,7 +245,80 @@ class SHFQC:
         result = sweeper.run()
         if plot: sweeper.plot()
         return result['vector']
-    
+
+
+class SettlePolicy:
+    """電流步進後的穩定判定策略
+
+    每次設定新電流後, 先等待 min_wait 秒, 再以 poll_interval 為間隔輪詢讀值,
+    連續 n_stable 筆讀值的變化皆在 tolerance 內即視為穩定, 超過 timeout 秒則放棄等待.
+    多台儀器於同一輪詢迴圈內判定, min_wait 與 timeout 每次步進只計一次.
+
+    讀值來源:
+        probe 為 None 時讀取各 YOKOGAWA 的量測值 (:MEAS?), 需先以 supports_measurement
+        確認設備具備量測功能. 電流源的監測讀值可能為互補量 (電壓), 因此只比較連續
+        讀值間的差異, 不與設定值比較;
+        給定 probe (無參數, 回傳 float) 時改用其結果, 例如以 SHFQC 量測訊號強度作為探測.
+        measured 為 False 時不讀值, 僅固定等待 min_wait 秒.
+
+    Example usage:
+    >>> policy = SettlePolicy(tolerance=1e-6, min_wait=0.02, timeout=2.0)
+    >>> for yoko in yokos: yoko.output_value(1e-3)
+    >>> policy.wait(*yokos)
+    """
+
+    def __init__(
+            self, tolerance: float, min_wait: float=0.0, timeout: float=5.0,
+            poll_interval: float=0.02, n_stable: int=3, probe=None,
+            measured: bool=True
+        ):
+        self.tolerance = tolerance
+        self.min_wait = min_wait
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.n_stable = max(1, n_stable)
+        self.probe = probe
+        self.measured = measured
+
+    @staticmethod
+    def supports_measurement(yoko) -> bool:
+        """查詢一次 :MEAS?, 判定設備是否具備量測功能"""
+        try:
+            yoko.get_measured_value()
+            return True
+        except Exception:
+            return False
+
+    def _is_stable(self, readings: list) -> bool:
+        """判定最近 n_stable 筆讀值是否穩定"""
+        if len(readings) < self.n_stable:
+            return False
+        recent = readings[-self.n_stable:]
+        return max(recent) - min(recent) <= self.tolerance
+
+    def wait(self, *yokos):
+        """等待所有 yoko (或探測值) 穩定, 穩定回傳 True, 逾時回傳 False, 固定等待回傳 None"""
+        start = time.monotonic()
+        if self.min_wait > 0:
+            time.sleep(self.min_wait)
+        if self.probe is None and not self.measured:
+            return None
+
+        if self.probe is not None:
+            sources = [lambda: float(self.probe())]
+        else:
+            sources = [yoko.get_measured_value for yoko in yokos]
+        readings = [[] for _ in sources]
+        while True:
+            for source, history in zip(sources, readings):
+                if not self._is_stable(history):
+                    history.append(source())
+            if all(self._is_stable(history) for history in readings):
+                return True
+            if time.monotonic() - start >= self.timeout:
+                return False
+            time.sleep(self.poll_interval)
+
 
 class YOKOGAWA:
     """高階YOKOGAWA控制物件"""
@@ -245,10 +326,32 @@ class YOKOGAWA:
     def __init__(self, id: str, visa_resource):
         self.id = id
         self.visa_resource = visa_resource
+        self.lock = threading.RLock()   #* 序列化同一儀器的存取 (控制對話框作業與量測線程共用)
+        self.session = threading.Lock() #* 整段作業/掃描的獨占權, 見 exclusive
+
+    @staticmethod
+    @contextmanager
+    def exclusive(yokos: list):
+        """取得多台儀器整段作業的獨占權, 任一台已被占用時拋出 RuntimeError
+
+        控制對話框的作業與量測掃描共用連線池內的儀器, 兩者須互斥,
+        避免兩條電流路徑交錯寫入同一電源.
+        """
+        acquired = []
+        try:
+            for yoko in yokos:
+                if not yoko.session.acquire(blocking=False):
+                    raise RuntimeError(f"YOKOGAWA {yoko.id} 使用中 (量測或其他作業進行中)")
+                acquired.append(yoko)
+            yield
+        finally:
+            for yoko in acquired:
+                yoko.session.release()
 
     def visa_write(self, command):
         """寫入SCPI命令到YOKOGAWA"""
-        self.visa_resource.write(command)
+        with self.lock:
+            self.visa_resource.write(command)
         
     def clear_error_flag(self):
         """清除錯誤LED指示燈"""
@@ -266,28 +369,47 @@ class YOKOGAWA:
         """設定輸出源電平值"""
         self.visa_write(f":SOUR:LEV {value}")
         
-    def sweep(self, goal_value, delta_time, delta_value) -> threading.Thread:
-        """執行掃描到目標值"""
-        def inner(goal_value, delta_time, delta_value):
-            curr_value = self.get_output_value()
-            if goal_value < curr_value:
-                delta_value = -delta_value
-            source_levels = np.arange(curr_value, goal_value, delta_value)
-            for level in source_levels:
-                self.output_value(level)
-                time.sleep(delta_time)
+    def ramp(self, goal_value, delta_time, delta_value, settle: SettlePolicy=None,
+             stop_event: threading.Event=None, callback=None) -> bool:
+        """阻塞式掃描到目標值
+
+        delta_time 為每一步的爬升間隔; 給定 settle 時, 到達目標值後改以
+        settle 判定穩定, 取代末端的固定等待. stop_event 被設定時於下一步中止,
+        callback(level, fraction) 於每步寫入後回報電平及本段進度.
+
+        Returns:
+            bool: 完成回傳 True, 被中止回傳 False.
+        """
+        curr_value = self.get_output_value()
+        if goal_value < curr_value:
+            delta_value = -delta_value
+        source_levels = np.arange(curr_value, goal_value, delta_value)
+        for i, level in enumerate(source_levels):
+            if stop_event is not None and stop_event.is_set():
+                return False
+            self.output_value(level)
+            if callback: callback(level, (i + 1) / (len(source_levels) + 1))
             time.sleep(delta_time)
-            self.output_value(goal_value)
-        
+        if settle is None:
+            time.sleep(delta_time)
+        self.output_value(goal_value)
+        if callback: callback(goal_value, 1.0)
+        if settle is not None:
+            settle.wait(self)
+        return True
+
+    def sweep(self, goal_value, delta_time, delta_value, settle: SettlePolicy=None) -> threading.Thread:
+        """於背景執行緒執行掃描到目標值"""
         thread = threading.Thread(
-            target=inner, args=(goal_value, delta_time, delta_value) 
+            target=self.ramp, args=(goal_value, delta_time, delta_value, settle)
         )
         thread.start()
         return thread
 
     def visa_query(self, command):
         """查詢SCPI命令並返回響應"""
-        return self.visa_resource.query(command)
+        with self.lock:
+            return self.visa_resource.query(command)
         
     def get_operation_setting(self) -> Tuple[str, float]:
         """獲取當前操作設定"""
@@ -305,27 +427,314 @@ class YOKOGAWA:
         """獲取輸出源電平值"""
         return float(self.visa_query(':SOUR:LEV?'))
 
+    def get_measured_value(self) -> float:
+        """獲取量測讀回值 (需具備量測選項)"""
+        return float(self.visa_query(':MEAS?'))
+
+    # region: 儀器內部程式
+    PROGRAM_MAX_STEPS = 10000   #* 程式記憶體步數上限
+    PROGRAM_MIN_INTERVAL = 0.1  #* 程式最短步進間隔 (s)
+    LEVEL_TOLERANCE = 0.1       #* 到達判定容差 (步距 delta_value 的比例), 讀回值受量程解析度量化
+
+    def at_level(self, value: float, delta_value: float) -> bool:
+        """讀回設定值, 判定是否已到達 value (容差為步距的 LEVEL_TOLERANCE 倍)"""
+        return abs(self.get_output_value() - value) <= abs(delta_value) * YOKOGAWA.LEVEL_TOLERANCE
+
+    @staticmethod
+    def program_levels(start: float, path: list, delta_time: float, delta_value: float) -> Tuple[np.ndarray, float]:
+        """將爬升/消磁路徑展開為等間隔程式步
+
+        儀器在每步間以斜率線性過渡, 因此步距可放大至 delta_value*interval/delta_time,
+        爬升速率與主機端 sweep 相同.
+
+        Returns:
+            (levels, interval): 程式各步電平與步進間隔.
+        """
+        if len(path) == 0:
+            raise ValueError('路徑至少需要一個目標電平')
+        if delta_time <= 0 or delta_value <= 0:
+            raise ValueError(f'步進間隔與步距須為正值 (delta_time={delta_time}, delta_value={delta_value})')
+        interval = max(delta_time, YOKOGAWA.PROGRAM_MIN_INTERVAL)
+        step = delta_value * interval / delta_time
+        levels = []
+        curr_value = start
+        for point in path:
+            n_steps = max(1, int(np.ceil(abs(point - curr_value) / step)))
+            levels.extend(np.linspace(curr_value, point, n_steps + 1)[1:])
+            curr_value = point
+        levels = np.array(levels)
+        if len(levels) > YOKOGAWA.PROGRAM_MAX_STEPS:
+            raise ValueError(f'程式步數 {len(levels)} 超過儀器上限 {YOKOGAWA.PROGRAM_MAX_STEPS}')
+        return levels, interval
+
+    def upload_program(self, levels, interval: float, slope: float=None):
+        """上傳電平序列至儀器程式記憶體
+
+        slope 預設等於 interval, 使輸出於各步間連續線性爬升.
+        """
+        slope = interval if slope is None else slope
+        with self.lock:     # 編輯期間的寫入不可與其他線程交錯
+            self.visa_write(':PROG:EDIT:STAR')
+            for level in levels:
+                self.output_value(level)
+            self.visa_write(':PROG:EDIT:END')
+            self.visa_write(f':PROG:INT {interval}')
+            self.visa_write(f':PROG:SLOP {slope}')
+            self.visa_write(':PROG:REP 0')
+
+    def run_program(self):
+        """觸發執行已上傳的程式"""
+        self.visa_write(':PROG:RUN')
+
+    def halt_program(self):
+        """中止執行中的程式"""
+        self.visa_write(':PROG:HALT')
+
+    def wait_for_program(self, final_value: float, expected_duration: float, tolerance: float,
+                         poll_interval: float=0.2, timeout: float=None,
+                         stop_event: threading.Event=None, callback=None) -> bool:
+        """輪詢輸出電平直到程式執行完成
+
+        讀回電平與 final_value 相差在 tolerance 內即視為到達, tolerance 應依量程解析度
+        或步距設定. stop_event 被設定時中止程式, callback(level, fraction) 於每次輪詢回報讀回電平.
+
+        Returns:
+            bool: 完成回傳 True, 逾時或被中止回傳 False.
+        """
+        timeout = expected_duration * 2 + 5 if timeout is None else timeout
+        start = time.monotonic()
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                self.halt_program()
+                return False
+            elapsed = time.monotonic() - start
+            level = self.get_output_value()
+            if callback: callback(level, min(elapsed / expected_duration, 1.0) if expected_duration > 0 else 1.0)
+            if elapsed >= expected_duration and abs(level - final_value) <= tolerance:
+                return True
+            if elapsed >= timeout:
+                return False
+            time.sleep(poll_interval)
+
+    def run_path_program(self, path: list, delta_time, delta_value, settle: SettlePolicy=None,
+                         stop_event: threading.Event=None, callback=None) -> bool:
+        """上傳路徑為程式並以單次觸發執行, 阻塞至完成"""
+        levels, interval = YOKOGAWA.program_levels(
+            self.get_output_value(), path, delta_time, delta_value
+        )
+        self.upload_program(levels, interval)
+        self.run_program()
+        done = self.wait_for_program(
+            levels[-1], len(levels) * interval, abs(delta_value) * YOKOGAWA.LEVEL_TOLERANCE,
+            stop_event=stop_event, callback=callback
+        )
+        if done and settle is not None:
+            settle.wait(self)
+        return done
+    # endregion
+
     @staticmethod
     def wait_for_sweeping(*threads: List[threading.Thread]):
         """等待所有掃描執行緒完成"""
         for thread in threads:
             thread.join()
-            
+
     @staticmethod
-    def demag_single(yoko, path: list, sweep_delta_time=0.05, sweep_delta_current=2e-3):
-        """執行單個YOKOGAWA消磁腳本"""
-        for point in path:
-            yoko.sweep(point, sweep_delta_time, sweep_delta_current).join()
-            
+    def demag_single(yoko, path: list, sweep_delta_time=0.05, sweep_delta_current=2e-3, settle: SettlePolicy=None,
+                     stop_event: threading.Event=None, callback=None) -> bool:
+        """執行單個YOKOGAWA消磁腳本, 被中止回傳 False"""
+        for k, point in enumerate(path):
+            step_callback = None
+            if callback:
+                step_callback = lambda level, fraction, k=k: callback(level, (k + fraction) / len(path))
+            if not yoko.ramp(point, sweep_delta_time, sweep_delta_current, settle, stop_event, step_callback):
+                return False
+        return True
+
     @staticmethod
-    def demag(yokos: list, path: list, sweep_delta_time=0.05, sweep_delta_current=2e-3):
-        """執行多個YOKOGAWA消磁腳本"""
+    def demag(yokos: list, path: list, sweep_delta_time=0.05, sweep_delta_current=2e-3, settle: SettlePolicy=None,
+              use_program=False, stop_event: threading.Event=None, callback=None) -> dict:
+        """執行多個YOKOGAWA消磁腳本
+
+        use_program 為 True 時, 整段路徑上傳至各儀器程式記憶體並以單次觸發執行,
+        不受主機負載影響. callback(yoko, level, fraction) 回報各儀器的電平與進度.
+
+        Returns:
+            dict: {儀器ID: 結果}, 結果為 True (完成), False (中止/逾時) 或執行緒內拋出的例外.
+        """
+        results = {yoko.id: False for yoko in yokos}
+
+        def target(yoko):
+            yoko_callback = None
+            if callback:
+                yoko_callback = lambda level, fraction: callback(yoko, level, fraction)
+            try:
+                if use_program:
+                    results[yoko.id] = yoko.run_path_program(
+                        path, sweep_delta_time, sweep_delta_current, settle, stop_event, yoko_callback
+                    )
+                else:
+                    results[yoko.id] = YOKOGAWA.demag_single(
+                        yoko, path, sweep_delta_time, sweep_delta_current, settle, stop_event, yoko_callback
+                    )
+            except Exception as e:
+                results[yoko.id] = e
+
         threads = []
         for yoko in yokos:
-            threads.append(threading.Thread( 
-                target=YOKOGAWA.demag_single, args=(yoko, path, sweep_delta_time, sweep_delta_current) 
+            threads.append(threading.Thread(
+                target=target, args=(yoko,)
             ))
         for thread in threads:
             thread.start()
         for thread in threads:
-            thread.join()
\ No newline at end of file
+            thread.join()
+        return results
+
+
+
+class YOKOGAWARegistry:
+    """YOKOGAWA儀器登錄表 (全程序共用)
+
+    VISA資源只列舉一次並快取, 序號對應的儀器名稱由 DC_config.ini 的
+    [DC_devices] 區段設定 (名稱 = 序號). 開啟的資源依名稱存放於連線池,
+    主視窗與控制對話框取得的是同一個 YOKOGAWA 物件, 不會重複開啟.
+    """
+    CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'DC_config.ini')
+    CONFIG_SECTION = 'DC_devices'
+    DEFAULT_NAMES = {
+        "DC1": "90ZC38697",
+        "DC2": "90ZC38696",
+        "DC3": "9017D5818",
+        "DC4": "9017D5816",
+    }
+
+    _lock = threading.RLock()
+    _rm = None
+    _names = None       #* {名稱: 序號}
+    _devices = None     #* {名稱: VISA位址}, 列舉快取
+    _pool = {}          #* {名稱: YOKOGAWA}
+    _setups = {}        #* {名稱: setup}, 重新開啟資源時沿用
+
+    @classmethod
+    def names(cls) -> dict:
+        """取得名稱與序號對應表, 首次呼叫時由配置文件讀取"""
+        with cls._lock:
+            if cls._names is None:
+                cls._names = cls.load_names(cls.CONFIG_PATH)
+            return dict(cls._names)
+
+    @classmethod
+    def load_names(cls, config_path) -> dict:
+        """由配置文件讀取名稱與序號對應表, 無設定時使用預設值"""
+        config = configparser.ConfigParser()
+        config.optionxform = str
+        if os.path.exists(config_path):
+            config.read(config_path)
+        if config.has_section(cls.CONFIG_SECTION) and len(config[cls.CONFIG_SECTION]):
+            return {name: serial.strip() for name, serial in config[cls.CONFIG_SECTION].items()}
+        return dict(cls.DEFAULT_NAMES)
+
+    @classmethod
+    def set_names(cls, names: dict):
+        """更新名稱與序號對應表, 清除列舉快取"""
+        with cls._lock:
+            cls._names = dict(names)
+            cls._devices = None
+
+    @classmethod
+    def resource_manager(cls) -> ResourceManager:
+        """共用的 VISA ResourceManager"""
+        with cls._lock:
+            if cls._rm is None:
+                cls._rm = ResourceManager()
+            return cls._rm
+
+    @classmethod
+    def scan(cls, refresh=False) -> dict:
+        """列舉已登錄的USB儀器
+
+        Args:
+            refresh: 忽略快取重新列舉
+
+        Returns:
+            dict: {名稱: VISA位址}, 依對應表順序排列
+        """
+        with cls._lock:
+            if cls._devices is not None and not refresh:
+                return dict(cls._devices)
+
+            names = cls.names()
+            resources = [res for res in cls.resource_manager().list_resources() if "USB" in res]
+            devices = {}
+            for name, serial in names.items():
+                for res in resources:
+                    if serial in res:
+                        devices[name] = res
+                        break
+
+            #* 位址改變的儀器就地重新開啟 (外部持有的物件維持有效), 消失的儀器自連線池移除
+            for name in list(cls._pool):
+                address = devices.get(name)
+                if address is None:
+                    cls._close(name)
+                elif address != cls._pool[name].id:
+                    cls._reopen(name, address)
+
+            cls._devices = devices
+            return dict(devices)
+
+    @classmethod
+    def get(cls, name: str, setup=None) -> YOKOGAWA:
+        """由連線池取得儀器, 未開啟時才開啟資源
+
+        Args:
+            name: 儀器名稱
+            setup: 首次開啟時執行的初始化函數 setup(yoko)
+        """
+        with cls._lock:
+            if name in cls._pool:
+                return cls._pool[name]
+
+            devices = cls.scan()
+            if name not in devices:
+                raise KeyError(f"找不到儀器 {name}")
+            address = devices[name]
+            yoko = YOKOGAWA(address, cls.resource_manager().open_resource(address))
+            if setup:
+                setup(yoko)
+            cls._pool[name] = yoko
+            cls._setups[name] = setup
+            return yoko
+
+    @classmethod
+    def _reopen(cls, name, address):
+        """將連線池內的物件改接至新位址"""
+        yoko = cls._pool[name]
+        with yoko.lock:
+            try:
+                yoko.visa_resource.close()
+            except Exception:
+                pass
+            yoko.visa_resource = cls.resource_manager().open_resource(address)
+            yoko.id = address
+            setup = cls._setups.get(name)
+            if setup:
+                setup(yoko)
+
+    @classmethod
+    def _close(cls, name):
+        cls._setups.pop(name, None)
+        yoko = cls._pool.pop(name, None)
+        if yoko is not None:
+            try:
+                yoko.visa_resource.close()
+            except Exception:
+                pass
+
+    @classmethod
+    def close_all(cls):
+        """關閉連線池內所有資源"""
+        with cls._lock:
+            for name in list(cls._pool):
+                cls._close(name)
\ No newline at end of file
@@ -7,15 +7,16 @@ from PyQt6.QtWidgets import (
 # 組件
 from PyQt6.QtWidgets import (
     QLineEdit, QPushButton, QRadioButton, QLabel, QTextEdit,
-    QMessageBox, QComboBox, QDoubleSpinBox, QDialogButtonBox,
-    QTableWidgetItem, QFileDialog, QHeaderView, QCheckBox
+    QMessageBox, QComboBox, QSpinBox, QDoubleSpinBox, QDialogButtonBox,
+    QTableWidgetItem, QFileDialog, QHeaderView, QCheckBox, QProgressBar
 )
 
 # 窗口類型
 from PyQt6.QtWidgets import QDialog, QProgressDialog
-from PyQt6.QtCore import Qt, QSettings, QThreadPool, QObject
+from PyQt6.QtCore import Qt, QSettings, QThreadPool, QObject, QThread, pyqtSignal
 
 import os
+import threading
 import configparser
 from matplotlib.backends.backend_qt5agg import (
     FigureCanvasQTAgg as FigureCanvas,
@@ -23,17 +24,41 @@ from matplotlib.backends.backend_qt5agg import (
 from matplotlib.figure import Figure
 import matplotlib.pyplot as plt
 import numpy as np
-from pyvisa import ResourceManager
 
-from .device_control import YOKOGAWA
+from .device_control import YOKOGAWA, YOKOGAWARegistry
 from .File_Storage import DataSaver, SaveSlicesWorker
+from .slice_renderer import SLICE_MODES, MODE_FORMATS, DEFAULT_DPI
+from .waveform_generation import generate_waveform
+
+
+class WaveformPreviewWorker(QObject):
+    """波形預覽生成工作 (於線程池執行, 不佔用GUI線程)"""
+    finished = pyqtSignal(int, object)  #* (請求編號, 波形)
+    error = pyqtSignal(int, str)        #* (請求編號, 錯誤訊息)
+
+    def __init__(self, request_id, params):
+        super().__init__()
+        self.request_id = request_id
+        self.params = params
+
+    def run(self):
+        errors = []
+        try:
+            waveform = generate_waveform(self.params, error_callback=errors.append)
+        except Exception as e:
+            waveform = None
+            errors.append(f"波形生成錯誤: {str(e)}")
+        if waveform is None:
+            self.error.emit(self.request_id, errors[0] if errors else "波形生成失敗")
+        else:
+            self.finished.emit(self.request_id, waveform)
 
 
 class SaveDataDialog(QDialog):
     """保存數據對話框"""
     def __init__(self, parent=None, time_data=None, freq_data=None, power_data=None, power_amps=None,
                  freq_dep_data=None, freq_lo_values=None, current_freq_data=None, freq_values=None, 
-                 current_values=None, plot_manager=None):
+                 current_values=None, plot_manager=None, parameters=None, stream_file=None):
         super().__init__(parent)
         self.setWindowTitle("保存數據")
         self.setMinimumSize(800, 600)
@@ -54,6 +79,8 @@ class SaveDataDialog(QDialog):
         self.current_values = current_values
 
         self.plot_manager = plot_manager
+        self.parameters = parameters or {}
+        self.stream_file = stream_file  #* 掃描時的即時存檔, 存為 HDF5 時直接移動
         
         #* 加載或初始化設置
         self.settings = QSettings("MyCompany", "SHFQC_Control")
@@ -67,6 +94,11 @@ class SaveDataDialog(QDialog):
         self.file_name = self.settings.value("save_dialog/file_name", "experiment_data")
         self.comments = self.settings.value("save_dialog/comments", "")
         self.data_type = self.settings.value("save_dialog/data_type", "time_domain")
+        self.slice_mode = self.settings.value("save_dialog/slice_mode", "files")
+        self.slice_format = self.settings.value("save_dialog/slice_format", "png")
+        self.slice_dpi = int(self.settings.value("save_dialog/slice_dpi", DEFAULT_DPI))
+        self.storage_format = self.settings.value("save_dialog/storage_format", "hdf5")
+        self.compress = self.settings.value("save_dialog/compress", True, type=bool)
         
     def save_settings(self):
         """保存對話框設置"""
@@ -74,6 +106,11 @@ class SaveDataDialog(QDialog):
         self.settings.setValue("save_dialog/file_name", self.file_name)
         self.settings.setValue("save_dialog/comments", self.comments)
         self.settings.setValue("save_dialog/data_type", self.data_type)
+        self.settings.setValue("save_dialog/slice_mode", self.slice_mode)
+        self.settings.setValue("save_dialog/slice_format", self.slice_format)
+        self.settings.setValue("save_dialog/slice_dpi", self.slice_dpi)
+        self.settings.setValue("save_dialog/storage_format", self.storage_format)
+        self.settings.setValue("save_dialog/compress", self.compress)
         
     def init_ui(self):
         """初始化UI"""
@@ -140,6 +177,45 @@ class SaveDataDialog(QDialog):
         self.comments_edit = QTextEdit(self.comments)
         self.comments_edit.setMaximumHeight(100)
         file_layout.addWidget(self.comments_edit, 2, 1, 1, 2)
+
+        #* 切片輸出模式、格式及解析度
+        file_layout.addWidget(QLabel("切片圖片:"), 3, 0)
+        slice_layout = QHBoxLayout()
+        self.slice_mode_combo = QComboBox()
+        for mode, label in SLICE_MODES.items():
+            self.slice_mode_combo.addItem(label, userData=mode)
+        self.slice_format_combo = QComboBox()
+        self.slice_mode_combo.currentIndexChanged.connect(self.update_slice_formats)
+        self.slice_mode_combo.setCurrentIndex(max(self.slice_mode_combo.findData(self.slice_mode), 0))
+        self.update_slice_formats()
+        self.slice_dpi_spin = QSpinBox()
+        self.slice_dpi_spin.setRange(50, 1200)
+        self.slice_dpi_spin.setSingleStep(50)
+        self.slice_dpi_spin.setSuffix(" dpi")
+        self.slice_dpi_spin.setValue(self.slice_dpi)
+        slice_layout.addWidget(self.slice_mode_combo)
+        slice_layout.addWidget(self.slice_format_combo)
+        slice_layout.addWidget(self.slice_dpi_spin)
+        slice_layout.addStretch()
+        file_layout.addLayout(slice_layout, 3, 1, 1, 2)
+
+        #* 數據格式 (HDF5 分塊存儲, CSV 為選用的文字輸出)
+        file_layout.addWidget(QLabel("數據格式:"), 4, 0)
+        format_layout = QHBoxLayout()
+        self.storage_format_combo = QComboBox()
+        for storage_format in DataSaver.available_formats():
+            self.storage_format_combo.addItem(DataSaver.STORAGE_FORMATS[storage_format], userData=storage_format)
+        self.storage_format_combo.setCurrentIndex(max(self.storage_format_combo.findData(self.storage_format), 0))
+        self.compress_check = QCheckBox("HDF5 壓縮 (gzip)")
+        self.compress_check.setChecked(self.compress)
+        self.storage_format_combo.currentIndexChanged.connect(
+            lambda: self.compress_check.setEnabled('hdf5' in self.storage_format_combo.currentData())
+        )
+        self.compress_check.setEnabled('hdf5' in self.storage_format_combo.currentData())
+        format_layout.addWidget(self.storage_format_combo)
+        format_layout.addWidget(self.compress_check)
+        format_layout.addStretch()
+        file_layout.addLayout(format_layout, 4, 1, 1, 2)
         
         main_layout.addWidget(file_group)
         
@@ -165,6 +241,13 @@ class SaveDataDialog(QDialog):
         #* 初始更新預覽
         self.update_preview(self.data_type)
         
+    def update_slice_formats(self):
+        """依切片輸出模式更新可選格式"""
+        current = self.slice_format_combo.currentText() or self.slice_format
+        self.slice_format_combo.clear()
+        self.slice_format_combo.addItems(MODE_FORMATS[self.slice_mode_combo.currentData()])
+        self.slice_format_combo.setCurrentIndex(max(self.slice_format_combo.findText(current), 0))
+
     def browse_path(self):
         """選擇保存路徑"""
         folder = QFileDialog.getExistingDirectory(
@@ -254,6 +337,11 @@ class SaveDataDialog(QDialog):
         self.file_path = self.path_edit.text()
         self.file_name = self.name_edit.text()
         self.comments = self.comments_edit.toPlainText()
+        self.slice_mode = self.slice_mode_combo.currentData()
+        self.slice_format = self.slice_format_combo.currentText()
+        self.slice_dpi = self.slice_dpi_spin.value()
+        self.storage_format = self.storage_format_combo.currentData()
+        self.compress = self.compress_check.isChecked()
         
         if not os.path.isdir(self.file_path):
             QMessageBox.warning(self, "錯誤", "指定的保存位置無效")
@@ -267,29 +355,44 @@ class SaveDataDialog(QDialog):
         save_info = {
             'base_path': self.file_path,
             'file_name': self.file_name,
-            'comments': self.comments
+            'comments': self.comments,
+            'compression': 'gzip' if self.compress else None,
+            'parameters': self.parameters
         }
         
         success = False
         img_dir = None
         
         try:
-            # 根據數據類型保存數據
+            # 根據數據類型整理數據 (與 PlotManager 繪圖數據格式相同) 及對應的 CSV 輸出
             if self.data_type == "時域 {單張} 量測" and self.time_data is not None:
-                success, img_dir = DataSaver.save_time_data(self.time_data, save_info, self)
+                data = self.time_data
+                save_csv = lambda: DataSaver.save_time_data(self.time_data, save_info, self)
             elif self.data_type == "頻域 {單張} 量測" and self.freq_data is not None:
-                success, img_dir = DataSaver.save_freq_data(self.freq_data, save_info, self)
+                data = self.freq_data
+                save_csv = lambda: DataSaver.save_freq_data(self.freq_data, save_info, self)
             elif self.data_type == "時域 {振幅} 掃描" and self.power_data is not None and self.power_amps is not None:
-                success, img_dir = DataSaver.save_power_data(self.power_data, self.power_amps, save_info, self)
+                data = {'amp': self.power_amps, 'data': self.power_data}
+                save_csv = lambda: DataSaver.save_power_data(self.power_data, self.power_amps, save_info, self)
             elif self.data_type == "時域 {頻率} 掃描" and self.freq_dep_data is not None and self.freq_lo_values is not None:
-                success, img_dir = DataSaver.save_freq_dep_data(self.freq_dep_data, self.freq_lo_values, save_info, self)
-            elif self.data_type == "時域 {電流頻率} 掃描" and self.current_freq_data is not None and self.current_values is not None and self.freq_lo_values is not None:
-                success, img_dir = DataSaver.save_current_freq_data(
-                    self.current_freq_data, self.current_values, self.freq_lo_values, save_info, self
+                data = {'lo_values': self.freq_lo_values, 'data': self.freq_dep_data}
+                save_csv = lambda: DataSaver.save_freq_dep_data(self.freq_dep_data, self.freq_lo_values, save_info, self)
+            elif self.data_type == "時域 {電流頻率} 掃描" and self.current_freq_data is not None and self.current_values is not None and self.freq_values is not None:
+                data = {'curr': self.current_values, 'lo_values': self.freq_values, 'data': self.current_freq_data}
+                save_csv = lambda: DataSaver.save_current_freq_data(
+                    self.current_freq_data, self.current_values, self.freq_values, save_info, self
                 )
             else:
                 QMessageBox.warning(self, "警告", "沒有可用的數據來保存")
                 return
+
+            if 'hdf5' in self.storage_format:
+                success, img_dir = DataSaver.save_stream_hdf5(
+                    self.data_type, data, self.stream_file, save_info, self
+                )
+            if 'csv' in self.storage_format:
+                csv_success, csv_img_dir = save_csv()
+                success, img_dir = success or csv_success, img_dir or csv_img_dir
                 
             # 保存圖片
             if success and img_dir and self.plot_manager:
@@ -309,7 +412,10 @@ class SaveDataDialog(QDialog):
                 self.progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
                 self.progress_dialog.setAutoClose(True)
                 
-                self.worker = SaveSlicesWorker(self.plot_manager, img_dir, save_info['file_name'], self.data_type)
+                self.worker = SaveSlicesWorker(
+                    self.plot_manager, img_dir, save_info['file_name'], self.data_type,
+                    dpi=self.slice_dpi, fmt=self.slice_format, mode=self.slice_mode
+                )
                 self.worker_thread = QObject()
                 
                 self.worker.progress.connect(self.progress_dialog.setValue)
@@ -508,8 +614,9 @@ class YOKOGAWAControlDialog(QDialog):
         self.config_path = os.path.join(os.path.dirname(__file__), 'DC_config.ini')
         
         self.yokos = []
-        self.rm = None
-        self.DC_id = {}
+        self.yoko_checks = {}
+        self.job_thread = None
+        self.readback_values = {}
         
         self.init_ui()
         self.load_settings()
@@ -523,9 +630,14 @@ class YOKOGAWAControlDialog(QDialog):
         connection_group = QGroupBox("儀器連接")
         connection_layout = QFormLayout(connection_group)
         
+        scan_layout = QHBoxLayout()
         self.btn_scan = QPushButton("掃描儀器")
-        self.btn_scan.clicked.connect(self.scan_devices)
-        connection_layout.addRow(self.btn_scan)
+        self.btn_scan.clicked.connect(lambda: self.scan_devices())
+        scan_layout.addWidget(self.btn_scan)
+        self.btn_rescan = QPushButton("重新列舉")
+        self.btn_rescan.clicked.connect(self.rescan_devices)
+        scan_layout.addWidget(self.btn_rescan)
+        connection_layout.addRow(scan_layout)
         
         self.link_yoko_devices_group = QGroupBox("選擇YOKOGAWA設備")
         self.link_yoko_layout = QVBoxLayout(self.link_yoko_devices_group)
@@ -599,12 +711,52 @@ class YOKOGAWAControlDialog(QDialog):
         self.demag_path_edit = QLineEdit("0.15, -0.12, 0.09, -0.06, 0.02, -0.01, 0.005, -0.001, 0.0")
         demag_layout.addWidget(QLabel("消磁路徑 (逗號分隔):"))
         demag_layout.addWidget(self.demag_path_edit)
-        
+
+        self.demag_program_check = QCheckBox("上傳至儀器程式記憶體執行")
+        demag_layout.addWidget(self.demag_program_check)
+
+        # 爬升速率
+        ramp_layout = QFormLayout()
+        self.ramp_time_spin = QDoubleSpinBox()
+        self.ramp_time_spin.setRange(0.01, 10)
+        self.ramp_time_spin.setDecimals(2)
+        self.ramp_time_spin.setSingleStep(0.01)
+        self.ramp_time_spin.setValue(0.05)
+        self.ramp_step_spin = QDoubleSpinBox()
+        self.ramp_step_spin.setRange(0.001, 100)
+        self.ramp_step_spin.setDecimals(3)
+        self.ramp_step_spin.setSingleStep(0.1)
+        self.ramp_step_spin.setValue(2)
+        ramp_layout.addRow("爬升間隔(s):", self.ramp_time_spin)
+        ramp_layout.addRow("爬升步距(mA):", self.ramp_step_spin)
+        demag_layout.addLayout(ramp_layout)
+        
+        demag_btn_layout = QHBoxLayout()
         self.btn_demag = QPushButton("執行消磁")
         self.btn_demag.clicked.connect(self.run_demag)
-        demag_layout.addWidget(self.btn_demag)
+        demag_btn_layout.addWidget(self.btn_demag)
+
+        self.btn_ramp = QPushButton("爬升至輸出值")
+        self.btn_ramp.clicked.connect(self.run_ramp)
+        demag_btn_layout.addWidget(self.btn_ramp)
+        demag_layout.addLayout(demag_btn_layout)
         
         main_layout.addWidget(demag_group)
+
+        # 背景作業進度
+        job_group = QGroupBox("作業進度")
+        job_layout = QVBoxLayout(job_group)
+        self.job_progress = QProgressBar()
+        self.job_progress.setRange(0, 100)
+        self.job_progress.setValue(0)
+        job_layout.addWidget(self.job_progress)
+        self.readback_label = QLabel("即時電平: --")
+        job_layout.addWidget(self.readback_label)
+        self.btn_abort_job = QPushButton("中止作業")
+        self.btn_abort_job.setEnabled(False)
+        self.btn_abort_job.clicked.connect(self.abort_job)
+        job_layout.addWidget(self.btn_abort_job)
+        main_layout.addWidget(job_group)
         
         # 狀態信息
         self.status_text = QTextEdit()
@@ -638,92 +790,60 @@ class YOKOGAWAControlDialog(QDialog):
     def save_settings(self):
         """保存配置文件"""
         config = configparser.ConfigParser()
+        config.optionxform = str
         
         # Device 配置
         config['DC_supply'] = {
             'curr_value': str(self.value_spin.value())
         }
+        # 儀器名稱與序號對應
+        config[YOKOGAWARegistry.CONFIG_SECTION] = YOKOGAWARegistry.names()
         with open(self.config_path, 'w') as configfile:
             config.write(configfile)
     
     def closeEvent(self, event):
-        """關閉視窗後複寫配置文件"""
+        """關閉視窗時中止背景作業, 並複寫配置文件"""
+        self.stop_job()
         self.save_settings()
         event.accept()
     
-    def scan_devices(self):
-        """掃描可用的YOKOGAWA設備"""
+    def scan_devices(self, refresh=False):
+        """掃描可用的YOKOGAWA設備 (使用共用登錄表的快取結果)"""
         while self.link_yoko_layout.count():
             item = self.link_yoko_layout.takeAt(0)
             if item.widget():
                 item.widget().deleteLater()
+        self.yoko_checks = {}
         try:
-            self.rm = ResourceManager()
-            devices = self.rm.list_resources()
-            self.DC_id={}
-            for device in devices:
-                if "USB" in device:  # 只顯示USB設備
-                    if "90ZC38697"in device:
-                        self.dc1_check = QCheckBox("DC1")
-                        self.link_yoko_layout.addWidget(self.dc1_check)
-                        self.dc1_check.stateChanged.connect(self.connect_device)
-                        self.DC_id["DC1"]=device
-
-                    elif "90ZC38696"in device:
-                        self.dc2_check = QCheckBox("DC2")
-                        self.link_yoko_layout.addWidget(self.dc2_check)
-                        self.dc2_check.stateChanged.connect(self.connect_device)
-                        self.DC_id["DC2"]=device
-
-                    elif "9017D5818"in device:
-                        self.dc3_check = QCheckBox("DC3")
-                        self.link_yoko_layout.addWidget(self.dc3_check)
-                        self.dc3_check.stateChanged.connect(self.connect_device)
-                        self.DC_id["DC3"]=device
-
-                    elif "9017D5816"in device:
-                        self.dc4_check = QCheckBox("DC4")
-                        self.link_yoko_layout.addWidget(self.dc4_check)
-                        self.dc4_check.stateChanged.connect(self.connect_device)
-                        self.DC_id["DC4"]=device
-
+            for name in YOKOGAWARegistry.scan(refresh=refresh):
+                check = QCheckBox(name)
+                self.link_yoko_layout.addWidget(check)
+                check.stateChanged.connect(self.connect_device)
+                self.yoko_checks[name] = check
         except Exception as e:
             self.status_text.append(f"掃描錯誤: {str(e)}")
+
+    def rescan_devices(self):
+        """忽略快取重新列舉設備"""
+        self.scan_devices(refresh=True)
     
     def connect_device(self):
-        """連接選定的設備"""
+        """連接選定的設備 (由連線池取得, 不重複開啟資源)"""
         self.yokos = []
+        for name, check in self.yoko_checks.items():
+            if not check.isChecked():
+                continue
+            try:
+                self.yokos.append(YOKOGAWARegistry.get(name, setup=self._setup_device))
+            except Exception as e:
+                self.status_text.append(f"連接錯誤: {str(e)}")
+
+    def _setup_device(self, yoko):
+        """首次開啟設備時的初始設定"""
         try:
-            if self.dc1_check.isChecked(): # DC1
-                device_id = self.DC_id["DC1"]
-                visa_resource = self.rm.open_resource(device_id)
-                yoko = YOKOGAWA(device_id, visa_resource)
-                self.yokos.append(yoko)
-
-            if self.dc2_check.isChecked(): # DC2
-                device_id = self.DC_id["DC2"]
-                visa_resource = self.rm.open_resource(device_id)
-                yoko = YOKOGAWA(device_id, visa_resource)
-                self.yokos.append(yoko)
-
-            if self.dc3_check.isChecked(): # DC3
-                device_id = self.DC_id["DC3"]
-                visa_resource = self.rm.open_resource(device_id)
-                yoko = YOKOGAWA(device_id, visa_resource)
-                self.yokos.append(yoko)
-
-            if self.dc4_check.isChecked(): # DC4
-                device_id = self.DC_id["DC4"]
-                visa_resource = self.rm.open_resource(device_id)
-                yoko = YOKOGAWA(device_id, visa_resource)
-                self.yokos.append(yoko)
-            for yoko in self.yokos:
-                try:
-                    yoko.operation_setting('CURR', 200e-3)
-                except Exception as e:
-                    self.status_text.append(f"{yoko.id} 設定錯誤: {str(e)}")
+            yoko.operation_setting('CURR', 200e-3)
         except Exception as e:
-            self.status_text.append(f"連接錯誤: {str(e)}")
+            self.status_text.append(f"{yoko.id} 設定錯誤: {str(e)}")
     
     def set_function(self):
         """設定儀器功能"""
@@ -732,21 +852,26 @@ class YOKOGAWAControlDialog(QDialog):
         
         for yoko in self.yokos:
             try:
-                yoko.operation_setting(func, range_val)
+                with YOKOGAWA.exclusive([yoko]):
+                    yoko.operation_setting(func, range_val)
                 self.status_text.append(f"{yoko.id}: 設定功能 {func} 範圍 {range_val}")
             except Exception as e:
                 self.status_text.append(f"{yoko.id} 設定錯誤: {str(e)}")
     
     def set_value(self):
-        """設定輸出值"""
+        """設定輸出值 (背景執行)"""
         value = round(self.value_spin.value()*1e-3,6)
-        
-        for yoko in self.yokos:
-            try:
-                yoko.output_value(value)
-                self.status_text.append(f"{yoko.id}: 設定輸出值 {value}")
-            except Exception as e:
-                self.status_text.append(f"{yoko.id} 設定錯誤: {str(e)}")
+        self.start_job('set_value', {'value': value})
+
+    def run_ramp(self):
+        """以設定速率爬升至輸出值 (背景執行)"""
+        value = round(self.value_spin.value()*1e-3,6)
+        self.start_job('ramp', {
+            'value': value,
+            'delta_time': self.ramp_time_spin.value(),
+            'delta_value': self.ramp_step_spin.value()*1e-3,
+            'use_program': self.demag_program_check.isChecked()
+        })
     
     def set_output(self):
         """設定輸出開關"""
@@ -754,37 +879,191 @@ class YOKOGAWAControlDialog(QDialog):
         
         for yoko in self.yokos:
             try:
-                yoko.output(output)
+                with YOKOGAWA.exclusive([yoko]):
+                    yoko.output(output)
                 self.status_text.append(f"{yoko.id}: 設定輸出 {output}")
             except Exception as e:
                 self.status_text.append(f"{yoko.id} 設定錯誤: {str(e)}")
     
     def run_demag(self):
-        """執行消磁程序"""
+        """執行消磁程序 (背景執行)"""
         path_str = self.demag_path_edit.text()
         try:
             path = [float(x.strip()) for x in path_str.split(',')]
         except ValueError:
             self.status_text.append("消磁路徑格式錯誤")
             return
-            
+
+        self.start_job('demag', {
+            'path': path,
+            'delta_time': self.ramp_time_spin.value(),
+            'delta_value': self.ramp_step_spin.value()*1e-3,
+            'use_program': self.demag_program_check.isChecked()
+        })
+
+    def start_job(self, job, params):
+        """啟動YOKOGAWA背景作業"""
+        if self.job_thread and self.job_thread.isRunning():
+            self.status_text.append("已有作業執行中")
+            return
         if not self.yokos:
             self.status_text.append("沒有已連接的儀器")
             return
-            
-        self.status_text.append("開始執行消磁...")
-        
+
+        self.readback_values = {}
+        self.job_progress.setValue(0)
+        self.job_thread = YOKOGAWAJobThread(list(self.yokos), job, params)
+        self.job_thread.progress_signal.connect(self.job_progress.setValue)
+        self.job_thread.readback_signal.connect(self.update_readback)
+        self.job_thread.message_signal.connect(self.status_text.append)
+        self.job_thread.finished_signal.connect(self.on_job_finished)
+        self._toggle_job_controls(False)
+        self.job_thread.start()
+
+    def abort_job(self):
+        """中止YOKOGAWA背景作業"""
+        if self.job_thread and self.job_thread.isRunning():
+            self.job_thread.stop()
+            self.status_text.append("正在中止作業...")
+
+    def stop_job(self):
+        """中止背景作業並等待線程結束"""
+        if self.job_thread and self.job_thread.isRunning():
+            self.job_thread.stop()
+            self.job_thread.wait()
+
+    def update_readback(self, yoko_id, level):
+        """更新即時電平顯示"""
+        self.readback_values[yoko_id] = level
+        text = ", ".join(f"{k}: {v*1e3:.3f} mA" for k, v in self.readback_values.items())
+        self.readback_label.setText(f"即時電平: {text}")
+
+    def on_job_finished(self, completed):
+        """背景作業結束"""
+        if completed:
+            self.job_progress.setValue(100)
+        self._toggle_job_controls(True)
+
+    def _toggle_job_controls(self, enable):
+        """作業期間切換控制按鈕"""
+        self.btn_set_value.setEnabled(enable)
+        self.btn_set_func.setEnabled(enable)
+        self.btn_set_output.setEnabled(enable)
+        self.btn_demag.setEnabled(enable)
+        self.btn_ramp.setEnabled(enable)
+        self.btn_connect.setEnabled(enable)
+        self.btn_abort_job.setEnabled(not enable)
+
+
+class YOKOGAWAJobThread(QThread):
+    """YOKOGAWA背景作業線程 (消磁/設定輸出值/爬升)"""
+    progress_signal = pyqtSignal(int)           #* 作業進度 (%)
+    readback_signal = pyqtSignal(str, float)    #* 即時電平 (儀器ID, 電平)
+    message_signal = pyqtSignal(str)            #* 狀態訊息
+    finished_signal = pyqtSignal(bool)          #* 作業結束 (是否完整執行)
+
+    def __init__(self, yokos, job, params):
+        super().__init__()
+        self.yokos = yokos
+        self.job = job
+        self.params = params
+        self.stop_event = threading.Event()
+        self._fractions = {yoko.id: 0.0 for yoko in yokos}
+
+    def run(self):
+        completed = False
+        try:
+            with YOKOGAWA.exclusive(self.yokos):
+                if self.job == 'demag':
+                    completed = self._run_demag()
+                elif self.job == 'set_value':
+                    completed = self._run_set_value()
+                elif self.job == 'ramp':
+                    completed = self._run_ramp()
+        except Exception as e:
+            self.message_signal.emit(f"作業錯誤: {str(e)}")
+        finally:
+            self.finished_signal.emit(completed and not self.stop_event.is_set())
+
+    def _report(self, yoko, level, fraction):
+        """彙整各儀器回報的電平與進度"""
+        self._fractions[yoko.id] = fraction
+        self.readback_signal.emit(yoko.id, float(level))
+        self.progress_signal.emit(int(100 * sum(self._fractions.values()) / len(self._fractions)))
+
+    def _run_path(self, path) -> bool:
+        """所有儀器同步執行路徑, 回傳是否全部完成且讀回值到達終點"""
+        results = YOKOGAWA.demag(
+            self.yokos, path,
+            sweep_delta_time=self.params['delta_time'],
+            sweep_delta_current=self.params['delta_value'],
+            use_program=self.params['use_program'],
+            stop_event=self.stop_event,
+            callback=self._report
+        )
+        completed = True
+        for yoko in self.yokos:
+            result = results[yoko.id]
+            if isinstance(result, Exception):
+                self.message_signal.emit(f"{yoko.id} 執行錯誤: {str(result)}")
+                completed = False
+            elif not result:
+                completed = False
+            elif not yoko.at_level(path[-1], self.params['delta_value']):
+                self.message_signal.emit(f"{yoko.id} 讀回電平 {yoko.get_output_value()} 未到達 {path[-1]}")
+                completed = False
+        return completed
+
+    def _run_demag(self) -> bool:
+        """消磁作業, 所有儀器確認到達終點後才關閉輸出"""
+        self.message_signal.emit("開始執行消磁...")
+
         # 開啟所有輸出
         for yoko in self.yokos:
             yoko.output('ON')
-        
-        # 執行消磁
-        try:
-            YOKOGAWA.demag(self.yokos, path)
-            self.status_text.append("消磁完成")
-        except Exception as e:
-            self.status_text.append(f"消磁錯誤: {str(e)}")
-        
+
+        completed = self._run_path(self.params['path'])
+        if self.stop_event.is_set():
+            self.message_signal.emit("消磁已中止, 輸出維持於當前電平")
+            return False
+        if not completed:
+            self.message_signal.emit("消磁錯誤: 未全部到達終點, 輸出維持於當前電平")
+            return False
+        self.message_signal.emit("消磁完成")
+
         # 關閉所有輸出
         for yoko in self.yokos:
-            yoko.output('OFF')
\ No newline at end of file
+            yoko.output('OFF')
+        return True
+
+    def _run_set_value(self) -> bool:
+        """設定輸出值作業"""
+        value = self.params['value']
+        completed = True
+        for yoko in self.yokos:
+            try:
+                yoko.output_value(value)
+                self._report(yoko, yoko.get_output_value(), 1.0)
+                self.message_signal.emit(f"{yoko.id}: 設定輸出值 {value}")
+            except Exception as e:
+                self.message_signal.emit(f"{yoko.id} 設定錯誤: {str(e)}")
+                completed = False
+        return completed
+
+    def _run_ramp(self) -> bool:
+        """爬升至輸出值作業"""
+        value = self.params['value']
+        self.message_signal.emit(f"開始爬升至 {value}...")
+        completed = self._run_path([value])
+        if self.stop_event.is_set():
+            self.message_signal.emit("爬升已中止")
+            return False
+        if not completed:
+            self.message_signal.emit(f"爬升錯誤: 未全部到達 {value}")
+            return False
+        self.message_signal.emit(f"已爬升至 {value}")
+        return True
+
+    def stop(self):
+        """中止作業"""
+        self.stop_event.set()
\ No newline at end of file
@@ -11,6 +11,9 @@ from matplotlib.backends.backend_qt5agg import (
     NavigationToolbar2QT as NavigationToolbar
 )
 
+from ..waveform_library import WaveformLibrary
+from ..plot_backend import PlotBackend
+
 class UIBuilder:
     # region: 主布局建立
     @staticmethod
@@ -58,13 +61,21 @@ class UIBuilder:
         panel = QWidget()
         layout = QVBoxLayout(panel)
         
-        #* 繪圖選項卡
+        #* 繪圖選項卡 (PlotManager 依分頁頁面判斷是否可見, 不可見的分頁延後繪製)
         tab_widget = QTabWidget()
-        tab_widget.addTab(UIBuilder.create_plot_tab(gui.time_plot), "時域 {單張} 量測")
-        tab_widget.addTab(UIBuilder.create_power_plot_tab(gui), "時域 {振幅} 掃描")
-        tab_widget.addTab(UIBuilder.create_freq_dep_plot_tab(gui), "時域 {頻率} 掃描")
-        tab_widget.addTab(UIBuilder.create_current_freq_plot_tab(gui), "時域 {電流頻率} 掃描")
-        tab_widget.addTab(UIBuilder.create_plot_tab(gui.freq_plot), "頻域 {單張} 量測")
+        gui.viz_tab_pages = {
+            'time': UIBuilder.create_plot_tab(gui.time_plot),
+            'power': UIBuilder.create_power_plot_tab(gui),
+            'freq_dep': UIBuilder.create_freq_dep_plot_tab(gui),
+            'current_freq': UIBuilder.create_current_freq_plot_tab(gui),
+            'freq': UIBuilder.create_plot_tab(gui.freq_plot),
+        }
+        tab_widget.addTab(gui.viz_tab_pages['time'], "時域 {單張} 量測")
+        tab_widget.addTab(gui.viz_tab_pages['power'], "時域 {振幅} 掃描")
+        tab_widget.addTab(gui.viz_tab_pages['freq_dep'], "時域 {頻率} 掃描")
+        tab_widget.addTab(gui.viz_tab_pages['current_freq'], "時域 {電流頻率} 掃描")
+        tab_widget.addTab(gui.viz_tab_pages['freq'], "頻域 {單張} 量測")
+        gui.viz_tabs = tab_widget
         
         layout.addWidget(tab_widget)
         
@@ -120,6 +131,17 @@ class UIBuilder:
         layout.addRow("中心頻率:", gui.center_freq_spin)
         layout.addRow("混頻頻率:", gui.digital_lo_spin)
         layout.addRow("波型增益:", gui.gain_spin)
+        layout.addRow("數據精度:", gui.precision_combo)
+        layout.addRow("繪圖後端:", gui.plot_backend_combo)
+
+        #* 即時存檔開關及目錄
+        row = QWidget()
+        hbox = QHBoxLayout(row)
+        hbox.setContentsMargins(0, 0, 0, 0)
+        hbox.addWidget(gui.stream_save_check)
+        hbox.addWidget(gui.stream_dir_edit)
+        hbox.addWidget(gui.stream_dir_btn)
+        layout.addRow("即時存檔:", row)
 
         return group
     
@@ -131,7 +153,16 @@ class UIBuilder:
         
         #* 波形类型
         gui.wave_type_combo.addItems(["方波脈衝", "高斯脈衝", "指數脈衝", "自訂波形"])
+        gui.wave_type_combo.addItems([WaveformLibrary.wave_type_of(name) for name in WaveformLibrary.list_names()])
         layout.addRow("波形類型:", gui.wave_type_combo)
+
+        #* 波形庫
+        library_row = QWidget()
+        library_layout = QHBoxLayout(library_row)
+        library_layout.setContentsMargins(0, 0, 0, 0)
+        library_layout.addWidget(gui.save_wave_library_btn)
+        library_layout.addWidget(gui.import_wave_library_btn)
+        layout.addRow(library_row)
         
         #* 基本参数
         layout.addRow("中段波型長度 (點數):", gui.pulse_length_spin)
@@ -178,6 +209,12 @@ class UIBuilder:
         custom_layout.addRow(gui.custom_params_btn)
         custom_layout.addRow(gui.custom_params_label)
         gui.wave_param_stack.addWidget(custom_params_widget)
+        #* 波形庫 (所有波形庫項目共用)
+        library_params_widget = QWidget()
+        library_layout = QFormLayout(library_params_widget)
+        library_layout.addRow(gui.library_info_label)
+        library_layout.addRow(gui.delete_wave_library_btn)
+        gui.wave_param_stack.addWidget(library_params_widget)
     
     @staticmethod
     def create_wave_preview_group(gui):
@@ -347,7 +384,14 @@ class UIBuilder:
         layout.addRow("起始電流(mA):", gui.current_start_spin)
         layout.addRow("終止電流(mA):", gui.current_stop_spin)
         layout.addRow("量測點數:", gui.current_points_spin)
-        
+
+        #* 電流穩定判定設置
+        layout.addRow("穩定判定:", gui.settle_mode_combo)
+        layout.addRow("電流容差:", gui.settle_tol_spin)
+        layout.addRow("探測容差:", gui.settle_probe_tol_spin)
+        layout.addRow("最短等待:", gui.settle_min_wait_spin)
+        layout.addRow("等待逾時:", gui.settle_timeout_spin)
+
         #* YOKOGAWA設備選擇
         yoko_devices_group = QGroupBox("偵測DC設備")
         yoko_layout = QVBoxLayout(yoko_devices_group)
@@ -397,14 +441,19 @@ class UIBuilder:
     # endregion
 
     # region: 實驗控制選項卡建立
+    @staticmethod
+    def add_canvas(layout, canvas, parent):
+        """加入繪圖元件, matplotlib 畫布附帶工具列 (pyqtgraph 以滑鼠及右鍵選單操作)"""
+        if not PlotBackend.is_fast(canvas):
+            layout.addWidget(NavigationToolbar(canvas, parent))
+        layout.addWidget(canvas)
+
     @staticmethod
     def create_plot_tab(canvas):
         """創建時域、頻域 {單張} 量測繪圖卡"""
         tab = QWidget()
         layout = QVBoxLayout(tab)
-        toolbar = NavigationToolbar(canvas, tab)
-        layout.addWidget(toolbar)
-        layout.addWidget(canvas)
+        UIBuilder.add_canvas(layout, canvas, tab)
         return tab
     
     @staticmethod
@@ -419,9 +468,7 @@ class UIBuilder:
         #* 上部分：熱圖及滑塊
         top_widget = QWidget()
         top_layout = QVBoxLayout(top_widget)
-        overview_toolbar = NavigationToolbar(gui.power_overview, top_widget)
-        top_layout.addWidget(overview_toolbar)
-        top_layout.addWidget(gui.power_overview)
+        UIBuilder.add_canvas(top_layout, gui.power_overview, top_widget)
         slider_layout = QHBoxLayout()
         slider_layout.addWidget(QLabel("選定振幅數據:"))
         slider_layout.addWidget(gui.power_slider)
@@ -431,9 +478,7 @@ class UIBuilder:
         #* 下部分：切片
         bottom_widget = QWidget()
         bottom_layout = QVBoxLayout(bottom_widget)
-        slice_toolbar = NavigationToolbar(gui.power_slice, bottom_widget)
-        bottom_layout.addWidget(slice_toolbar)
-        bottom_layout.addWidget(gui.power_slice)
+        UIBuilder.add_canvas(bottom_layout, gui.power_slice, bottom_widget)
         
         #* 分割器布局設置
         splitter.addWidget(top_widget)
@@ -454,9 +499,7 @@ class UIBuilder:
         #* 上部分：熱圖及滑塊
         top_widget = QWidget()
         top_layout = QVBoxLayout(top_widget)
-        overview_toolbar = NavigationToolbar(gui.freq_dep_overview, top_widget)
-        top_layout.addWidget(overview_toolbar)
-        top_layout.addWidget(gui.freq_dep_overview)
+        UIBuilder.add_canvas(top_layout, gui.freq_dep_overview, top_widget)
         slider_layout = QHBoxLayout()
         slider_layout.addWidget(QLabel("選定頻率數據:"))
         slider_layout.addWidget(gui.freq_dep_slider)
@@ -466,9 +509,7 @@ class UIBuilder:
         #* 下部分：切片
         bottom_widget = QWidget()
         bottom_layout = QVBoxLayout(bottom_widget)
-        slice_toolbar = NavigationToolbar(gui.freq_dep_slice, bottom_widget)
-        bottom_layout.addWidget(slice_toolbar)
-        bottom_layout.addWidget(gui.freq_dep_slice)
+        UIBuilder.add_canvas(bottom_layout, gui.freq_dep_slice, bottom_widget)
         
         #* 分割器布局設置
         splitter.addWidget(top_widget)
@@ -489,9 +530,7 @@ class UIBuilder:
         #* 上部分：熱圖
         top_widget = QWidget()
         top_layout = QVBoxLayout(top_widget)
-        overview_toolbar = NavigationToolbar(gui.current_freq_overview, top_widget)
-        top_layout.addWidget(overview_toolbar)
-        top_layout.addWidget(gui.current_freq_overview)
+        UIBuilder.add_canvas(top_layout, gui.current_freq_overview, top_widget)
         
         #* 上部分：電流滑塊
         current_slider_layout = QHBoxLayout()
@@ -510,9 +549,7 @@ class UIBuilder:
         #* 下部分：切片
         bottom_widget = QWidget()
         bottom_layout = QVBoxLayout(bottom_widget)
-        slice_toolbar = NavigationToolbar(gui.current_freq_slice, bottom_widget)
-        bottom_layout.addWidget(slice_toolbar)
-        bottom_layout.addWidget(gui.current_freq_slice)
+        UIBuilder.add_canvas(bottom_layout, gui.current_freq_slice, bottom_widget)
         
         #* 分割器布局設置
         splitter.addWidget(top_widget)
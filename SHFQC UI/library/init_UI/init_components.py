@@ -10,7 +10,11 @@ from matplotlib.backends.backend_qt5agg import (
     FigureCanvasQTAgg as FigureCanvas
 )
 
+import os
 import math
+
+from ..plot_backend import PlotBackend
+from ..File_Storage import DataSaver
 class init_components:
 
     @staticmethod
@@ -43,6 +47,21 @@ class init_components:
             self.gain_spin.setSingleStep(0.01)
             self.gain_spin.setValue(1.0)
             self.gain_spin.setDecimals(2)
+            #數據精度
+            self.precision_combo = QComboBox()
+            self.precision_combo.addItem("雙精度 (complex128)", userData='complex128')
+            self.precision_combo.addItem("單精度 (complex64)", userData='complex64')
+            #繪圖後端 (重新啟動後生效)
+            self.plot_backend_combo = QComboBox()
+            for backend in PlotBackend.available():
+                self.plot_backend_combo.addItem(PlotBackend.LABELS[backend], userData=backend)
+            self.plot_backend_combo.setCurrentIndex(max(self.plot_backend_combo.findData(self.plot_backend), 0))
+            #即時存檔 (掃描時逐點寫入 HDF5, 需要 h5py)
+            self.stream_save_check = QCheckBox("掃描時寫入 HDF5")
+            self.stream_save_check.setEnabled('hdf5' in DataSaver.available_formats())
+            self.stream_save_check.setToolTip("掃描時波形只寫入 HDF5 文件, 不保留於記憶體; 存為 HDF5 時直接移動此文件")
+            self.stream_dir_edit = QLineEdit(os.path.join(os.getcwd(), "即時數據"))
+            self.stream_dir_btn = QPushButton("瀏覽...")
             
             
             #? 波形生成组件
@@ -107,6 +126,11 @@ class init_components:
             #參數值顯示標籤
             self.custom_params_label = QLabel("參數: 無")
 
+            #* 波形庫設置
+            #波形資訊顯示標籤
+            self.library_info_label = QLabel("")
+            self.library_info_label.setWordWrap(True)
+
             #? 實驗方案選擇
             #* 實驗量測方案選擇控件
             self.scheme_combo = QComboBox()
@@ -222,6 +246,37 @@ class init_components:
             self.num_avg_spin_current_freq = QSpinBox()
             self.num_avg_spin_current_freq.setRange(1, 100000)
             self.num_avg_spin_current_freq.setSingleStep(10)
+            #電流穩定判定來源
+            self.settle_mode_combo = QComboBox()
+            self.settle_mode_combo.addItems(["讀回電流", "SHFQC探測", "不等待"])
+            #穩定容差
+            self.settle_tol_spin = QDoubleSpinBox()
+            self.settle_tol_spin.setRange(0, 1000)
+            self.settle_tol_spin.setDecimals(6)
+            self.settle_tol_spin.setSingleStep(0.001)
+            self.settle_tol_spin.setValue(0.001)
+            self.settle_tol_spin.setSuffix(" mA")
+
+            self.settle_probe_tol_spin = QDoubleSpinBox()
+            self.settle_probe_tol_spin.setRange(0, 1000)
+            self.settle_probe_tol_spin.setDecimals(6)
+            self.settle_probe_tol_spin.setSingleStep(0.001)
+            self.settle_probe_tol_spin.setValue(0.001)
+            self.settle_probe_tol_spin.setSuffix(" V")
+            #最短等待時間
+            self.settle_min_wait_spin = QDoubleSpinBox()
+            self.settle_min_wait_spin.setRange(0, 60)
+            self.settle_min_wait_spin.setDecimals(3)
+            self.settle_min_wait_spin.setSingleStep(0.01)
+            self.settle_min_wait_spin.setValue(0.02)
+            self.settle_min_wait_spin.setSuffix(" s")
+            #穩定等待逾時
+            self.settle_timeout_spin = QDoubleSpinBox()
+            self.settle_timeout_spin.setRange(0, 600)
+            self.settle_timeout_spin.setDecimals(2)
+            self.settle_timeout_spin.setSingleStep(0.5)
+            self.settle_timeout_spin.setValue(2.0)
+            self.settle_timeout_spin.setSuffix(" s")
             #* 頻域 {單張} 量測
             #掃頻起始結束頻率
             self.lo_start_spin = ScientificDoubleSpinBox()
@@ -245,6 +300,7 @@ class init_components:
             self.link_yoko_devices_group = QGroupBox("選擇YOKOGAWA設備")
             self.link_yoko_layout = QVBoxLayout(self.link_yoko_devices_group)
             self.yokos = []
+            self.yoko_checks = {}
             #* 量測進度條
             self.time_label = QLabel("等待實驗進行")
             self.progress_bar = QProgressBar()
@@ -257,6 +313,10 @@ class init_components:
             self.parse_formula_btn = QPushButton("解析公式")
             #參數設置按鈕
             self.custom_params_btn = QPushButton("設置參數")
+            #波形庫按鈕
+            self.save_wave_library_btn = QPushButton("存入波形庫")
+            self.import_wave_library_btn = QPushButton("匯入波形檔")
+            self.delete_wave_library_btn = QPushButton("刪除此波形")
             #電流-頻率掃描DC連線按鈕
             self.yoko_devices_contect = QPushButton("DC連線")
             #實驗量測按鈕
@@ -277,28 +337,28 @@ class init_components:
             #* 波型預覽畫布
             self.wave_preview = FigureCanvas(Figure(figsize=(6, 4)))
             #* 時域量測數據畫布
-            self.time_plot = FigureCanvas(Figure(figsize=(10, 6)))
+            self.time_plot = PlotBackend.create_canvas(self.plot_backend, 'trace', (10, 6))
             #* 頻域量測數據畫布
-            self.freq_plot = FigureCanvas(Figure(figsize=(10, 6)))
+            self.freq_plot = PlotBackend.create_canvas(self.plot_backend, 'trace', (10, 6))
             #* 功率掃描量測數據畫布
-            self.power_overview = FigureCanvas(Figure(figsize=(10, 4)))
-            self.power_slice = FigureCanvas(Figure(figsize=(10, 4)))
+            self.power_overview = PlotBackend.create_canvas(self.plot_backend, 'image', (10, 4))
+            self.power_slice = PlotBackend.create_canvas(self.plot_backend, 'trace', (10, 4))
             #功率選擇滑塊
             self.power_slider = QSlider(Qt.Orientation.Horizontal)
             self.power_slider.setRange(0, 100)
             self.power_slider.setEnabled(False)
             self.power_label = QLabel("選定功率: 0.0")
             #* 頻率掃描量測數據畫布        
-            self.freq_dep_overview = FigureCanvas(Figure(figsize=(10, 4)))
-            self.freq_dep_slice = FigureCanvas(Figure(figsize=(10, 4)))
+            self.freq_dep_overview = PlotBackend.create_canvas(self.plot_backend, 'image', (10, 4))
+            self.freq_dep_slice = PlotBackend.create_canvas(self.plot_backend, 'trace', (10, 4))
             #頻率選擇滑塊
             self.freq_dep_slider = QSlider(Qt.Orientation.Horizontal)
             self.freq_dep_slider.setRange(0, 100)
             self.freq_dep_slider.setEnabled(False)
             self.freq_dep_label = QLabel("選定頻率: 0.0 MHz")
             #* 電流-頻率掃描量測數據畫布   
-            self.current_freq_overview = FigureCanvas(Figure(figsize=(10, 4)))
-            self.current_freq_slice = FigureCanvas(Figure(figsize=(10, 4)))
+            self.current_freq_overview = PlotBackend.create_canvas(self.plot_backend, 'image', (10, 4))
+            self.current_freq_slice = PlotBackend.create_canvas(self.plot_backend, 'trace', (10, 4))
             #電流選擇滑塊
             self.current_slider = QSlider(Qt.Orientation.Horizontal)
             self.current_slider.setRange(0, 100)
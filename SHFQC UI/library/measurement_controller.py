@@ -1,11 +1,14 @@
+import os
 import numpy as np
 import time
 
 from PyQt6.QtCore import QThread, QObject, pyqtSignal, QMutex
 
-from .waveform_generation import generate_waveform
+from .device_control import SettlePolicy, YOKOGAWA
+from .waveform_generation import generate_waveform, generate_waveform_bank, waveform_dtype
 from .Formula_Parser import FormulaParser
 from .RealTimeMonitorDialog import RealTimeMonitorDialog
+from .File_Storage import StreamWriter
 
 class MeasurementController(QObject):
     #* 回傳信號定義
@@ -19,6 +22,7 @@ class MeasurementController(QObject):
     progress_signal = pyqtSignal(float, float)
     measurement_finished = pyqtSignal()
     error_occurred = pyqtSignal(str)
+    status_message = pyqtSignal(str)
     
     def __init__(self, gui, shfqc=None):
         super().__init__()
@@ -36,6 +40,9 @@ class MeasurementController(QObject):
         self.current_freq_data = []
         self.current_values = []
         self.freq_values = []
+        self.last_params = {}               #* 最近一次量測的參數快照 (保存 HDF5 時寫入)
+        self.stream_writer = None           #* 掃描時逐點寫入的 HDF5 即時存檔
+        self.stream_file = None             #* 最近一次完成的即時存檔路徑 (隨掃描數據送出, 存檔時直接移動)
 
     def run_measurement(self, mode, params, yokos=None):
         """啟動量測線程"""
@@ -50,6 +57,7 @@ class MeasurementController(QObject):
         if current_waveform is None:
             return False
         params['waveform'] = current_waveform
+        self.last_params = {**params, 'mode': mode}
 
         #* 創建並啟用線程
         self.measurement_thread = MeasurementThread(self.shfqc, {
@@ -61,10 +69,29 @@ class MeasurementController(QObject):
         
         #* 創建量測數據動態顯示窗口
         if mode in ['時域 {振幅} 掃描', '時域 {頻率} 掃描', '時域 {電流頻率} 掃描']:
+            sweep_axes = self._sweep_axes(mode, params)
             
             self.realtime_dialog = RealTimeMonitorDialog(mode, self.gui) 
+            #* 即時熱圖的掃描軸
+            if mode == '時域 {振幅} 掃描':
+                self.realtime_dialog.set_sweep(sweep_axes['amp'], "振幅")
+            elif mode == '時域 {頻率} 掃描':
+                self.realtime_dialog.set_sweep(sweep_axes['lo_values'] / 1e6, "混頻頻率 (MHz)")
+            else:
+                self.realtime_dialog.set_sweep(sweep_axes['lo_values'] / 1e6, "頻率 (MHz)")
             self.realtime_dialog.show()
 
+            #* 即時存檔: 每個掃描點到達時寫入 HDF5
+            self._close_stream()
+            self.stream_file = None
+            if params.get('stream_save'):
+                try:
+                    self.stream_writer = StreamWriter.create(
+                        params.get('stream_dir') or os.getcwd(), mode, sweep_axes, parameters=self.last_params
+                    )
+                except Exception as e:
+                    self.error_occurred.emit(f"無法建立即時存檔: {str(e)}")
+
         
         #* 連接量測信號
         if mode == '時域 {單張} 量測':
@@ -117,6 +144,60 @@ class MeasurementController(QObject):
         
         return True
     
+    @staticmethod
+    def _sweep_axes(mode, params):
+        """掃描軸數值 (與量測線程的掃描點一致), 名稱同 DataSaver.HDF5_AXES"""
+        if mode == '時域 {振幅} 掃描':
+            return {'amp': np.linspace(
+                params['power_dep_start'], params['power_dep_stop'], params['power_dep_points']
+            )}
+        elif mode == '時域 {頻率} 掃描':
+            return {'lo_values': np.linspace(
+                params['freq_dep_start'], params['freq_dep_stop'], params['freq_dep_points']
+            )}
+        return {
+            'curr': np.linspace(
+                params['curr_freq_dep_curr_start'], params['curr_freq_dep_curr_stop'],
+                params['curr_freq_dep_curr_points']
+            ) * 1e-3,
+            'lo_values': np.linspace(
+                params['curr_freq_dep_freq_start'], params['curr_freq_dep_freq_stop'],
+                params['curr_freq_dep_freq_point']
+            ),
+        }
+
+    # region: 即時存檔
+    def _stream(self, waveform, traces):
+        """存放一個掃描點的波形
+
+        即時存檔時波形只寫入文件, 不保留於記憶體; 未即時存檔 (或寫入失敗) 時
+        存入 traces. 寫入失敗時停止存檔, 已寫入的波形讀回 traces 後量測繼續.
+        """
+        if self.stream_writer is not None:
+            try:
+                self.stream_writer.append(waveform)
+                return
+            except Exception as e:
+                self.error_occurred.emit(f"即時存檔寫入失敗: {str(e)}")
+                traces.extend(self._close_stream())
+        traces.append(waveform)
+
+    def _close_stream(self):
+        """關閉即時存檔, 回傳文件內已寫入的波形 (依掃描順序)"""
+        if self.stream_writer is None:
+            return []
+        writer, self.stream_writer = self.stream_writer, None
+        traces = []
+        try:
+            traces = list(writer.written())
+            writer.close()
+            self.stream_file = writer.file_path
+            self.status_message.emit(f"即時存檔已保存: {writer.file_path} ({writer.points} 點)")
+        except Exception as e:
+            self.error_occurred.emit(f"即時存檔關閉失敗: {str(e)}")
+        return traces
+    # endregion
+
     # region: 量測數據處理
     def _handle_time_data(self, data):
         """處理時域 {單張} 量測數據"""
@@ -144,15 +225,17 @@ class MeasurementController(QObject):
         elif isinstance(data, tuple) and len(data) == 3 and data[0] == 'data':
             amp, waveform = data[1], data[2]
             self.power_amplitudes.append(amp)
-            self.power_data.append(waveform)
+            self._stream(waveform, self.power_data)
             
             #* 更新實時監控的參數
             if hasattr(self, 'realtime_dialog'):
                 self.realtime_dialog.update_plot((amp, waveform))
         elif isinstance(data, tuple) and len(data) == 1:
+            self.power_data.extend(self._close_stream())
             self.power_dep_data_back = {
                 'amp':self.power_amplitudes,
-                'data':self.power_data
+                'data':self.power_data,
+                'stream_file': self.stream_file
             }
             self.power_data_updated.emit(self.power_dep_data_back)
 
@@ -169,7 +252,7 @@ class MeasurementController(QObject):
         if isinstance(data, tuple) and len(data) == 3 and data[0] == 'data':
             freq, waveform = data[1], data[2]
             self.freq_lo_values.append(freq)
-            self.freq_dep_data.append(waveform)
+            self._stream(waveform, self.freq_dep_data)
             
             # 更新实时监控的绘图
             if hasattr(self, 'realtime_dialog'):
@@ -177,9 +260,11 @@ class MeasurementController(QObject):
                 
         # 处理完成信号
         elif isinstance(data, tuple) and len(data) == 1 and data[0] == 'complete':
+            self.freq_dep_data.extend(self._close_stream())
             self.freq_dep_data_back = {
                 'lo_values': self.freq_lo_values,
-                'data': self.freq_dep_data
+                'data': self.freq_dep_data,
+                'stream_file': self.stream_file
             }
             self.freq_dep_data_updated.emit(self.freq_dep_data_back)
 
@@ -197,7 +282,7 @@ class MeasurementController(QObject):
             current, freq, waveform = data[1], data[2], data[3]
             self.current_values.append(current)
             self.freq_values.append(freq)
-            self.current_freq_data.append(waveform)
+            self._stream(waveform, self.current_freq_data)
             
             # 更新实时监控的绘图
             if hasattr(self, 'realtime_dialog'):
@@ -205,6 +290,7 @@ class MeasurementController(QObject):
                 
         # 处理完成信号
         elif isinstance(data, tuple) and len(data) == 1 and data[0] == 'complete':
+            self.current_freq_data.extend(self._close_stream())
             data_3d = []
             for i in range(self.cruu_len):
                 row = []
@@ -216,7 +302,8 @@ class MeasurementController(QObject):
             self.current_freq_data_back = {
                 'curr': self.current_values[:self.cruu_len],  # 只取有效电流值
                 'lo_values': self.freq_values[:self.freq_len],  # 只取有效频率值
-                'data': data_3d  # 三维数据 [电流点][频率点][时间点]
+                'data': data_3d,  # 三维数据 [电流点][频率点][时间点]
+                'stream_file': self.stream_file
             }
             self.current_freq_data_updated.emit(self.current_freq_data_back)
     # endregion
@@ -224,6 +311,7 @@ class MeasurementController(QObject):
     def _handle_measurement_finished(self):
         """处理测量完成"""
         self.measurement_thread = None
+        self._close_stream()
         self.shfqc.qa_input(0)
         self.shfqc.qa_output(0)
         
@@ -252,6 +340,7 @@ class MeasurementThread(QThread):
         self.shfqc = shfqc
         self.params = params
         self.formula_parser = FormulaParser
+        self.dtype = waveform_dtype(params)     #* 量測數據精度
         self._is_running = True
         self.mutex = QMutex()
 
@@ -268,7 +357,8 @@ class MeasurementThread(QThread):
             elif self.params['mode'] == '時域 {頻率} 掃描':
                 self._run_frequency_dependent()
             elif self.params['mode'] == '時域 {電流頻率} 掃描':
-                self.run_current_frequency_dependent()
+                with YOKOGAWA.exclusive(self.params['yokos']):
+                    self.run_current_frequency_dependent()
         except Exception as e:
             self.error_signal.emit(str(e))
         finally:
@@ -294,7 +384,8 @@ class MeasurementThread(QThread):
         #* 執行量測
         data = self.shfqc.qa_measure_signal(
                 n_mea=self.params['n_avg'],
-                readout_duration=self.params['window_duration']
+                readout_duration=self.params['window_duration'],
+                dtype=self.dtype
             )
         
         #* 回傳數據
@@ -350,7 +441,8 @@ class MeasurementThread(QThread):
                 break
             start_time = time.time()
             #* 生成當前振幅的波形
-            current_waveform = amp * self.params['waveform']
+            waveform = self.params['waveform']
+            current_waveform = (amp * waveform).astype(waveform.dtype, copy=False)  # 維持單精度模式
             
             #* 上傳波形
             time.sleep(1*1e-6)
@@ -359,7 +451,8 @@ class MeasurementThread(QThread):
             #* 執行量測
             data = self.shfqc.qa_measure_signal(
                 n_mea=self.params['n_avg'],
-                readout_duration=self.params['window_duration']
+                readout_duration=self.params['window_duration'],
+                dtype=self.dtype
             )
             
             #* 回傳數據
@@ -410,6 +503,9 @@ class MeasurementThread(QThread):
             self.params['freq_dep_stop'],
             self.params['freq_dep_points']
         )
+
+        # 一次生成所有頻率點的波形庫
+        bank = self._build_waveform_bank({'digital_lo': freqs})
         
         # 測量每個頻率點
         left_time_avg=10
@@ -421,10 +517,7 @@ class MeasurementThread(QThread):
             start_time = time.time()
             # 更新波型
             self.params['digital_lo']=freq
-            current_waveform = generate_waveform(
-                self.params
-            )
-            self.params['waveform'] = current_waveform
+            self.params['waveform'] = bank[i]
             
             # 上傳波形
             time.sleep(1*1e-6)
@@ -433,7 +526,8 @@ class MeasurementThread(QThread):
             # 測量
             data = self.shfqc.qa_measure_signal(
                 n_mea=self.params['n_avg'],
-                readout_duration=self.params['window_duration']
+                readout_duration=self.params['window_duration'],
+                dtype=self.dtype
             )
             
             # 發送當前數據點（頻率和整個波形）
@@ -493,6 +587,11 @@ class MeasurementThread(QThread):
             self.params['curr_freq_dep_freq_stop'],
             self.params['curr_freq_dep_freq_point']
         )
+        # 一次生成所有頻率點的波形庫, 各電流點共用
+        bank = self._build_waveform_bank({'digital_lo': freqs})
+
+        # 電流穩定判定
+        settle = self._build_settle_policy(yokos)
 
         left_time_avg=10
         time_avg=[0]*left_time_avg
@@ -503,16 +602,14 @@ class MeasurementThread(QThread):
             
             for yoko in yokos:
                 yoko.output_value(curr)
+            settled = self._wait_current_settled(yokos, settle)
             for j, freq in enumerate(freqs):
                 if not self._is_running:
                     break
                 start_time = time.time()
                 # 更新波型
                 self.params['digital_lo']=freq
-                current_waveform = generate_waveform(
-                    self.params,
-                )
-                self.params['waveform'] = current_waveform
+                self.params['waveform'] = bank[j]
                 
                 # 上傳波形
                 time.sleep(1*1e-6)
@@ -521,7 +618,8 @@ class MeasurementThread(QThread):
                 # 測量
                 data = self.shfqc.qa_measure_signal(
                     n_mea=self.params['n_avg'],
-                    readout_duration=self.params['window_duration']
+                    readout_duration=self.params['window_duration'],
+                    dtype=self.dtype
                 )
                 
                 # 發送當前數據點（頻率和整個波形）
@@ -538,7 +636,8 @@ class MeasurementThread(QThread):
                     '當前電流': f"{curr*1000:.4f} mA",
                     '當前頻率': f"{freq/1e6:.4f} MHz",
                     '進度': f"{i+1}/{len(currs)} (電流), {j+1}/{len(freqs)} (頻率)",
-                    '當前平均時間': f"{execution_time:.2f}秒"
+                    '當前平均時間': f"{execution_time:.2f}秒",
+                    '電流穩定': {True: "是", False: "逾時", None: "固定等待"}[settled]
                 }
                 self.update_signal.emit(('params', current_params))
                 
@@ -551,6 +650,59 @@ class MeasurementThread(QThread):
         self.update_signal.emit(('complete',))
 
 
+    def _build_waveform_bank(self, sweep):
+        """生成掃描用波形庫, 失敗時拋出例外 (由 run 經錯誤信號回報)"""
+        errors = []
+        bank = generate_waveform_bank(self.params, sweep, error_callback=errors.append)
+        if bank is None:
+            raise ValueError(errors[-1] if errors else "波形庫生成失敗")
+        return bank
+
+    def _build_settle_policy(self, yokos):
+        """依參數建立電流穩定判定策略, 不等待模式回傳 None
+
+        讀回電流模式會先逐台確認 :MEAS? 可用, 任一台不支援時
+        改為固定等待最短等待時間, 並經由錯誤信號提示.
+        """
+        mode = self.params.get('settle_mode', '不等待')
+        if mode == '讀回電流':
+            unsupported = [yoko.id for yoko in yokos if not SettlePolicy.supports_measurement(yoko)]
+            if unsupported:
+                self.error_signal.emit(
+                    f"YOKOGAWA {', '.join(unsupported)} 不支援量測讀回 (:MEAS?), "
+                    f"改為固定等待 {self.params['settle_min_wait']} 秒"
+                )
+            return SettlePolicy(
+                tolerance=self.params['settle_tolerance']*1e-3,  # mA -> A
+                min_wait=self.params['settle_min_wait'],
+                timeout=self.params['settle_timeout'],
+                measured=not unsupported
+            )
+        elif mode == 'SHFQC探測':
+            #* 固定以掃描前的波形探測, 每次探測前重新上傳 (掃描迴圈會改寫波形記憶體)
+            probe_waveform = np.array(self.params['waveform'])
+            def probe():
+                self.shfqc.qa_assign_single_complex_waveform(probe_waveform)
+                data = self.shfqc.qa_measure_signal(
+                    n_mea=self.params['n_avg'],
+                    readout_duration=self.params['window_duration']
+                )
+                return np.mean(np.abs(data))
+            return SettlePolicy(
+                tolerance=self.params['settle_probe_tolerance'],
+                min_wait=self.params['settle_min_wait'],
+                timeout=self.params['settle_timeout'],
+                n_stable=2,
+                probe=probe
+            )
+        return None
+
+    def _wait_current_settled(self, yokos, settle):
+        """等待所有YOKOGAWA到達設定電流, 回傳是否全部穩定 (固定等待時回傳 None)"""
+        if settle is None:
+            return True
+        return settle.wait(*yokos)
+
     def stop(self):
         """安全停止测量"""
         self.mutex.lock()
@@ -0,0 +1,122 @@
+import numpy as np
+from PyQt6.QtCore import Qt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+
+#* pyqtgraph 為選用套件, 未安裝時只提供 matplotlib 後端
+try:
+    import pyqtgraph as pg
+except ImportError:
+    pg = None
+
+
+class PlotBackend:
+    """互動繪圖後端
+
+    matplotlib: FigureCanvasQTAgg, 由 PlotManager 以 Figure/Axes 繪製, 亦用於輸出圖檔.
+    pyqtgraph : Qt 原生的 PlotDataItem/ImageItem 繪製 (FastTraceView/FastImageView),
+                適合實時監控及大量數據的互動檢視, 輸出圖檔仍使用 matplotlib.
+    """
+    MATPLOTLIB = 'matplotlib'
+    PYQTGRAPH = 'pyqtgraph'
+    DEFAULT = MATPLOTLIB
+    LABELS = {
+        MATPLOTLIB: "matplotlib (標準)",
+        PYQTGRAPH: "pyqtgraph (高速)",
+    }
+
+    @staticmethod
+    def available():
+        """可用的後端名稱"""
+        backends = [PlotBackend.MATPLOTLIB]
+        if pg is not None:
+            backends.append(PlotBackend.PYQTGRAPH)
+        return backends
+
+    @staticmethod
+    def resolve(name):
+        """取得實際使用的後端, 未安裝或未知的後端退回 matplotlib"""
+        if name == PlotBackend.PYQTGRAPH and pg is None:
+            return PlotBackend.MATPLOTLIB
+        return name if name in PlotBackend.LABELS else PlotBackend.DEFAULT
+
+    @staticmethod
+    def create_canvas(backend, kind='trace', figsize=(10, 4), parent=None):
+        """建立繪圖元件
+
+        Args:
+            backend: 後端名稱
+            kind: 'trace' (軌跡) 或 'image' (熱圖), 只影響 pyqtgraph 後端
+            figsize: matplotlib 畫布尺寸
+        """
+        if backend == PlotBackend.PYQTGRAPH and pg is not None:
+            return FastImageView(parent) if kind == 'image' else FastTraceView(parent)
+        return FigureCanvas(Figure(figsize=figsize))
+
+    @staticmethod
+    def is_fast(canvas):
+        """是否為 pyqtgraph 繪圖元件"""
+        return pg is not None and isinstance(canvas, (FastTraceView, FastImageView))
+
+
+if pg is not None:
+    class FastTraceView(pg.PlotWidget):
+        """pyqtgraph 軌跡圖
+
+        單一持續存在的 PlotDataItem, 以 peak 降採樣及 clip-to-view 只繪出
+        可視範圍內每像素的最大/最小值, 縮放時自動重新降採樣.
+        """
+        def __init__(self, parent=None):
+            super().__init__(parent, background='w')
+            self.showGrid(x=True, y=True)
+            self.curve = self.plot(pen=pg.mkPen('b'), name='振幅')
+            self.curve.setDownsampling(auto=True, method='peak')
+            self.curve.setClipToView(True)
+
+        def set_trace(self, x, y, ylim=None):
+            """更新軌跡數據, ylim 為固定縱軸範圍 (None 則自動縮放)"""
+            self.curve.setData(np.asarray(x), np.asarray(y))
+            if ylim is not None:
+                self.setYRange(*ylim, padding=0)
+
+        def set_labels(self, xlabel, ylabel, title=None):
+            self.setLabel('bottom', xlabel)
+            self.setLabel('left', ylabel)
+            if title is not None:
+                self.setTitle(title)
+
+
+    class FastImageView(pg.PlotWidget):
+        """pyqtgraph 熱圖
+
+        ImageItem、色條及水平標記線只建立一次, 更新時只替換影像數據與色階.
+        """
+        def __init__(self, parent=None, cmap='coolwarm'):
+            super().__init__(parent, background='w')
+            self.image = pg.ImageItem(axisOrder='row-major')
+            self.addItem(self.image)
+            colormap = pg.colormap.get(cmap, source='matplotlib')
+            self.image.setColorMap(colormap)
+            self.colorbar = pg.ColorBarItem(colorMap=colormap, interactive=False)
+            self.colorbar.setImageItem(self.image, insert_in=self.getPlotItem())
+            self.marker = pg.InfiniteLine(angle=0, movable=False,
+                                          pen=pg.mkPen('y', width=2, style=Qt.PenStyle.DashLine))
+            self.addItem(self.marker)
+
+        def set_image(self, data, extent, clim):
+            """更新影像 (列為縱軸), extent 為 [x0, x1, y0, y1]"""
+            x0, x1, y0, y1 = extent
+            self.image.setImage(np.asarray(data), autoLevels=False, levels=clim)
+            self.image.setRect(x0, y0, x1 - x0, y1 - y0)
+            self.colorbar.setLevels(clim)
+
+        def set_marker(self, y):
+            self.marker.setValue(y)
+
+        def set_labels(self, xlabel, ylabel, cbar_label=None, title=None):
+            self.setLabel('bottom', xlabel)
+            self.setLabel('left', ylabel)
+            if cbar_label is not None:
+                self.colorbar.setLabel('right', cbar_label)
+            if title is not None:
+                self.setTitle(title)
\ No newline at end of file
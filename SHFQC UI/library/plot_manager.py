@@ -2,6 +2,189 @@ import os
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import cm
+from .plot_backend import PlotBackend
+
+
+class BlitManager:
+    """以 blitting 更新畫布上的動態繪圖物件
+
+    動態物件平時為一般繪圖物件, 完整重繪 (縮放/視窗大小改變/影像更新/存圖)
+    照常繪出, 並由 draw_event 使快取背景失效. 下次更新時才暫時設為 animated
+    重繪一次, 擷取不含動態物件的背景, 之後只還原背景並重繪動態物件
+    (軌跡線、標記線、標題).
+    """
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._background = None
+        self._artists = []
+        self._capturing = False
+        self.cid = canvas.mpl_connect('draw_event', self._on_draw)
+
+    def add_artist(self, artist):
+        """加入動態繪圖物件"""
+        self._artists.append(artist)
+        self._background = None
+
+    def reset(self):
+        """清除動態繪圖物件 (畫布重建時)"""
+        self._artists = []
+        self._background = None
+
+    def _on_draw(self, event):
+        """完整重繪: 擷取背景中則保存背景, 否則使快取背景失效"""
+        if event.canvas is not self.canvas:
+            return
+        if self._capturing:
+            self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        else:
+            self._background = None
+
+    def _capture_background(self):
+        """暫時排除動態物件完整重繪一次, 擷取背景"""
+        self._capturing = True
+        for artist in self._artists:
+            artist.set_animated(True)
+        try:
+            self.canvas.draw()
+        finally:
+            for artist in self._artists:
+                artist.set_animated(False)
+            self._capturing = False
+
+    def _draw_animated(self):
+        for artist in self._artists:
+            self.canvas.figure.draw_artist(artist)
+
+    def update(self):
+        """只重繪動態物件"""
+        if self._background is None:
+            self._capture_background()
+        if self._background is not None:
+            self.canvas.restore_region(self._background)
+            self._draw_animated()
+            self.canvas.blit(self.canvas.figure.bbox)
+        self.canvas.flush_events()
+
+
+def minmax_decimate(x, y, x_range, n_bins):
+    """min/max 降採樣
+
+    只取 x_range 內 (含兩側各一點) 的數據, 分成 n_bins 個區間, 每個區間保留
+    最小值與最大值兩點並維持先後順序, 尖峰與包絡不會因降採樣而消失.
+    點數不超過 2*n_bins 時直接回傳原始數據.
+    """
+    lo, hi = sorted(x_range)
+    start = max(int(np.searchsorted(x, lo, 'left')) - 1, 0)
+    stop = min(int(np.searchsorted(x, hi, 'right')) + 1, len(x))
+    n = stop - start
+    if n <= 2 * n_bins:
+        return x[start:stop], y[start:stop]
+
+    bin_size = -(-n // n_bins)
+    n_bins = -(-n // bin_size)
+    segment = y[start:stop]
+    pad = n_bins * bin_size - n
+    if pad:
+        #* 以最後一點補齊, 不影響最後區間的最小/最大值
+        segment = np.concatenate([segment, np.repeat(segment[-1:], pad)])
+    segment = segment.reshape(n_bins, bin_size)
+    index = np.sort(np.stack([segment.argmin(axis=1), segment.argmax(axis=1)], axis=1), axis=1)
+    index = np.minimum((index + start + np.arange(n_bins)[:, None] * bin_size).ravel(), stop - 1)
+    return x[index], y[index]
+
+
+class DecimatedLine:
+    """長軌跡的 level-of-detail 繪製
+
+    保留完整解析度數據, 只將可視範圍內每像素約 POINTS_PER_PIXEL 個點交給 Line2D;
+    縮放/平移 (xlim_changed) 時依新的範圍重新降採樣. x 須為遞增序列.
+    回呼以弱參照註冊, 呼叫端須保留此物件.
+    """
+    POINTS_PER_PIXEL = 2
+
+    def __init__(self, line, x, y):
+        self.line = line
+        self.ax = line.axes
+        self.set_data(x, y)
+        self.ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
+    @classmethod
+    def plot(cls, ax, x, y, *args, **kwargs):
+        """同 ax.plot, 但以全範圍降採樣後的數據建立軌跡線"""
+        x, y = np.asarray(x), np.asarray(y)
+        line, = ax.plot(*minmax_decimate(x, y, (x[0], x[-1]) if len(x) else (0, 0), cls._bins(ax)), *args, **kwargs)
+        return cls(line, x, y)
+
+    @classmethod
+    def _bins(cls, ax):
+        return max(int(ax.bbox.width * cls.POINTS_PER_PIXEL / 2), 1)
+
+    def set_data(self, x, y):
+        """更換完整解析度數據"""
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.refresh()
+
+    def refresh(self):
+        """依目前可視範圍重新降採樣"""
+        if not len(self.x):
+            self.line.set_data(self.x, self.y)
+            return
+        #* 自動縮放時視圖會跟隨數據範圍, 直接以全範圍降採樣
+        if self.ax.get_autoscalex_on():
+            x_range = (self.x[0], self.x[-1])
+        else:
+            x_range = self.ax.get_xlim()
+        self.line.set_data(*minmax_decimate(self.x, self.y, x_range, self._bins(self.ax)))
+
+    def _on_xlim_changed(self, ax):
+        self.refresh()
+
+
+class SweepCube:
+    """掃描數據衍生視圖快取
+
+    每組數據只轉換一次為 ndarray, 振幅/相位/dB 及各切片的最小最大值
+    於首次使用時計算並保留, 數據更換時建立新的 SweepCube 即失效.
+    """
+    def __init__(self, data):
+        self.data = np.asarray(data)
+        self._views = {}
+
+    def __len__(self):
+        return len(self.data)
+
+    def _view(self, name, compute):
+        view = self._views.get(name)
+        if view is None:
+            view = compute()
+            self._views[name] = view
+        return view
+
+    def magnitude(self):
+        """振幅 |data|"""
+        return self._view('magnitude', lambda: np.abs(self.data))
+
+    def phase(self):
+        """相位 (rad)"""
+        return self._view('phase', lambda: np.angle(self.data))
+
+    def db(self):
+        """振幅 dB (20log10|data|)"""
+        def compute():
+            with np.errstate(divide='ignore'):
+                return 20 * np.log10(self.magnitude())
+        return self._view('db', compute)
+
+    def limits(self, view='magnitude'):
+        """各切片的 (最小值, 最大值), 三維數據依第一軸分切片, 二維數據為整體範圍"""
+        def compute():
+            values = getattr(self, view)()
+            axes = tuple(range(1, values.ndim)) if values.ndim == 3 else None
+            finite = np.where(np.isfinite(values), values, np.nan)
+            return np.nanmin(finite, axis=axes), np.nanmax(finite, axis=axes)
+        return self._view(f'limits_{view}', compute)
+
 
 class PlotManager:
     def __init__(self, gui):
@@ -12,14 +195,153 @@ class PlotManager:
         self.power_data = None
         self.freq_dep_data = None
         self.current_freq_data = None
+        self._heatmaps = {}                 #* 熱圖持續存在的繪圖物件 {名稱: {'ax', 'im', 'line'}}
+        self._current_freq_index = None     #* 電流頻率熱圖目前顯示的電流索引
+        self._slices = {}                   #* 切片圖持續存在的繪圖物件 {名稱: {'ax', 'line', 'lod'}}
+        self._time_line = None              #* 時域 {單張} 軌跡的 DecimatedLine
+        self._blitters = {}                 #* 各畫布的 BlitManager
+        self._cubes = {}                    #* 各掃描數據的衍生視圖快取 {名稱: SweepCube}
+        self._pending = {}                  #* 分頁不可見時延後的繪製 {分頁名稱: {部分: 繪製函式}}
+
+    # region: 延後繪製 (只繪製可見分頁)
+    RENDER_ORDER = ('plot', 'overview', 'slice')
+
+    def _render(self, key, part, render):
+        """分頁可見時立即繪製, 否則記錄為待繪製 (同一部分只保留最新一次)"""
+        tabs = getattr(self.gui, 'viz_tabs', None)
+        pages = getattr(self.gui, 'viz_tab_pages', {})
+        if tabs is None or key not in pages or tabs.currentWidget() is pages[key]:
+            render()
+        else:
+            self._pending.setdefault(key, {})[part] = render
+
+    def render_pending(self, index):
+        """切換分頁時繪製該分頁待繪製的部分 (連接 QTabWidget.currentChanged)"""
+        page = self.gui.viz_tabs.widget(index)
+        for key, tab in self.gui.viz_tab_pages.items():
+            if tab is page:
+                pending = self._pending.pop(key, {})
+                for part in self.RENDER_ORDER:
+                    if part in pending:
+                        pending[part]()
+    # endregion
+
+    # region: 熱圖/切片共用
+    def _blitter(self, canvas):
+        """取得畫布的 BlitManager"""
+        blitter = self._blitters.get(id(canvas))
+        if blitter is None:
+            blitter = BlitManager(canvas)
+            self._blitters[id(canvas)] = blitter
+        return blitter
+
+    def _update_heatmap(self, key, canvas, magnitude, extent, marker, cbar_label, xlabel, ylabel, title, clim):
+        """更新熱圖
+
+        AxesImage、colorbar 與標記線只在首次 (或畫布被清除) 時建立,
+        之後僅以 set_data/set_extent 更新影像, 色階使用快取的切片範圍.
+        """
+        if PlotBackend.is_fast(canvas):
+            canvas.set_image(magnitude, extent, clim)
+            canvas.set_marker(marker)
+            canvas.set_labels(xlabel, ylabel, cbar_label, title)
+            return canvas.marker
+
+        artists = self._heatmaps.get(key)
+        if artists is None or artists['ax'] not in canvas.figure.axes:
+            canvas.figure.clear()
+            ax = canvas.figure.add_subplot(111)
+            im = ax.imshow(magnitude, cmap='coolwarm', aspect='auto', extent=extent, origin='lower',
+                           vmin=clim[0], vmax=clim[1])
+            line = ax.axhline(y=marker, color='yellow', linestyle='--', linewidth=2)
+            canvas.figure.colorbar(im, ax=ax).set_label(cbar_label)
+            ax.set_xlabel(xlabel)
+            ax.set_ylabel(ylabel)
+            blitter = self._blitter(canvas)
+            blitter.reset()
+            blitter.add_artist(line)
+            artists = {'ax': ax, 'im': im, 'line': line}
+            self._heatmaps[key] = artists
+        else:
+            artists['im'].set_data(magnitude)
+            artists['im'].set_extent(extent)
+            artists['im'].set_clim(*clim)
+            artists['line'].set_ydata([marker, marker])
+        artists['ax'].set_title(title)
+        canvas.draw_idle()
+        return artists['line']
+
+    def _move_marker(self, key, canvas, y):
+        """只移動熱圖上的標記線 (blitting)"""
+        if PlotBackend.is_fast(canvas):
+            canvas.set_marker(y)
+            return
+        artists = self._heatmaps.get(key)
+        if artists is None or artists['ax'] not in canvas.figure.axes:
+            return
+        artists['line'].set_ydata([y, y])
+        self._blitter(canvas).update()
+
+    def _update_slice(self, key, canvas, time_axis, magnitude, ylim, ylabel, title):
+        """更新切片圖
+
+        座標軸、格線與圖例只在首次 (或畫布被清除) 時建立, 之後以 blitting
+        只重繪軌跡線與標題. 同一組數據的切片共用固定的縱軸範圍.
+        """
+        if PlotBackend.is_fast(canvas):
+            canvas.set_trace(time_axis, magnitude, ylim)
+            canvas.set_labels("時間 (ns)", ylabel, title)
+            return
+
+        artists = self._slices.get(key)
+        if artists is None or artists['ax'] not in canvas.figure.axes:
+            canvas.figure.clear()
+            ax = canvas.figure.add_subplot(111)
+            lod = DecimatedLine.plot(ax, time_axis, magnitude, 'b-', label='振幅')
+            line = lod.line
+            #ax.plot(time_axis, np.real(waveform), 'r--', label='實部', alpha=0.3)
+            #ax.plot(time_axis, np.imag(waveform), 'g-.', label='虛部', alpha=0.3)
+            ax.set_xlabel("時間 (ns)")
+            ax.set_ylabel(ylabel)
+            ax.set_ylim(*ylim)
+            ax.legend()
+            ax.grid(True)
+            ax.set_title(title)
+            blitter = self._blitter(canvas)
+            blitter.reset()
+            blitter.add_artist(line)
+            blitter.add_artist(ax.title)
+            self._slices[key] = {'ax': ax, 'line': line, 'lod': lod}
+            canvas.draw_idle()
+            return
+
+        artists['lod'].set_data(time_axis, magnitude)
+        artists['ax'].title.set_text(title)
+        self._blitter(canvas).update()
+
+    def _slice_ylim(self, key):
+        """整組數據切片共用的縱軸範圍"""
+        _, peaks = self._cubes[key].limits()
+        peak = float(np.nanmax(peaks)) if np.size(peaks) else 1.0
+        return (0, peak * 1.05 if peak > 0 else 1.0)
+    # endregion
+
     # region: 時域 {單張} 量測繪製
     #* 時域 {單張} 量測繪製
     def update_time_plot(self, data):
         """更新時域 {單張} 繪圖"""
+        self._render('time', 'plot', lambda: self._draw_time_plot(data))
+
+    def _draw_time_plot(self, data):
+        t = np.arange(len(data)) * 0.5e-9
+        if PlotBackend.is_fast(self.gui.time_plot):
+            self.gui.time_plot.set_trace(t*1e9, np.abs(data))
+            self.gui.time_plot.set_labels('時間 (ns)', '電壓 (V)')
+            return
+
         self.gui.time_plot.figure.clear()
         ax = self.gui.time_plot.figure.add_subplot(111)
-        t = np.arange(len(data)) * 0.5e-9
-        ax.plot(t*1e9, np.abs(data), label='電壓')
+        self._time_line = DecimatedLine.plot(ax, t*1e9, np.abs(data), label='電壓')
         ax.set_xlabel('時間 (ns)')
         ax.set_ylabel('電壓 (V)')
         ax.legend()
@@ -31,12 +353,20 @@ class PlotManager:
     #* 頻域 {單張} 量測繪製
     def update_freq_plot(self, data):
         """更新頻域 {單張} 繪圖"""
-        self.gui.freq_plot.figure.clear()
-        ax = self.gui.freq_plot.figure.add_subplot(111)
+        self._render('freq', 'plot', lambda: self._draw_freq_plot(data))
+
+    def _draw_freq_plot(self, data):
         freq = data['freq']
         data = data['data']
         data_power = (np.abs(data)**2)*10
         data_dBm = 10*np.log10(data_power)
+        if PlotBackend.is_fast(self.gui.freq_plot):
+            self.gui.freq_plot.set_trace(freq/1e9, data_dBm)
+            self.gui.freq_plot.set_labels('頻率 (GHz)', '幅度 (dB)')
+            return
+
+        self.gui.freq_plot.figure.clear()
+        ax = self.gui.freq_plot.figure.add_subplot(111)
         ax.plot(freq/1e9, data_dBm)
         ax.set_xlabel('頻率 (GHz)')
         ax.set_ylabel('幅度 (dB)')
@@ -52,12 +382,14 @@ class PlotManager:
         self.gui.power_amplitudes = data['amp']
         self.power_data = data['data']
         self.gui.power_data = data['data']
+        self._slices.pop('power', None)
+        self._cubes['power'] = SweepCube(self.power_data)
         #* 滑條設置
         self.gui.power_slider.setEnabled(True)
         self.gui.power_slider.setRange(0, len(self.gui.power_amplitudes) - 1)
         self.gui.power_slider.setValue(0)
 
-        self._plot_power_overview()
+        self._render('power', 'overview', self._plot_power_overview)
         self.update_power_slice(0)
     
     def _plot_power_overview(self):
@@ -66,25 +398,18 @@ class PlotManager:
             return
 
         amplitudes = np.array(self.gui.power_amplitudes)
-        waveforms = np.array(self.gui.power_data)
-        time_axis = np.arange(waveforms.shape[1]) * 0.5e-9
+        cube = self._cubes['power']
+        time_axis = np.arange(cube.data.shape[1]) * 0.5e-9
         self.gui.power_time_axis = time_axis
 
-        self.gui.power_overview.figure.clear()
-        ax = self.gui.power_overview.figure.add_subplot(111)
-        im = ax.imshow(np.abs(waveforms), cmap='coolwarm', aspect='auto',
-                    extent=[time_axis[0] * 1e9, time_axis[-1] * 1e9,
-                            amplitudes[0], amplitudes[-1]], origin='lower')
-        
-        #* 添加振幅標記線
+        #* 振幅標記線位置
         current_amp = amplitudes[self.gui.power_slider.value()]
-        self.gui.power_line = ax.axhline(y=current_amp, color='yellow', linestyle='--', linewidth=2)
-        
-        self.gui.power_overview.figure.colorbar(im, ax=ax).set_label("|single| (V)")
-        ax.set_xlabel("時間 (ns)")
-        ax.set_ylabel("振幅")
-        ax.set_title("時域 {振幅} 量測 2D熱圖")
-        self.gui.power_overview.draw()
+        self.gui.power_line = self._update_heatmap(
+            'power', self.gui.power_overview, cube.magnitude(),
+            [time_axis[0] * 1e9, time_axis[-1] * 1e9, amplitudes[0], amplitudes[-1]],
+            current_amp, "|single| (V)", "時間 (ns)", "振幅", "時域 {振幅} 量測 2D熱圖",
+            cube.limits()
+        )
 
     def update_power_slice(self, index):
         """更新時域 {振幅} 指定振幅切片圖"""
@@ -92,30 +417,20 @@ class PlotManager:
             return
 
         amplitude = self.gui.power_amplitudes[index]
-        waveform = self.gui.power_data[index]
-        time_axis = self.gui.power_time_axis * 1e9
-
         self.gui.power_label.setText(f"選定振幅: {amplitude:.3f}")
+        self._render('power', 'slice', lambda: self._draw_power_slice(index))
+
+    def _draw_power_slice(self, index):
+        amplitude = self.gui.power_amplitudes[index]
+        time_axis = self.gui.power_time_axis * 1e9
 
         #* 更新熱圖上的標記線
-        if hasattr(self.gui, 'power_line'):
-            self.gui.power_line.set_ydata([amplitude, amplitude])
-            self.gui.power_overview.draw()
-
-        fig = self.gui.power_slice.figure
-        fig.clear()
-        ax = fig.add_subplot(111)
-
-        ax.plot(time_axis, np.abs(waveform), 'b-', label='振幅')
-        #ax.plot(time_axis, np.real(waveform), 'r--', label='實部', alpha=0.3)
-        #ax.plot(time_axis, np.imag(waveform), 'g-.', label='虛部', alpha=0.3)
-        ax.set_xlabel("時間 (ns)")
-        ax.set_ylabel("電壓 (V)")
-        ax.set_title(f"振幅比例為 {amplitude:.3f} 的切片")
-        ax.legend()
-        ax.grid(True)
+        self._move_marker('power', self.gui.power_overview, amplitude)
 
-        self.gui.power_slice.draw()
+        self._update_slice(
+            'power', self.gui.power_slice, time_axis, self._cubes['power'].magnitude()[index], self._slice_ylim('power'),
+            "電壓 (V)", f"振幅比例為 {amplitude:.3f} 的切片"
+        )
     # endregion
 
     # region: 時域 {頻率} 掃描繪製
@@ -126,13 +441,15 @@ class PlotManager:
         self.freq_dep_data = data['data']
         self.gui.freq_lo_values = data['lo_values']
         self.gui.freq_dep_data = data['data']
+        self._slices.pop('freq_dep', None)
+        self._cubes['freq_dep'] = SweepCube(self.freq_dep_data)
 
         #* 滑條設置
         self.gui.freq_dep_slider.setEnabled(True)
         self.gui.freq_dep_slider.setRange(0, len(self.gui.freq_lo_values) - 1)
         self.gui.freq_dep_slider.setValue(0)
 
-        self._plot_freq_dep_overview()
+        self._render('freq_dep', 'overview', self._plot_freq_dep_overview)
         self.update_freq_dep_slice(0)
 
     def _plot_freq_dep_overview(self):
@@ -141,25 +458,18 @@ class PlotManager:
             return
 
         freqs = np.array(self.gui.freq_lo_values)
-        waveforms = np.array(self.gui.freq_dep_data)
-        time_axis = np.arange(waveforms.shape[1]) * 0.5e-9 
+        cube = self._cubes['freq_dep']
+        time_axis = np.arange(cube.data.shape[1]) * 0.5e-9
         self.gui.freq_dep_time_axis = time_axis
 
-        self.gui.freq_dep_overview.figure.clear()
-        ax = self.gui.freq_dep_overview.figure.add_subplot(111)
-        im = ax.imshow(np.abs(waveforms), cmap='coolwarm', aspect='auto',
-                       extent=[time_axis[0] * 1e9, time_axis[-1] * 1e9,
-                               freqs[0]/1e6, freqs[-1]/1e6], origin='lower')
-        
-        #* 添加頻率標記線
+        #* 頻率標記線位置
         current_freq = freqs[self.gui.freq_dep_slider.value()] / 1e6
-        self.gui.freq_dep_line = ax.axhline(y=current_freq, color='yellow', linestyle='--', linewidth=2)
-        
-        self.gui.freq_dep_overview.figure.colorbar(im, ax=ax).set_label("|single| (V)")
-        ax.set_xlabel("時間 (ns)")
-        ax.set_ylabel("混頻頻率 (MHz)")
-        ax.set_title("時域 {頻率} 量測 2D熱圖")
-        self.gui.freq_dep_overview.draw()
+        self.gui.freq_dep_line = self._update_heatmap(
+            'freq_dep', self.gui.freq_dep_overview, cube.magnitude(),
+            [time_axis[0] * 1e9, time_axis[-1] * 1e9, freqs[0]/1e6, freqs[-1]/1e6],
+            current_freq, "|single| (V)", "時間 (ns)", "混頻頻率 (MHz)", "時域 {頻率} 量測 2D熱圖",
+            cube.limits()
+        )
 
     def update_freq_dep_slice(self, index):
         """更新時域 {頻率} 指定振幅切片圖"""
@@ -167,30 +477,20 @@ class PlotManager:
             return
 
         freq = self.gui.freq_lo_values[index]
-        waveform = self.gui.freq_dep_data[index]
-        time_axis = self.gui.freq_dep_time_axis * 1e9
-
         self.gui.freq_dep_label.setText(f"選定頻率: {freq/1e6:.3f} MHz")
+        self._render('freq_dep', 'slice', lambda: self._draw_freq_dep_slice(index))
+
+    def _draw_freq_dep_slice(self, index):
+        freq = self.gui.freq_lo_values[index]
+        time_axis = self.gui.freq_dep_time_axis * 1e9
 
         #* 更新熱圖上的標記線
-        if hasattr(self.gui, 'freq_dep_line'):
-            self.gui.freq_dep_line.set_ydata([freq/1e6, freq/1e6])
-            self.gui.freq_dep_overview.draw()
-
-        fig = self.gui.freq_dep_slice.figure
-        fig.clear()
-        ax = fig.add_subplot(111)
-
-        ax.plot(time_axis, np.abs(waveform), 'b-', label='振幅')
-        #ax.plot(time_axis, np.real(waveform), 'r--', label='實部', alpha=0.3)
-        #ax.plot(time_axis, np.imag(waveform), 'g-.', label='虛部', alpha=0.3)
-        ax.set_xlabel("時間 (ns)")
-        ax.set_ylabel("電流 (V)")
-        ax.set_title(f"混頻頻率為 {freq/1e6:.3f} MHz 的切片")
-        ax.legend()
-        ax.grid(True)
+        self._move_marker('freq_dep', self.gui.freq_dep_overview, freq/1e6)
 
-        self.gui.freq_dep_slice.draw()
+        self._update_slice(
+            'freq_dep', self.gui.freq_dep_slice, time_axis, self._cubes['freq_dep'].magnitude()[index], self._slice_ylim('freq_dep'),
+            "電流 (V)", f"混頻頻率為 {freq/1e6:.3f} MHz 的切片"
+        )
 
     # endregion
 
@@ -204,6 +504,8 @@ class PlotManager:
         self.gui.current_values = data['curr'] 
         self.gui.freq_values = data['lo_values']
         self.gui.current_freq_data = data['data'] # 三維資料 [電流點][頻率點][時間點]
+        self._slices.pop('current_freq', None)
+        self._cubes['current_freq'] = SweepCube(self.current_freq_data)
         
         #* 滑條設置
         self.gui.current_slider.setEnabled(True)
@@ -213,8 +515,8 @@ class PlotManager:
         self.gui.current_slider.setValue(0)
         self.gui.freq_slider_current_freq.setValue(0)
         
-        #* 繪製初始的熱圖和切片
-        self._plot_current_freq_overview(0)
+        #* 繪製初始的熱圖和切片 (切片繪製時會因電流索引重置而重建熱圖)
+        self._current_freq_index = None
         self.update_current_freq_slice(0, 0)
 
     def _plot_current_freq_overview(self, current_index):
@@ -223,29 +525,23 @@ class PlotManager:
         current = self.gui.current_values[current_index] * 1e3
         freq_len = len(self.gui.freq_values)
 
-        #* 獲取當前電流值對應的頻率2D數據
-        freq_data = self.gui.current_freq_data[current_index]
-        waveforms = np.array(freq_data)
-        time_points = waveforms.shape[1]
+        #* 獲取當前電流值對應的頻率2D數據 (快取的振幅及色階範圍)
+        cube = self._cubes['current_freq']
+        vmin, vmax = cube.limits()
+        time_points = cube.data.shape[2]
         time_axis = np.arange(time_points) * 0.5e-9
         
-        self.gui.current_freq_overview.figure.clear()
-        ax = self.gui.current_freq_overview.figure.add_subplot(111)
-        
-        im = ax.imshow(np.abs(waveforms), cmap='coolwarm', aspect='auto',
-                    extent=[time_axis[0] * 1e9, time_axis[-1] * 1e9,
-                            self.gui.freq_values[0]/1e6, self.gui.freq_values[-1]/1e6], 
-                    origin='lower')
-        
-        #* 添加頻率標記線
+        #* 頻率標記線位置
         current_freq = self.gui.freq_values[self.gui.freq_slider_current_freq.value()] / 1e6
-        self.gui.freq_line = ax.axhline(y=current_freq, color='yellow', linestyle='--', linewidth=2)
-        
-        self.gui.current_freq_overview.figure.colorbar(im, ax=ax).set_label("|single| (V)")
-        ax.set_xlabel("時間 (ns)")
-        ax.set_ylabel("頻率 (MHz)")
-        ax.set_title(f"電流為 {current:.3f} mA 的時域 [電流頻率] 量測 2D熱圖")
-        self.gui.current_freq_overview.draw()
+        self.gui.freq_line = self._update_heatmap(
+            'current_freq', self.gui.current_freq_overview, cube.magnitude()[current_index],
+            [time_axis[0] * 1e9, time_axis[-1] * 1e9,
+             self.gui.freq_values[0]/1e6, self.gui.freq_values[-1]/1e6],
+            current_freq, "|single| (V)", "時間 (ns)", "頻率 (MHz)",
+            f"電流為 {current:.3f} mA 的時域 [電流頻率] 量測 2D熱圖",
+            (vmin[current_index], vmax[current_index])
+        )
+        self._current_freq_index = current_index
 
     def update_current_freq_slice(self, current_index, freq_index):
         """更新時域 {電流頻率} 指定電流頻率切片圖"""        
@@ -255,34 +551,26 @@ class PlotManager:
             freq_index >= len(self.gui.current_freq_data[current_index])):
             return
         
-        #* 獲取數據
+        #* 更新標籤
         current = self.gui.current_values[current_index] * 1e3
         freq = self.gui.freq_values[freq_index]
-        waveform = self.gui.current_freq_data[current_index][freq_index]
-        
-        #* 更新標籤
         self.gui.current_label.setText(f"{current:.3f} mA")
         self.gui.freq_label_current_freq.setText(f"{freq/1e6:.3f} MHz")
+        self._render('current_freq', 'slice', lambda: self._draw_current_freq_slice(current_index, freq_index))
+
+    def _draw_current_freq_slice(self, current_index, freq_index):
+        current = self.gui.current_values[current_index] * 1e3
+        freq = self.gui.freq_values[freq_index]
+        magnitude = self._cubes['current_freq'].magnitude()[current_index, freq_index]
         
-        #* 更新熱圖上的標記線
-        self._plot_current_freq_overview(current_index)
-        if hasattr(self.gui, 'freq_line'):
-            self.gui.freq_line.set_ydata([freq/1e6, freq/1e6])
-            self.gui.current_freq_overview.draw()
-
-        fig = self.gui.current_freq_slice.figure
-        fig.clear()
-        ax = fig.add_subplot(111)
-        
-        t = np.arange(len(waveform)) * 0.5e-9 * 1e9
-        ax.plot(t, np.abs(waveform), 'b-', label='振幅')
-        #ax.plot(t, np.real(waveform), 'r--', label='實部', alpha=0.3)
-        #ax.plot(t, np.imag(waveform), 'g-.', label='虛部', alpha=0.3)
-        ax.set_xlabel("時間 (ns)")
-        ax.set_ylabel("電壓 (V)")
-        ax.set_title(f"電流: {current:.3f} mA, 頻率: {freq/1e6:.3f} MHz 的切片")
-        ax.legend()
-        ax.grid(True)
-        
-        self.gui.current_freq_slice.draw()
+        #* 電流改變時才更新熱圖影像, 頻率改變只移動標記線
+        if current_index != self._current_freq_index:
+            self._plot_current_freq_overview(current_index)
+        self._move_marker('current_freq', self.gui.current_freq_overview, freq/1e6)
+
+        t = np.arange(len(magnitude)) * 0.5e-9 * 1e9
+        self._update_slice(
+            'current_freq', self.gui.current_freq_slice, t, magnitude, self._slice_ylim('current_freq'),
+            "電壓 (V)", f"電流: {current:.3f} mA, 頻率: {freq/1e6:.3f} MHz 的切片"
+        )
     # endregion
\ No newline at end of file
@@ -0,0 +1,167 @@
+import math
+import numpy as np
+import matplotlib
+from matplotlib import animation
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+#* 切片輸出模式: 每點一張圖片 / 每組掃描一個動畫檔 / 拼圖 (多張切片排成一頁)
+SLICE_MODES = {
+    'files': "個別圖片",
+    'animation': "動畫 (單一檔案)",
+    'sheet': "拼圖",
+}
+#* 各輸出模式可選的格式 (副檔名)
+SLICE_FORMATS = ['png', 'jpg', 'svg', 'pdf']
+ANIMATION_FORMATS = ['gif', 'mp4', 'apng']
+MODE_FORMATS = {
+    'files': SLICE_FORMATS,
+    'animation': ANIMATION_FORMATS,
+    'sheet': SLICE_FORMATS,
+}
+DEFAULT_DPI = 100
+ANIMATION_FPS = 10
+SHEET_COLUMNS = 10      #* 拼圖每列切片數
+SHEET_TILES = 100       #* 拼圖每頁切片數
+
+#* 工作行程內重複使用的切片圖模板 (figure, ax, line)
+_template = None
+#* 工作行程內重複使用的拼圖模板 {(列數, 行數): (figure, axes, lines)}
+_sheets = {}
+
+
+def init_worker(rc_params):
+    """工作行程初始化: 套用主程式的字型等 rcParams (中文標題)"""
+    matplotlib.rcParams.update(rc_params)
+
+
+def _slice_template():
+    """每個工作行程只建立一次的切片圖 (Agg), 之後只更新軌跡數據與標題"""
+    global _template
+    if _template is None:
+        fig = Figure(figsize=(5, 5))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        line, = ax.plot([], [], 'b-', label='振幅')
+        ax.set_xlabel("時間 (ns)")
+        ax.set_ylabel("電壓 (V)")
+        ax.grid(True)
+        ax.legend()
+        _template = (fig, ax, line)
+    return _template
+
+
+def render_slices(jobs, dpi=DEFAULT_DPI, fmt='png'):
+    """繪製並保存一批切片圖片 (於工作行程執行)
+
+    Args:
+        jobs: [(圖片路徑, 振幅數據, 標題), ...]
+        dpi: 圖片解析度
+        fmt: 圖片格式
+
+    Returns:
+        int: 完成的圖片數
+    """
+    fig, ax, line = _slice_template()
+    for path, magnitude, title in jobs:
+        line.set_data(np.arange(len(magnitude)) * 0.5e-9 * 1e9, magnitude)
+        ax.relim()
+        ax.autoscale_view()
+        ax.set_title(title)
+        fig.savefig(path, dpi=dpi, format=fmt, bbox_inches='tight')
+    return len(jobs)
+
+
+def _animation_writer(fmt, fps):
+    """動畫編碼器: 有 ffmpeg 時以管線串流編碼, 否則 GIF/APNG 退回 Pillow"""
+    if animation.FFMpegWriter.isAvailable():
+        codec = {'gif': 'gif', 'mp4': 'h264', 'apng': 'apng'}[fmt]
+        extra_args = {'gif': ['-loop', '0'], 'apng': ['-plays', '0']}.get(fmt)
+        return animation.FFMpegWriter(fps=fps, codec=codec, extra_args=extra_args)
+    if fmt == 'mp4':
+        raise RuntimeError("輸出 MP4 動畫需要安裝 ffmpeg")
+    return animation.PillowWriter(fps=fps)
+
+
+def render_animation(path, magnitudes, titles, ylim, dpi=DEFAULT_DPI, fmt='gif', fps=ANIMATION_FPS):
+    """將一組切片依序寫成單一動畫檔 (於工作行程執行)
+
+    Args:
+        path: 動畫檔路徑
+        magnitudes: 振幅數據 (切片數, 時間點數)
+        titles: 各影格標題
+        ylim: 固定的縱軸範圍, 使各影格可互相比較
+
+    Returns:
+        int: 寫入的影格數
+    """
+    fig, ax, line = _slice_template()
+    t = np.arange(magnitudes.shape[1]) * 0.5e-9 * 1e9
+    line.set_data(t, magnitudes[0])
+    ax.relim()
+    ax.autoscale_view()
+    ax.set_ylim(*ylim)
+    ax.set_title(titles[0])
+    fig.tight_layout()
+    try:
+        writer = _animation_writer(fmt, fps)
+        with writer.saving(fig, path, dpi):
+            for magnitude, title in zip(magnitudes, titles):
+                line.set_ydata(magnitude)
+                ax.set_title(title)
+                writer.grab_frame()
+    finally:
+        ax.set_autoscaley_on(True)
+    return len(magnitudes)
+
+
+def _sheet_template(rows, columns):
+    """每個工作行程每種版面只建立一次的拼圖 (Agg)"""
+    key = (rows, columns)
+    if key not in _sheets:
+        height = rows * 1.2 + 0.6
+        fig = Figure(figsize=(columns * 1.6, height))
+        FigureCanvasAgg(fig)
+        axes = fig.subplots(rows, columns, sharex=True, sharey=True, squeeze=False).ravel()
+        lines = []
+        for ax in axes:
+            line, = ax.plot([], [], 'b-', linewidth=0.6)
+            ax.tick_params(labelsize=5)
+            ax.grid(True, linewidth=0.3)
+            lines.append(line)
+        fig.supxlabel("時間 (ns)")
+        fig.supylabel("電壓 (V)")
+        fig.subplots_adjust(left=0.06, right=0.99, bottom=0.45 / height,
+                            top=1 - 0.5 / height, hspace=0.6, wspace=0.2)
+        _sheets[key] = (fig, axes, lines)
+    return _sheets[key]
+
+
+def render_contact_sheet(path, magnitudes, labels, title, ylim, dpi=DEFAULT_DPI, fmt='png'):
+    """將多張切片排成一頁拼圖 (於工作行程執行)
+
+    Args:
+        path: 圖片路徑
+        magnitudes: 振幅數據 (切片數, 時間點數), 最多 SHEET_TILES 張
+        labels: 各切片的小標題
+        title: 整頁標題
+        ylim: 共用的縱軸範圍
+
+    Returns:
+        int: 完成的切片數
+    """
+    columns = min(SHEET_COLUMNS, len(magnitudes))
+    rows = math.ceil(len(magnitudes) / columns)
+    fig, axes, lines = _sheet_template(rows, columns)
+    t = np.arange(magnitudes.shape[1]) * 0.5e-9 * 1e9
+    for i, (ax, line) in enumerate(zip(axes, lines)):
+        visible = i < len(magnitudes)
+        ax.set_visible(visible)
+        if visible:
+            line.set_data(t, magnitudes[i])
+            ax.set_title(labels[i], fontsize=6)
+    axes[0].set_xlim(t[0], t[-1])
+    axes[0].set_ylim(*ylim)
+    fig.suptitle(title)
+    fig.savefig(path, dpi=dpi, format=fmt)
+    return len(magnitudes)
@@ -1,20 +1,239 @@
+import gc
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
 import numpy as np
 from scipy.signal.windows import gaussian
 from .Formula_Parser import FormulaParser
+from .waveform_library import WaveformLibrary
+
+#* SHFQC 波形取樣率
+SAMPLING_RATE = 2e+9
+
+#* 波形/數據精度選項 (儀器解析度不需雙精度時可用 complex64 減半記憶體)
+COMPLEX_DTYPES = ('complex128', 'complex64')
+
+def waveform_dtype(params):
+    """由參數取得複數精度, 預設 complex128"""
+    return np.dtype(params.get('complex_dtype') or 'complex128')
+
+# region: 波形快取
+#* 各波形類型會影響結果的參數
+_COMMON_WAVE_KEYS = ('wave_type', 'gain', 'digital_lo', 'complex_dtype')
+_WAVE_KEYS = {
+    "高斯脈衝": ('pulse_length', 'rise_samples', 'fall_samples', 'front_std', 'end_std'),
+    "方波脈衝": ('pulse_length', 'rise_samples', 'fall_samples'),
+    "指數脈衝": ('pulse_length', 'rise_samples', 'fall_samples',
+                'front_tau', 'end_tau', 'front_concave', 'end_concave'),
+    "自訂波形": ('custom_formula', 'custom_params', 'custom_duration', 'custom_points'),
+}
+
+def _normalize_value(value):
+    """將參數值轉為可穩定表示的形式"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _normalize_value(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize_value(v) for v in value)
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def waveform_fingerprint(params):
+    """計算波形參數指紋, 只取與波形相關的參數"""
+    wave_type = params.get('wave_type')
+    keys = _COMMON_WAVE_KEYS + _WAVE_KEYS.get(wave_type, ())
+    items = tuple((key, _normalize_value(params.get(key))) for key in keys)
+    if WaveformLibrary.is_library_type(wave_type):
+        #* 波形庫檔案覆寫後指紋隨之改變
+        items += (('library_row', params.get('library_row', 0)),
+                  ('library_mtime', WaveformLibrary.mtime(WaveformLibrary.name_of(wave_type))))
+    payload = repr(items)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+class WaveformCache:
+    """波形LRU快取
+
+    以參數指紋為鍵, 總容量以位元組數限制, 超出時由最久未使用者開始淘汰.
+    存入的波形設為唯讀, 避免呼叫端修改到快取內容.
+    """
+    def __init__(self, max_bytes=256 * 1024**2):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._store = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """取得快取波形, 不存在時回傳 None"""
+        with self._lock:
+            waveform = self._store.get(key)
+            if waveform is None:
+                self.misses += 1
+                return None
+            self._store.move_to_end(key)
+            self.hits += 1
+            return waveform
+
+    def put(self, key, waveform):
+        """存入波形, 單一波形超過容量時不快取"""
+        if waveform is None or waveform.nbytes > self.max_bytes:
+            return waveform
+        waveform.setflags(write=False)
+        with self._lock:
+            old = self._store.pop(key, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self._store[key] = waveform
+            self.nbytes += waveform.nbytes
+            self._evict()
+        return waveform
+
+    def resize(self, max_bytes):
+        """調整容量上限"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        """清空快取"""
+        with self._lock:
+            self._store.clear()
+            self.nbytes = 0
 
-def generate_waveform(params, error_callback=None):
+    def discard_file(self, path):
+        """移除映射自 path 的快取波形, 使檔案可被刪除或覆寫"""
+        path = os.path.abspath(path)
+        with self._lock:
+            for key in [key for key, waveform in self._store.items() if _mapped_file(waveform) == path]:
+                self.nbytes -= self._store.pop(key).nbytes
+
+    def _evict(self):
+        while self.nbytes > self.max_bytes and self._store:
+            _, waveform = self._store.popitem(last=False)
+            self.nbytes -= waveform.nbytes
+
+    def __len__(self):
+        return len(self._store)
+
+def _mapped_file(array):
+    """沿 base 鏈取得數組映射的檔案路徑, 非記憶體映射時回傳 None"""
+    while array is not None:
+        filename = getattr(array, 'filename', None)
+        if filename:
+            return os.path.abspath(filename)
+        array = getattr(array, 'base', None)
+    return None
+
+#* 全程序共用的波形快取
+waveform_cache = WaveformCache()
+
+def release_library_waveform(name):
+    """釋放波形庫檔案的快取映射
+
+    Windows 上檔案被記憶體映射時無法刪除或覆寫, 刪除/覆寫波形庫項目前需先呼叫.
+    """
+    npy_path, _ = WaveformLibrary._paths(name)
+    waveform_cache.discard_file(npy_path)
+    gc.collect()    # 映射於最後一個參照釋放時關閉
+# endregion
+
+def generate_waveform(params, error_callback=None, use_cache=True):
     """
     根据参数生成波形
     
     参数:
     params (dict): 包含所有波形参数的字典
-    formula_parser (FormulaParser): 公式解析器实例
     error_callback (function, optional): 错误回调函数
+    use_cache (bool): 是否使用波形快取, 相同参数直接回传快取 (唯读) 波形
     
     返回:
     np.ndarray: 生成的波形数据
     """
-    formula_parser = FormulaParser()
+    if not use_cache:
+        return _build_waveform(params, error_callback)
+
+    key = waveform_fingerprint(params)
+    waveform = waveform_cache.get(key)
+    if waveform is None:
+        waveform = waveform_cache.put(key, _build_waveform(params, error_callback))
+    return waveform
+
+def generate_waveform_bank(params, sweep, error_callback=None):
+    """
+    批次生成波形庫
+
+    以 params 為基礎參數, sweep 內各掃描參數 (等長數組, 逐點對應) 取代對應值.
+    增益與數字混頻以廣播一次計算: 包絡只生成一次, 載波矩陣一次向量化生成;
+    掃描包絡參數 (如標準差) 時才逐點生成包絡 (各包絡仍經波形快取).
+
+    参数:
+    params (dict): 基础波形参数
+    sweep (dict): {参数名称: 数组}, 例如 {'digital_lo': freqs}
+    error_callback (function, optional): 错误回调函数
+
+    返回:
+    np.ndarray: 连续存放的 (n_points, n_samples) 复数波形库
+    """
+    values = {key: np.atleast_1d(np.asarray(val)) for key, val in sweep.items()}
+    lengths = {len(val) for val in values.values()}
+    if len(lengths) != 1:
+        if error_callback:
+            error_callback("波形庫生成錯誤: 掃描參數長度不一致")
+        return None
+    n_points = lengths.pop()
+
+    #* 包絡 (不含增益與混頻, 以雙精度計算後再轉為輸出精度)
+    base = {**params, 'gain': 1.0, 'digital_lo': 0, 'complex_dtype': 'complex128'}
+    envelope_keys = [key for key in values if key not in ('gain', 'digital_lo')]
+    stored_bank = _load_library_bank(params, error_callback)
+    if stored_bank is not None:
+        #* 波形庫內的二維波形庫直接作為逐點包絡
+        if envelope_keys or stored_bank.shape[0] != n_points:
+            if error_callback:
+                error_callback(f"波形庫生成錯誤: 波形庫點數 {stored_bank.shape[0]} 與掃描點數 {n_points} 不符")
+            return None
+        envelopes = stored_bank
+    elif envelope_keys:
+        envelopes = []
+        for i in range(n_points):
+            envelope = generate_waveform(
+                {**base, **{key: values[key][i].item() for key in envelope_keys}},
+                error_callback
+            )
+            if envelope is None:
+                return None
+            envelopes.append(envelope)
+        if len({len(envelope) for envelope in envelopes}) != 1:
+            if error_callback:
+                error_callback("波形庫生成錯誤: 掃描參數改變了波形長度")
+            return None
+        envelopes = np.stack(envelopes)
+    else:
+        envelope = generate_waveform(base, error_callback)
+        if envelope is None:
+            return None
+        envelopes = envelope[np.newaxis, :]
+
+    #* 增益與載波矩陣
+    n_samples = envelopes.shape[1]
+    gain = np.reshape(values.get('gain', params['gain']), (-1, 1))
+    lo_frequency = np.reshape(values.get('digital_lo', params['digital_lo']), (-1, 1))
+    t = np.arange(n_samples) / SAMPLING_RATE
+    carrier = np.exp(1j * 2*np.pi * lo_frequency * t)
+
+    bank = np.empty((n_points, n_samples), dtype=waveform_dtype(params))
+    np.multiply(gain * envelopes, carrier, out=bank, casting='same_kind')
+    return bank
+
+def _build_waveform(params, error_callback=None):
+    """依波形类型生成波形"""
     wave_type = params['wave_type']
     
     try:
@@ -28,7 +247,10 @@ def generate_waveform(params, error_callback=None):
             return _generate_exponential_waveform(params)
                 
         elif wave_type == "自訂波形":
-            return _generate_custom_waveform(params, formula_parser, error_callback)
+            return _generate_custom_waveform(params, FormulaParser(), error_callback)
+
+        elif WaveformLibrary.is_library_type(wave_type):
+            return _load_library_waveform(params)
                 
         else:
             if error_callback:
@@ -105,6 +327,29 @@ def _generate_exponential_waveform(params):
 
     return _apply_gain_and_mixing(waveform, params)
 
+def _load_library_waveform(params):
+    """由波形庫讀取波形 (記憶體映射)"""
+    waveform = WaveformLibrary.load(WaveformLibrary.name_of(params['wave_type']))
+    if waveform.ndim == 2:
+        waveform = waveform[params.get('library_row', 0)]
+
+    #* 無增益及混頻且精度相同時直接使用映射內容, 不經任何計算
+    if params['gain'] == 1 and params['digital_lo'] == 0 and waveform.dtype == waveform_dtype(params):
+        return waveform
+    return _apply_gain_and_mixing(np.asarray(waveform, dtype=complex), params)
+
+def _load_library_bank(params, error_callback=None):
+    """讀取波形庫內的二維波形庫, 非二維或非波形庫類型時回傳 None"""
+    if not WaveformLibrary.is_library_type(params.get('wave_type')):
+        return None
+    try:
+        stored = WaveformLibrary.load(WaveformLibrary.name_of(params['wave_type']))
+    except Exception as e:
+        if error_callback:
+            error_callback(f"波形庫讀取錯誤: {str(e)}")
+        return None
+    return stored if stored.ndim == 2 else None
+
 def _generate_custom_waveform(params, formula_parser, error_callback):
     """生成自定义波形"""
     # 获取自定义参数
@@ -114,8 +359,7 @@ def _generate_custom_waveform(params, formula_parser, error_callback):
             error_callback("請輸入自訂波型公式")
         return None
         
-    # 解析公式
-    a=formula_parser.parse(formula=formula)
+    # 解析公式 (已编译的公式由 FormulaParser 快取取得)
     if not formula_parser.parse(formula):
         if error_callback:
             error_callback("公式解析失敗")
@@ -132,16 +376,8 @@ def _generate_custom_waveform(params, formula_parser, error_callback):
     points = params['custom_points']
     t_array = np.linspace(0, duration, points)
     
-    # 计算波形 - 使用向量化计算避免数组转换错误
-    waveform = np.vectorize(
-        lambda t: formula_parser.evaluate(
-            {**params['custom_params'], 't': t}, 
-            np.array([t])  # 传入单个时间点
-        )[0]
-    )(t_array)
-    
-    # 确保是复数类型
-    waveform = waveform.astype(complex)
+    # 计算波形 - 整个时间数组一次向量化计算 (已为复数类型)
+    waveform = formula_parser.evaluate_array(params['custom_params'], t_array)
     
     return _apply_gain_and_mixing(waveform, params)
 
@@ -152,15 +388,14 @@ def _apply_gain_and_mixing(waveform, params):
     
     # 如果设定了digital_lo，进行数字混频
     if params['digital_lo'] != 0:
-        sampling_rate=2e+9
         lo_phase=0
         lo_frequency=params['digital_lo']
 
-        t = np.arange(len(waveform)) * 1/sampling_rate
+        t = np.arange(len(waveform)) * 1/SAMPLING_RATE
         carrier = np.exp(1j* 2*np.pi* lo_frequency * t + lo_phase)
         waveform = waveform * carrier
 
-    return waveform
+    return waveform.astype(waveform_dtype(params), copy=False)
 
 def _check_custom_params(variables, custom_params, error_callback=None):
     """检查自定义参数是否完整"""
@@ -0,0 +1,109 @@
+import os
+import json
+import time
+
+import numpy as np
+
+class WaveformLibrary:
+    """磁碟波形庫
+
+    已生成的波形 (單一波形或 (n_points, n_samples) 波形庫) 以 .npy 二進位檔
+    存放, 另附 .json 中繼資料. 讀取時以記憶體映射開啟, 不需重新生成.
+    存入的波形視為包絡, 使用時與其他波形類型相同再套用增益及數字混頻.
+    檔案存放於使用者資料目錄, 不放在程式目錄內.
+    """
+    LIBRARY_DIR = os.path.join(
+        os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.local', 'share'),
+        'SHFQC UI', 'waveform_library'
+    )
+    PREFIX = "波形庫: "     #* 波形類型選單中的名稱前綴
+
+    @staticmethod
+    def _paths(name):
+        if not name or any(c in name for c in '\\/:*?"<>|'):
+            raise ValueError(f"無效的波形名稱: {name}")
+        base = os.path.join(WaveformLibrary.LIBRARY_DIR, name)
+        return base + '.npy', base + '.json'
+
+    @staticmethod
+    def list_names():
+        """列出波形庫內所有波形名稱"""
+        if not os.path.isdir(WaveformLibrary.LIBRARY_DIR):
+            return []
+        names = []
+        for file_name in os.listdir(WaveformLibrary.LIBRARY_DIR):
+            name, ext = os.path.splitext(file_name)
+            if ext == '.npy' and os.path.exists(os.path.join(WaveformLibrary.LIBRARY_DIR, name + '.json')):
+                names.append(name)
+        return sorted(names)
+
+    @staticmethod
+    def is_library_type(wave_type):
+        """波形類型是否來自波形庫"""
+        return isinstance(wave_type, str) and wave_type.startswith(WaveformLibrary.PREFIX)
+
+    @staticmethod
+    def wave_type_of(name):
+        """波形名稱 -> 波形類型選單文字"""
+        return WaveformLibrary.PREFIX + name
+
+    @staticmethod
+    def name_of(wave_type):
+        """波形類型選單文字 -> 波形名稱"""
+        return wave_type[len(WaveformLibrary.PREFIX):]
+
+    @staticmethod
+    def save(name, waveform, metadata=None):
+        """存入波形
+
+        Args:
+            name: 波形名稱 (同名覆寫)
+            waveform: 1-D 波形或 2-D (n_points, n_samples) 波形庫
+            metadata: 附加的中繼資料 (例如生成參數)
+        """
+        npy_path, json_path = WaveformLibrary._paths(name)
+        waveform = np.ascontiguousarray(waveform)
+        if waveform.ndim not in (1, 2):
+            raise ValueError("波形需為一維或二維數組")
+
+        os.makedirs(WaveformLibrary.LIBRARY_DIR, exist_ok=True)
+        np.save(npy_path, waveform)
+        info = {
+            'name': name,
+            'shape': list(waveform.shape),
+            'dtype': str(waveform.dtype),
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'metadata': metadata or {}
+        }
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(info, f, ensure_ascii=False, indent=2, default=str)
+        return npy_path
+
+    @staticmethod
+    def load(name):
+        """以記憶體映射讀取波形 (唯讀)"""
+        npy_path, _ = WaveformLibrary._paths(name)
+        return np.load(npy_path, mmap_mode='r')
+
+    @staticmethod
+    def info(name):
+        """讀取波形中繼資料"""
+        _, json_path = WaveformLibrary._paths(name)
+        with open(json_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def mtime(name):
+        """波形檔修改時間, 作為快取指紋的一部分"""
+        npy_path, _ = WaveformLibrary._paths(name)
+        try:
+            return os.path.getmtime(npy_path)
+        except OSError:
+            return None
+
+    @staticmethod
+    def delete(name):
+        """刪除波形"""
+        for path in WaveformLibrary._paths(name):
+            if os.path.exists(path):
+                os.remove(path)
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""單精度 (complex64) 模式與雙精度結果的數值一致性測試
+
+SHFQC 波形產生器為 14 位元 DAC, 以滿刻度 1 正規化時解析度約 2**-13;
+單精度結果與雙精度結果的差異需遠小於此解析度.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library.waveform_generation import generate_waveform, generate_waveform_bank
+
+INSTRUMENT_RESOLUTION = 2**-13  #* 14 位元 DAC (滿刻度 ±1) 的最小步進
+TOLERANCE = INSTRUMENT_RESOLUTION / 100
+
+
+def wave_params(complex_dtype, **overrides):
+    params = {
+        'wave_type': "高斯脈衝",
+        'pulse_length': 2000,
+        'rise_samples': 200,
+        'fall_samples': 200,
+        'front_std': 0.4,
+        'end_std': 0.4,
+        'gain': 0.8,
+        'digital_lo': 50e6,
+        'complex_dtype': complex_dtype,
+    }
+    params.update(overrides)
+    return params
+
+
+def assert_close(single, double):
+    assert single.dtype == np.complex64
+    assert double.dtype == np.complex128
+    assert single.shape == double.shape
+    assert np.max(np.abs(single.astype(np.complex128) - double)) <= TOLERANCE
+
+
+@pytest.mark.parametrize("wave_type", ["高斯脈衝", "方波脈衝"])
+def test_generate_waveform_single_matches_double(wave_type):
+    double = generate_waveform(wave_params('complex128', wave_type=wave_type), use_cache=False)
+    single = generate_waveform(wave_params('complex64', wave_type=wave_type), use_cache=False)
+    assert_close(single, double)
+
+
+def test_generate_waveform_bank_single_matches_double():
+    sweep = {'digital_lo': np.linspace(-200e6, 200e6, 21)}
+    double = generate_waveform_bank(wave_params('complex128'), sweep)
+    single = generate_waveform_bank(wave_params('complex64'), sweep)
+    assert_close(single, double)
+
+
+def test_generate_waveform_bank_rows_match_single_waveforms():
+    freqs = np.linspace(-200e6, 200e6, 5)
+    bank = generate_waveform_bank(wave_params('complex64'), {'digital_lo': freqs})
+    for row, freq in zip(bank, freqs):
+        single = generate_waveform(wave_params('complex64', digital_lo=freq), use_cache=False)
+        assert np.max(np.abs(row - single)) <= TOLERANCE
+
+
+def test_hdf5_round_trip_single_matches_double(tmp_path):
+    pytest.importorskip("h5py")
+    pytest.importorskip("PyQt6")
+    from library.File_Storage import DataSaver, FileLoader
+
+    rng = np.random.default_rng(0)
+    trace = rng.normal(size=(3, 4, 500)) + 1j * rng.normal(size=(3, 4, 500))
+    data = {
+        'curr': np.linspace(0, 1e-3, 3),
+        'lo_values': np.linspace(-1e8, 1e8, 4),
+    }
+
+    loaded = {}
+    for dtype in ('complex128', 'complex64'):
+        save_info = {'base_path': str(tmp_path), 'file_name': dtype, 'comments': '', 'parameters': {}}
+        ok, _ = DataSaver.save_hdf5_data(
+            "時域 {電流頻率} 掃描", {**data, 'data': trace.astype(dtype)}, save_info
+        )
+        assert ok
+        file_path = os.path.join(str(tmp_path), '原始數據(CVS)', f"{dtype}.h5")
+        _, loaded[dtype] = FileLoader.load_hdf5_data(None, file_path)
+
+    double = np.asarray(loaded['complex128']['data'])
+    single = np.asarray(loaded['complex64']['data'])
+    assert np.array_equal(double, trace)
+    assert_close(single, double)
+    np.testing.assert_allclose(loaded['complex64']['curr'], data['curr'])